@@ -0,0 +1,304 @@
+"""
+Bridge I/O - Entrées / sorties partagées par les bridges Python
+
+- `resolve_timeline_input` : mode référence de fichier, la timeline est lue
+  depuis `timeline_path` (un chemin ou une liste) au lieu de transiter par stdin
+- `write_result_file` : résultat complet écrit dans `config.result_path`, seul
+  un résumé (chemin + metadata) est imprimé sur stdout
+- `NDJSONWriter` : sortie en flux (un record JSON par ligne sur stdout) au lieu
+  du document JSON unique imprimé en fin de traitement
+- `ProgressReporter` : heartbeats de progression périodiques sur stderr
+- `update_bridge_versions` : métriques d'un bridge dans bridges_versions.json,
+  sous verrou et par remplacement atomique (bridges lancés en parallèle)
+
+Mode streaming (`config.output = "ndjson"`) :
+
+stdout:
+  {"type": "pattern", "data": {...}}        # dès qu'un pattern est finalisé
+  {"type": "sweep", "data": {...}}          # avec config.sweep : résultat par seuil
+  {"type": "result", "success": true, "metadata": {...}}   # dernier record
+  {"type": "error", "success": false, "error": "..."}      # à la place, si le bridge plante
+
+stderr (toutes les `config.progress_interval_s` secondes, défaut 5) :
+  {"type": "progress", "bridge": "pami", "elapsed_ms": 5003,
+   "events_processed": 1200, "sequences_processed": 4096, "candidates": 812}
+
+Les records de stream ne sont pas triés : l'appelant peut garder la sortie
+partielle si le bridge est interrompu (timeout).
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, TextIO, Tuple, Union, Callable
+
+from timeline_reader import read_timeline_file
+
+try:
+    import fcntl
+except ImportError:  # Windows : remplacement atomique sans verrou
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROGRESS_INTERVAL_S = 5.0
+
+VERSIONS_FILE = '.reasoning_rl4/meta/bridges_versions.json'
+
+
+def read_timelines(paths: Union[str, List[str]]) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Lire une ou plusieurs timelines (`.reasoning_rl4/timeline_<repo>.json`)
+    
+    Les fichiers peuvent être compressés (gzip / zstd) ou NDJSON, voir
+    timeline_reader.py.
+    
+    Chaque fichier est soit un objet `{repo, events, ...}`, soit directement
+    la liste d'events. Les events de plusieurs fichiers sont concaténés dans
+    l'ordre des chemins.
+    
+    Args:
+        paths: Chemin ou liste de chemins
+    
+    Returns:
+        (events, repo commun aux fichiers ou None)
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    
+    events: List[Dict] = []
+    repos = set()
+    
+    for path in paths:
+        data = read_timeline_file(path)
+        
+        if isinstance(data, list):
+            events.extend(data)
+        else:
+            events.extend(data.get('events', []))
+            repos.add(data.get('repo'))
+    
+    repo = repos.pop() if len(repos) == 1 else None
+    return events, repo
+
+
+def resolve_timeline_input(input_data: Dict[str, Any], wrap_events: bool = False) -> Dict[str, Any]:
+    """
+    Remplacer `timeline_path` par la timeline lue sur disque
+    
+    Args:
+        input_data: Input JSON du bridge
+        wrap_events: Timeline attendue sous forme `{"events": [...]}` (Merlion,
+            HyperTS) plutôt que liste d'events (PAMI, FP-Growth)
+    
+    Returns:
+        Input avec `timeline` (inchangé sans `timeline_path`)
+    """
+    paths = input_data.get('timeline_path')
+    if paths is None:
+        return input_data
+    
+    events, repo = read_timelines(paths)
+    
+    resolved = {key: value for key, value in input_data.items() if key != 'timeline_path'}
+    resolved['timeline'] = {"events": events} if wrap_events else events
+    if repo is not None:
+        resolved.setdefault('repo', repo)
+    
+    return resolved
+
+
+def write_result_file(result: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """
+    Écrire le résultat complet dans un fichier et renvoyer son résumé
+    
+    L'écriture passe par un fichier temporaire renommé : le lecteur ne voit
+    jamais de résultat tronqué.
+    
+    Args:
+        result: Résultat du bridge
+        path: Fichier de sortie
+    
+    Returns:
+        Résumé (success, result_path, metadata avec result_bytes)
+    """
+    tmp_path = f"{path}.tmp"
+    
+    with open(tmp_path, 'w') as f:
+        json.dump(result, f)
+    os.replace(tmp_path, path)
+    
+    summary = {key: value for key, value in result.items() if key != 'data'}
+    summary['result_path'] = path
+    summary['metadata'] = {**result.get('metadata', {}), "result_bytes": os.path.getsize(path)}
+    return summary
+
+
+def is_streaming(config: Dict[str, Any]) -> bool:
+    """Le client a-t-il demandé une sortie NDJSON en flux"""
+    return config.get('output') == 'ndjson'
+
+
+def print_error(error_result: Dict[str, Any], config: Dict[str, Any]):
+    """
+    Imprimer une erreur sur stdout
+    
+    En mode streaming, un record `{"type": "error", ...}` sur une seule ligne
+    (le client lit du NDJSON) ; sinon le document JSON indenté habituel.
+    
+    Args:
+        error_result: `{"success": false, "error": ..., "metadata": ...}`
+        config: Config du bridge (vide si l'input n'a pas pu être lu)
+    """
+    if is_streaming(config):
+        NDJSONWriter().write({"type": "error", **error_result})
+    else:
+        print(json.dumps(error_result, indent=2))
+
+
+class NDJSONWriter:
+    """Écriture de records JSON ligne par ligne, flushés immédiatement"""
+    
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream or sys.stdout
+        self.records = 0
+        self._lock = threading.Lock()
+    
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record)
+        
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+            self.records += 1
+
+
+def detach_stderr_logging():
+    """
+    Retirer les handlers de logging qui écrivent sur stderr
+    
+    Les bridges loggent sur stderr et dans leur fichier de log : pendant un
+    flux NDJSON, stderr ne doit porter que les heartbeats, les logs restent
+    dans `.reasoning_rl4/logs/bridges/`.
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stderr:
+            root.removeHandler(handler)
+
+
+class ProgressReporter:
+    """Heartbeats de progression émis par un thread en arrière-plan"""
+    
+    def __init__(
+        self,
+        bridge: str,
+        interval_s: float = DEFAULT_PROGRESS_INTERVAL_S,
+        stream: Optional[TextIO] = None
+    ):
+        self.bridge = bridge
+        self.interval_s = interval_s
+        if stream is None:
+            # Heartbeats sur stderr : plus de lignes de log mêlées au NDJSON
+            detach_stderr_logging()
+        self.writer = NDJSONWriter(stream or sys.stderr)
+        self.counters: Dict[str, Any] = {}
+        self.start_time = time.time()
+        
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def update(self, **counters):
+        """Mettre à jour les compteurs (lus par le prochain heartbeat)"""
+        self.counters.update(counters)
+    
+    def emit(self):
+        """Écrire un record de progression avec les compteurs courants"""
+        self.writer.write({
+            "type": "progress",
+            "bridge": self.bridge,
+            "elapsed_ms": int((time.time() - self.start_time) * 1000),
+            **self.counters
+        })
+    
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            self.emit()
+    
+    def stop(self):
+        """Arrêter les heartbeats et émettre un dernier record"""
+        self._stop.set()
+        self._thread.join()
+        self.emit()
+
+
+def update_bridge_versions(
+    bridge: str,
+    duration_ms: int,
+    fingerprint: Optional[str],
+    update: Optional[Callable[[Dict[str, Any]], None]] = None,
+    versions_file: str = VERSIONS_FILE
+) -> bool:
+    """
+    Mettre à jour l'entrée d'un bridge dans bridges_versions.json
+    
+    Plusieurs bridges tournent en même temps (scripts/run-corpus.py) : la
+    lecture-modification-écriture se fait sous verrou exclusif (fcntl, fichier
+    `.lock` à côté) et le fichier est remplacé atomiquement, jamais tronqué en
+    place. Une erreur est journalisée sans interrompre le bridge.
+    
+    Args:
+        bridge: Clé du bridge dans `bridges` (pami, merlion...)
+        duration_ms: Durée d'exécution (moyenne avg_duration_ms)
+        fingerprint: Empreinte du résultat (result_hash), ignorée si None
+        update: Mise à jour supplémentaire de l'entrée (calibration des moteurs)
+        versions_file: Fichier des versions
+    
+    Returns:
+        True si l'entrée du bridge a été mise à jour
+    """
+    try:
+        with open(f"{versions_file}.lock", 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            
+            with open(versions_file, 'r') as f:
+                versions = json.load(f)
+            
+            data = versions.get('bridges', {}).get(bridge)
+            if data is None:
+                return False
+            
+            # Calculer durée moyenne
+            if data.get('avg_duration_ms'):
+                data['avg_duration_ms'] = int((data['avg_duration_ms'] + duration_ms) / 2)
+            else:
+                data['avg_duration_ms'] = duration_ms
+            
+            # Empreinte du contenu du résultat (voir result_diff.py)
+            if fingerprint is not None:
+                data['result_hash'] = fingerprint
+            data['last_used'] = datetime.utcnow().isoformat() + 'Z'
+            data['status'] = 'active'
+            
+            if update is not None:
+                update(data)
+            
+            versions['meta']['last_updated'] = datetime.utcnow().isoformat() + 'Z'
+            
+            tmp_path = f"{versions_file}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(versions, f, indent=2)
+            os.replace(tmp_path, versions_file)
+        
+        logger.debug(f"Updated bridges_versions.json for {bridge}")
+        return True
+    
+    except Exception as e:
+        logger.warning(f"Failed to update bridges_versions.json: {e}")
+        return False
@@ -0,0 +1,393 @@
+"""
+Change Points - Ruptures du mix de patterns d'une timeline
+
+`MerlionBridge` ne signale que des labels rares isolés. Les changements de
+régime (un repo qui passe des commits `feature` aux commits `bugfix` /
+`refactor`) sont détectés ici comme des ruptures de la distribution des
+patterns le long de la timeline.
+
+Modèle : chaque event est un vecteur de comptes de patterns. Un segment
+[a, b) suit une loi catégorielle de paramètres estimés sur ses comptes ; son
+coût est l'opposé de la log-vraisemblance, C(a, b) = N log N - Σ n_k log n_k
+(n_k comptes du label k dans le segment, N leur somme). Avec les sommes
+cumulées des vecteurs, les comptes d'un segment sont S[b] - S[a] : chaque
+coût de segment se calcule en O(labels), quelle que soit sa longueur.
+
+Deux méthodes :
+- `binseg` (défaut) : segmentation binaire, le segment dont la meilleure
+  coupure réduit le plus le coût est coupé tant que le gain dépasse la
+  pénalité ; toutes les coupures d'un segment sont évaluées d'un bloc
+  (NumPy), O(n × labels × log n) au total
+- `pelt` : optimum exact de Σ coûts + pénalité × ruptures (PELT, Killick et
+  al., 2012), les débuts de segment dominés étant élagués ; linéaire quand
+  les ruptures sont nombreuses, quadratique au pire
+
+Pénalité par défaut : `penalty_scale` (2) × BIC, BIC = (labels - 1) / 2 ×
+ln(N total). Le BIC seul suppose des commits indépendants et coupe les séries
+de commits d'un même label ; au double, environ 7 % des repos du corpus ont
+au moins une rupture.
+
+Les labels au-delà des `max_labels` plus fréquents sont regroupés dans
+OTHER_LABEL, ce qui borne la mémoire des sommes cumulées.
+"""
+
+import heapq
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METHOD = 'binseg'
+METHODS = ('binseg', 'pelt')
+DEFAULT_MIN_SEGMENT = 10
+DEFAULT_MAX_CHANGE_POINTS = 20
+DEFAULT_MAX_LABELS = 32
+DEFAULT_PENALTY_SCALE = 2.0
+
+# Labels regroupés au-delà de max_labels
+OTHER_LABEL = '__other__'
+
+# Part minimale d'un label dans les distributions rapportées
+MIN_REPORTED_SHARE = 0.005
+
+
+def change_point_params(raw: Any) -> Dict[str, Any]:
+    """
+    Valider et normaliser config.change_points
+    
+    Args:
+        raw: `true` (valeurs par défaut) ou dict de paramètres
+    
+    Returns:
+        Paramètres (method, penalty, penalty_scale, min_segment, max_change_points, max_labels)
+    """
+    params = raw if isinstance(raw, dict) else {}
+    
+    method = params.get('method', DEFAULT_METHOD)
+    if method not in METHODS:
+        raise ValueError(f"Unknown change point method {method!r}, expected one of {METHODS}")
+    
+    penalty = params.get('penalty')
+    if penalty is not None and (not isinstance(penalty, (int, float)) or penalty < 0):
+        raise ValueError(f"penalty must be a non-negative number, got {penalty!r}")
+    
+    penalty_scale = params.get('penalty_scale', DEFAULT_PENALTY_SCALE)
+    if not isinstance(penalty_scale, (int, float)) or penalty_scale < 0:
+        raise ValueError(f"penalty_scale must be a non-negative number, got {penalty_scale!r}")
+    
+    resolved = {
+        "method": method,
+        "penalty": penalty,
+        "penalty_scale": penalty_scale,
+        "min_segment": params.get('min_segment', DEFAULT_MIN_SEGMENT),
+        "max_change_points": params.get('max_change_points', DEFAULT_MAX_CHANGE_POINTS),
+        "max_labels": params.get('max_labels', DEFAULT_MAX_LABELS)
+    }
+    
+    for key in ('min_segment', 'max_change_points', 'max_labels'):
+        if not isinstance(resolved[key], int) or resolved[key] < 1:
+            raise ValueError(f"{key} must be a positive integer, got {resolved[key]!r}")
+    
+    return resolved
+
+
+def count_matrix(
+    events: List[Dict],
+    max_labels: int = DEFAULT_MAX_LABELS
+) -> Tuple[np.ndarray, List[str]]:
+    """
+    Sommes cumulées des vecteurs de comptes de patterns par event
+    
+    Args:
+        events: Events de la timeline
+        max_labels: Nombre de labels gardés (les plus fréquents), les autres
+            étant regroupés dans OTHER_LABEL
+    
+    Returns:
+        (S de forme (events + 1, labels), S[i] = comptes des events 0..i-1 ;
+         noms des colonnes)
+    """
+    totals: Dict[str, int] = {}
+    for event in events:
+        for pattern in event.get('patterns', []):
+            totals[pattern] = totals.get(pattern, 0) + 1
+    
+    ranked = sorted(totals, key=lambda label: (-totals[label], str(label)))
+    labels = ranked[:max_labels]
+    columns = {label: k for k, label in enumerate(labels)}
+    if len(ranked) > max_labels:
+        labels.append(OTHER_LABEL)
+    
+    rows = []
+    cols = []
+    for i, event in enumerate(events):
+        for pattern in event.get('patterns', []):
+            rows.append(i)
+            cols.append(columns.get(pattern, max_labels))
+    
+    counts = np.zeros((len(events) + 1, max(1, len(labels))), dtype=np.float64)
+    np.add.at(counts, (np.array(rows, dtype=np.int64) + 1, np.array(cols, dtype=np.int64)), 1.0)
+    
+    return np.cumsum(counts, axis=0), labels
+
+
+def _xlogx(values: np.ndarray) -> np.ndarray:
+    """x log x, nul en 0"""
+    return values * np.log(np.where(values > 0, values, 1.0))
+
+
+def segment_costs(counts: np.ndarray) -> np.ndarray:
+    """
+    Coût (opposé de la log-vraisemblance catégorielle) de segments
+    
+    Args:
+        counts: Comptes par label des segments, (..., labels)
+    
+    Returns:
+        Coûts, de forme counts.shape[:-1]
+    """
+    return _xlogx(counts.sum(axis=-1)) - _xlogx(counts).sum(axis=-1)
+
+
+def best_split(
+    cumulative: np.ndarray,
+    start: int,
+    end: int,
+    min_segment: int
+) -> Optional[Tuple[float, int]]:
+    """
+    Meilleure coupure d'un segment [start, end)
+    
+    Args:
+        cumulative: Sommes cumulées (voir count_matrix)
+        start: Début du segment
+        end: Fin (exclusive) du segment
+        min_segment: Longueur minimale de chaque moitié
+    
+    Returns:
+        (gain de coût, index de la coupure), ou None si le segment est trop court
+    """
+    if end - start < 2 * min_segment:
+        return None
+    
+    splits = np.arange(start + min_segment, end - min_segment + 1)
+    left = cumulative[splits] - cumulative[start]
+    right = cumulative[end] - cumulative[splits]
+    
+    gains = segment_costs(cumulative[end] - cumulative[start]) - segment_costs(left) - segment_costs(right)
+    best = int(np.argmax(gains))
+    
+    return float(gains[best]), int(splits[best])
+
+
+def binary_segmentation(
+    cumulative: np.ndarray,
+    penalty: float,
+    min_segment: int,
+    max_change_points: int
+) -> List[Tuple[int, float]]:
+    """
+    Segmentation binaire : coupe le segment de meilleur gain tant que gain > pénalité
+    
+    Args:
+        cumulative: Sommes cumulées (voir count_matrix)
+        penalty: Gain minimal d'une rupture
+        min_segment: Longueur minimale d'un segment
+        max_change_points: Nombre maximal de ruptures
+    
+    Returns:
+        Ruptures (index, gain), triées par index
+    """
+    n = cumulative.shape[0] - 1
+    heap = []
+    
+    def push(start: int, end: int):
+        split = best_split(cumulative, start, end, min_segment)
+        if split is not None and split[0] > penalty:
+            heapq.heappush(heap, (-split[0], split[1], start, end))
+    
+    push(0, n)
+    change_points = []
+    
+    while heap and len(change_points) < max_change_points:
+        negative_gain, split, start, end = heapq.heappop(heap)
+        change_points.append((split, -negative_gain))
+        push(start, split)
+        push(split, end)
+    
+    return sorted(change_points)
+
+
+def pelt(
+    cumulative: np.ndarray,
+    penalty: float,
+    min_segment: int
+) -> List[Tuple[int, float]]:
+    """
+    Segmentation optimale pénalisée (PELT)
+    
+    F(t) = min sur s de F(s) + C(s, t) + pénalité ; un début s tel que
+    F(s) + C(s, t) > F(t) ne peut plus être optimal pour les fins T ≥ t +
+    min_segment (le coût étant une log-vraisemblance, passer par t est
+    meilleur) : il est retiré des candidats à partir de T = t + min_segment.
+    
+    Args:
+        cumulative: Sommes cumulées (voir count_matrix)
+        penalty: Coût d'une rupture
+        min_segment: Longueur minimale d'un segment
+    
+    Returns:
+        Ruptures (index, gain de coût par rapport au segment fusionné), triées par index
+    """
+    n = cumulative.shape[0] - 1
+    if n < 2 * min_segment:
+        return []
+    
+    best = np.full(n + 1, np.inf)
+    best[0] = -penalty
+    previous = np.zeros(n + 1, dtype=np.int64)
+    expiry = np.full(n + 1, n + 1, dtype=np.int64)
+    candidates = np.array([], dtype=np.int64)
+    
+    for t in range(min_segment, n + 1):
+        # Débuts admissibles : au moins min_segment events avant t
+        candidates = np.append(candidates[expiry[candidates] > t], t - min_segment)
+        costs = best[candidates] + segment_costs(cumulative[t] - cumulative[candidates])
+        
+        position = int(np.argmin(costs))
+        best[t] = costs[position] + penalty
+        previous[t] = candidates[position]
+        
+        dominated = candidates[costs > best[t]]
+        expiry[dominated] = np.minimum(expiry[dominated], t + min_segment)
+    
+    boundaries = []
+    t = n
+    while t > 0:
+        boundaries.append(t)
+        t = int(previous[t])
+    boundaries = [0] + boundaries[::-1]
+    
+    change_points = []
+    for k in range(1, len(boundaries) - 1):
+        start, split, end = boundaries[k - 1], boundaries[k], boundaries[k + 1]
+        gain = (
+            segment_costs(cumulative[end] - cumulative[start])
+            - segment_costs(cumulative[split] - cumulative[start])
+            - segment_costs(cumulative[end] - cumulative[split])
+        )
+        change_points.append((split, float(gain)))
+    
+    return change_points
+
+
+def change_point_penalty(params: Dict[str, Any], cumulative: np.ndarray) -> float:
+    """
+    Pénalité d'une rupture : `penalty`, sinon penalty_scale × BIC
+    
+    Args:
+        params: Paramètres (voir change_point_params)
+        cumulative: Sommes cumulées (voir count_matrix)
+    
+    Returns:
+        Pénalité (gain de coût minimal d'une rupture)
+    """
+    if params['penalty'] is not None:
+        return float(params['penalty'])
+    
+    labels = cumulative.shape[1]
+    total = float(cumulative[-1].sum())
+    return float(params['penalty_scale'] * max(1, labels - 1) / 2 * np.log(max(total, 2.0)))
+
+
+def distribution(counts: np.ndarray, labels: List[str]) -> Dict[str, float]:
+    """Parts des labels d'un segment (≥ MIN_REPORTED_SHARE), par part décroissante"""
+    total = counts.sum()
+    if total == 0:
+        return {}
+    
+    shares = counts / total
+    order = np.argsort(-shares, kind='stable')
+    return {
+        labels[k]: round(float(shares[k]), 3)
+        for k in order
+        if shares[k] >= MIN_REPORTED_SHARE
+    }
+
+
+def detect_change_points(events: List[Dict], params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Détecter les ruptures du mix de patterns
+    
+    Args:
+        events: Events de la timeline
+        params: Paramètres (voir change_point_params)
+    
+    Returns:
+        {"change_points": [...], "segments": [...], "stats": {...}}
+    """
+    cumulative, labels = count_matrix(events, params['max_labels'])
+    n = len(events)
+    total = float(cumulative[-1].sum())
+    
+    penalty = change_point_penalty(params, cumulative)
+    
+    if params['method'] == 'pelt':
+        found = pelt(cumulative, penalty, params['min_segment'])
+        if len(found) > params['max_change_points']:
+            # Ruptures les plus marquées, dans l'ordre de la timeline
+            found = sorted(sorted(found, key=lambda item: -item[1])[:params['max_change_points']])
+    else:
+        found = binary_segmentation(cumulative, penalty, params['min_segment'], params['max_change_points'])
+    
+    boundaries = [0] + [index for index, _ in found] + [n]
+    
+    segments = []
+    for start, end in zip(boundaries[:-1], boundaries[1:]):
+        if end <= start:
+            continue
+        segments.append({
+            "start": start,
+            "end": end,
+            "t_start": events[start].get('t', start),
+            "t_end": events[end - 1].get('t', end - 1),
+            "events": end - start,
+            "patterns": int(cumulative[end].sum() - cumulative[start].sum()),
+            "distribution": distribution(cumulative[end] - cumulative[start], labels)
+        })
+    
+    change_points = []
+    for k, (index, gain) in enumerate(found):
+        before = cumulative[index] - cumulative[boundaries[k]]
+        after = cumulative[boundaries[k + 2]] - cumulative[index]
+        before_shares = before / before.sum() if before.sum() else before
+        after_shares = after / after.sum() if after.sum() else after
+        
+        event = events[index]
+        change_points.append({
+            "index": index,
+            "t": event.get('t', index),
+            "commit": event.get('commit', 'unknown'),
+            "timestamp": event.get('timestamp'),
+            "gain": round(gain, 3),
+            # Distance en variation totale entre les deux distributions
+            "shift": round(float(np.abs(after_shares - before_shares).sum() / 2), 3),
+            "before": distribution(before, labels),
+            "after": distribution(after, labels)
+        })
+    
+    logger.debug(f"{len(change_points)} change points over {n} events ({params['method']}, penalty {penalty:.1f})")
+    
+    return {
+        "change_points": change_points,
+        "segments": segments,
+        "stats": {
+            "method": params['method'],
+            "penalty": round(float(penalty), 3),
+            "labels": len(labels),
+            "events": n,
+            "patterns": int(total)
+        }
+    }
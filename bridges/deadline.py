@@ -0,0 +1,70 @@
+"""
+Deadline - Budget de temps des bridges de mining
+
+Les moteurs TS tuent un bridge au bout de 300s et retombent alors sur la
+méthode native. Avec `config.deadline_ms`, le bridge planifie son travail
+autour de cette échéance : l'horloge est consultée aux points de contrôle
+(frontières de chunks de séquences) et, une fois l'échéance passée, le
+mining s'arrête et renvoie le meilleur résultat obtenu jusque-là
+(`metadata.partial = true`, `metadata.coverage` = fraction du travail faite).
+
+Pour que ce résultat partiel soit le plus utile possible :
+- les séquences (dédupliquées) sont traitées par multiplicité décroissante :
+  les premiers chunks couvrent la plus grande part du volume de fenêtres
+- les niveaux courts (support plus élevé) passent avant les niveaux longs
+"""
+
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+
+class Deadline:
+    """Échéance absolue calculée depuis le début du traitement"""
+    
+    def __init__(self, deadline_ms: float, start_time: Optional[float] = None):
+        if deadline_ms <= 0:
+            raise ValueError(f"deadline_ms must be positive, got {deadline_ms!r}")
+        
+        self.deadline_ms = deadline_ms
+        self.start_time = start_time if start_time is not None else time.time()
+        self.expires_at = self.start_time + deadline_ms / 1000
+        self.hit = False
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], start_time: Optional[float] = None) -> Optional['Deadline']:
+        """Deadline de `config.deadline_ms`, ou None si absente"""
+        deadline_ms = config.get('deadline_ms')
+        if deadline_ms is None:
+            return None
+        return cls(deadline_ms, start_time)
+    
+    def expired(self) -> bool:
+        """L'échéance est-elle passée (mémorisé dans `hit`)"""
+        if not self.hit and time.time() >= self.expires_at:
+            self.hit = True
+        return self.hit
+    
+    def remaining_ms(self) -> int:
+        """Temps restant avant l'échéance (0 si passée)"""
+        return max(0, int((self.expires_at - time.time()) * 1000))
+
+
+def order_by_weight(
+    sequences: List[List],
+    weights: Optional[List[int]]
+) -> Tuple[List[List], Optional[List[int]]]:
+    """
+    Trier les séquences par multiplicité décroissante (tri stable)
+    
+    Args:
+        sequences: Séquences dédupliquées
+        weights: Multiplicité de chaque séquence (None = toutes à 1)
+    
+    Returns:
+        (séquences, poids) dans l'ordre de traitement
+    """
+    if weights is None:
+        return sequences, weights
+    
+    order = sorted(range(len(sequences)), key=lambda i: -weights[i])
+    return [sequences[i] for i in order], [weights[i] for i in order]
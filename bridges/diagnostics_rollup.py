@@ -0,0 +1,499 @@
+"""
+Diagnostics Rollup - Agrégation en flux des diagnostics d'entraînement et des logs bridges
+
+Sources (`.reasoning_rl4/`) :
+- `diagnostics/training-summary-*.json` : un fichier par run du trainer
+  (repos traités, succès / échecs, durée par repo)
+- `diagnostics/health.jsonl` : health checks périodiques (mémoire, lag de la
+  boucle d'événements, alertes), en ajout continu
+- `logs/bridges/*.log` : lignes `[TIMESTAMP] [LEVEL] [BRIDGE] message` des
+  bridges Python, et lignes `[ISO] [ERROR] Bridge fallback triggered: ...`
+  ajoutées par les engines TS quand un bridge échoue
+
+Tout est lu en une passe, ligne par ligne (les résumés d'entraînement via le
+parser JSON en flux de timeline_reader) : la mémoire ne dépend pas de la
+taille des fichiers. Les durées vont dans des histogrammes à buckets
+logarithmiques (erreur relative bornée sur les percentiles, fusionnables),
+les compteurs dans des buckets de temps de `bucket_s` secondes.
+
+Le rollup est incrémental : il garde l'offset lu de chaque fichier en ajout
+(`health.jsonl`, logs) et le nom des résumés déjà comptés. La passe suivante
+ne lit que les lignes ajoutées depuis (un fichier raccourci ou remplacé,
+après rotation, est relu depuis le début). Une ligne incomplète en fin de
+fichier (en cours d'écriture) est laissée pour la passe suivante.
+
+Horodatage : les logs Python sont en heure locale sans fuseau, les
+diagnostics TS en UTC ; les buckets utilisent l'heure telle qu'écrite.
+"""
+
+import os
+import re
+import glob
+import json
+import math
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Iterator, Tuple
+
+from timeline_reader import JSONStreamParser
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_VERSION = 1
+DEFAULT_ROLLUP_PATH = '.reasoning_rl4/meta/diagnostics_rollup.json'
+DEFAULT_BUCKET_S = 3600
+
+# Erreur relative des percentiles (histogrammes à buckets logarithmiques)
+DEFAULT_RELATIVE_ACCURACY = 0.02
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+EPOCH = datetime(1970, 1, 1)
+
+# `[2026-10-19 06:59:41,712] [INFO] [PAMI] message` (tag du bridge optionnel)
+LOG_LINE = re.compile(
+    r'^\[(?P<ts>\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2})[^\]]*\] \[(?P<level>[A-Z]+)\] '
+    r'(?:\[(?P<bridge>[A-Za-z0-9_-]+)\] )?(?P<message>.*)$'
+)
+DURATION = re.compile(r'(?:^| )in (\d+(?:\.\d+)?)ms\b')
+FALLBACK = re.compile(r'fallback|falling back', re.IGNORECASE)
+
+
+class LogHistogram:
+    """
+    Histogramme à buckets logarithmiques (percentiles à erreur relative bornée)
+    
+    Une valeur x > 0 tombe dans le bucket ceil(log_γ(x)), γ = (1 + α) / (1 - α) :
+    le centre du bucket est à moins de α (relatif) de toute valeur du bucket.
+    Le nombre de buckets ne dépend que de la plage des valeurs, pas de leur nombre.
+    """
+    
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def add(self, value: float, count: int = 1):
+        self.count += count
+        self.total += value * count
+        self.max = max(self.max, value)
+        
+        if value <= 0:
+            self.zero += count
+            return
+        
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + count
+    
+    def quantile(self, q: float) -> float:
+        """Valeur approchée du quantile q (0 sans valeur)"""
+        if self.count == 0:
+            return 0.0
+        
+        rank = q * (self.count - 1)
+        seen = self.zero
+        if rank < seen:
+            return 0.0
+        
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        
+        return self.max
+    
+    def summary(self) -> Dict[str, float]:
+        """count, mean, p50 / p95 / p99, max"""
+        result = {
+            "count": self.count,
+            "mean": round(self.total / self.count, 2) if self.count else 0.0
+        }
+        for q in PERCENTILES:
+            result[f"p{int(q * 100)}"] = round(self.quantile(q), 2)
+        result["max"] = round(self.max, 2)
+        return result
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": {str(key): count for key, count in sorted(self.bins.items())},
+            "zero": self.zero,
+            "count": self.count,
+            "total": self.total,
+            "max": self.max
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LogHistogram':
+        histogram = cls(data['relative_accuracy'])
+        histogram.bins = {int(key): count for key, count in data['bins'].items()}
+        histogram.zero = data['zero']
+        histogram.count = data['count']
+        histogram.total = data['total']
+        histogram.max = data['max']
+        return histogram
+
+
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """Horodatage ISO (`Z` accepté) ou `YYYY-MM-DD HH:MM:SS`, sans fuseau"""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')[:19])
+    except (TypeError, ValueError):
+        return None
+
+
+def bridge_name(tag: Optional[str], path: str) -> str:
+    """Nom du bridge : tag de la ligne (`FP-GROWTH` → fpgrowth), sinon nom du fichier de log"""
+    if tag:
+        return tag.lower().replace('-', '').replace('_', '')
+    name = os.path.basename(path)[:-len('.log')]
+    return name[:-len('_bridge')] if name.endswith('_bridge') else name
+
+
+def iter_complete_lines(path: str, offset: int) -> Iterator[Tuple[bytes, int]]:
+    """
+    Lignes complètes d'un fichier à partir d'un offset
+    
+    Yields:
+        (ligne, offset après la ligne) ; une dernière ligne sans fin de ligne est ignorée
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                return
+            offset += len(line)
+            yield line, offset
+
+
+def iter_summary_results(path: str) -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]:
+    """
+    Champs d'un résumé d'entraînement et itérateur sur ses `results`
+    
+    Les champs racine sont décodés entiers, les résultats un par un (parser en flux).
+    Les champs placés après `results` ne sont disponibles qu'une fois l'itérateur épuisé.
+    """
+    header: Dict[str, Any] = {}
+    
+    def results() -> Iterator[Dict[str, Any]]:
+        with open(path, 'r', encoding='utf-8') as text:
+            parser = JSONStreamParser(text)
+            parser.expect('{')
+            if parser.peek() == '}':
+                return
+            
+            while True:
+                key = parser.value()
+                parser.expect(':')
+                
+                if key == 'results' and parser.peek() == '[':
+                    yield from parser.array_items()
+                else:
+                    header[key] = parser.value()
+                
+                separator = parser.separator()
+                if separator == '}':
+                    return
+                if separator != ',':
+                    raise ValueError(f"Invalid JSON stream: expected ',' or '}}', found {separator!r}")
+    
+    return header, results()
+
+
+class DiagnosticsRollup:
+    """Rollup incrémental des diagnostics d'entraînement et des logs bridges"""
+    
+    def __init__(self, bucket_s: int = DEFAULT_BUCKET_S, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if bucket_s <= 0:
+            raise ValueError(f"bucket_s must be positive, got {bucket_s!r}")
+        
+        self.bucket_s = bucket_s
+        self.relative_accuracy = relative_accuracy
+        
+        # Offsets des fichiers en ajout : chemin → {offset, inode}
+        self.sources: Dict[str, Dict[str, int]] = {}
+        self.summaries_read = set()
+        
+        self.training = {"runs": 0, "repos": 0, "successful": 0, "failed": 0}
+        self.repo_durations = self._histogram()
+        
+        self.bridges: Dict[str, Dict[str, Any]] = {}
+        
+        self.health = {"samples": 0, "alerts": {}, "max_memory_mb": 0.0}
+        self.event_loop_p99 = self._histogram()
+        
+        # Buckets de temps : début du bucket (ISO) → compteurs
+        self.buckets: Dict[str, Dict[str, Any]] = {}
+        
+        self.malformed_lines = 0
+    
+    def _histogram(self) -> LogHistogram:
+        return LogHistogram(self.relative_accuracy)
+    
+    def _bucket(self, moment: Optional[datetime]) -> Optional[Dict[str, Any]]:
+        """Compteurs du bucket de temps contenant moment"""
+        if moment is None:
+            return None
+        
+        seconds = int((moment - EPOCH).total_seconds())
+        start = EPOCH + timedelta(seconds=seconds - seconds % self.bucket_s)
+        key = start.strftime('%Y-%m-%dT%H:%M:%S')
+        return self.buckets.setdefault(key, {})
+    
+    def _bridge(self, name: str) -> Dict[str, Any]:
+        if name not in self.bridges:
+            self.bridges[name] = {
+                "runs": 0, "completed": 0, "errors": 0, "warnings": 0, "fallbacks": 0,
+                "durations": self._histogram()
+            }
+        return self.bridges[name]
+    
+    # --- Lecture des sources ---------------------------------------------------
+    
+    def update(self, root: str = '.reasoning_rl4') -> Dict[str, int]:
+        """
+        Lire les données nouvelles de toutes les sources
+        
+        Args:
+            root: Dossier `.reasoning_rl4`
+        
+        Returns:
+            Nombre de résumés, lignes health et lignes de log lus
+        """
+        stats = {"summaries": 0, "health_lines": 0, "log_lines": 0}
+        
+        for path in sorted(glob.glob(os.path.join(root, 'diagnostics', 'training-summary-*.json'))):
+            name = os.path.basename(path)
+            if name not in self.summaries_read:
+                self._read_summary(path)
+                self.summaries_read.add(name)
+                stats["summaries"] += 1
+        
+        health_path = os.path.join(root, 'diagnostics', 'health.jsonl')
+        if os.path.exists(health_path):
+            stats["health_lines"] += self._read_appended(health_path, self._read_health_line)
+        
+        for path in sorted(glob.glob(os.path.join(root, 'logs', 'bridges', '*.log'))):
+            stats["log_lines"] += self._read_appended(path, lambda line, p=path: self._read_log_line(line, p))
+        
+        logger.info(
+            f"Diagnostics rollup: {stats['summaries']} summaries, {stats['health_lines']} health lines, "
+            f"{stats['log_lines']} log lines read"
+        )
+        return stats
+    
+    def _read_appended(self, path: str, handle) -> int:
+        """Lire les lignes ajoutées depuis le dernier offset (relecture complète après rotation)"""
+        st = os.stat(path)
+        source = self.sources.get(path)
+        
+        offset = 0
+        if source is not None and source['inode'] == st.st_ino and source['offset'] <= st.st_size:
+            offset = source['offset']
+        
+        lines = 0
+        for line, offset in iter_complete_lines(path, offset):
+            handle(line)
+            lines += 1
+            # Offset enregistré au fil de la lecture (une exception garde les lignes déjà lues)
+            self.sources[path] = {"offset": offset, "inode": st.st_ino}
+        
+        self.sources.setdefault(path, {"offset": offset, "inode": st.st_ino})
+        return lines
+    
+    def _read_summary(self, path: str):
+        header, results = iter_summary_results(path)
+        
+        repos = successful = 0
+        for result in results:
+            repos += 1
+            if result.get('success'):
+                successful += 1
+            duration = (result.get('stats') or {}).get('duration_ms')
+            if isinstance(duration, (int, float)):
+                self.repo_durations.add(duration)
+        
+        self.training["runs"] += 1
+        self.training["repos"] += repos
+        self.training["successful"] += successful
+        self.training["failed"] += repos - successful
+        
+        # Run compté dans le bucket de sa fin
+        bucket = self._bucket(parse_timestamp(header.get('endTime') or header.get('startTime')))
+        if bucket is not None:
+            bucket["training_runs"] = bucket.get("training_runs", 0) + 1
+            bucket["repos"] = bucket.get("repos", 0) + repos
+            bucket["repos_failed"] = bucket.get("repos_failed", 0) + repos - successful
+            bucket["training_ms"] = bucket.get("training_ms", 0) + (header.get('totalDuration_ms') or 0)
+    
+    def _read_health_line(self, line: bytes):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            self.malformed_lines += 1
+            return
+        
+        metrics = record.get('metrics') or {}
+        memory = metrics.get('memoryMB')
+        lag_p99 = (metrics.get('eventLoopLag') or {}).get('p99')
+        
+        self.health["samples"] += 1
+        if isinstance(memory, (int, float)):
+            self.health["max_memory_mb"] = max(self.health["max_memory_mb"], round(memory, 1))
+        if isinstance(lag_p99, (int, float)):
+            self.event_loop_p99.add(lag_p99)
+        
+        alerts = record.get('alerts') or []
+        for alert in alerts:
+            kind = alert.get('type', 'unknown')
+            self.health["alerts"][kind] = self.health["alerts"].get(kind, 0) + 1
+        
+        bucket = self._bucket(parse_timestamp(record.get('_timestamp') or metrics.get('lastCheck')))
+        if bucket is not None:
+            bucket["health_samples"] = bucket.get("health_samples", 0) + 1
+            bucket["alerts"] = bucket.get("alerts", 0) + len(alerts)
+            if isinstance(memory, (int, float)):
+                bucket["max_memory_mb"] = max(bucket.get("max_memory_mb", 0.0), round(memory, 1))
+    
+    def _read_log_line(self, line: bytes, path: str):
+        match = LOG_LINE.match(line.decode('utf-8', 'replace').rstrip('\r\n'))
+        if match is None:
+            # Suite multi-ligne (traceback) ou ligne hors format
+            self.malformed_lines += 1
+            return
+        
+        name = bridge_name(match.group('bridge'), path)
+        level = match.group('level')
+        message = match.group('message')
+        counters = self._bridge(name)
+        bucket = self._bucket(parse_timestamp(match.group('ts')))
+        
+        event = None
+        if FALLBACK.search(message):
+            counters["fallbacks"] += 1
+            event = "fallbacks"
+        elif level == 'ERROR':
+            counters["errors"] += 1
+            event = "errors"
+        elif level == 'WARNING':
+            counters["warnings"] += 1
+        elif message.startswith('Processing '):
+            counters["runs"] += 1
+            event = "runs"
+        elif level == 'INFO':
+            duration = DURATION.search(message)
+            if duration is not None:
+                counters["completed"] += 1
+                counters["durations"].add(float(duration.group(1)))
+        
+        if bucket is not None and event is not None:
+            per_bridge = bucket.setdefault(f"bridge_{event}", {})
+            per_bridge[name] = per_bridge.get(name, 0) + 1
+    
+    # --- Rapport et persistance ------------------------------------------------
+    
+    def summary(self) -> Dict[str, Any]:
+        """Débit par bucket, percentiles de durée et taux de fallback par bridge"""
+        throughput = []
+        for key in sorted(self.buckets):
+            bucket = self.buckets[key]
+            entry = {"bucket": key}
+            if bucket.get("repos"):
+                entry["repos"] = bucket["repos"]
+                entry["repos_per_hour"] = round(bucket["repos"] * 3600 / self.bucket_s, 1)
+            runs = sum(bucket.get("bridge_runs", {}).values())
+            if runs:
+                entry["bridge_runs"] = runs
+                entry["bridge_runs_per_hour"] = round(runs * 3600 / self.bucket_s, 1)
+            fallbacks = sum(bucket.get("bridge_fallbacks", {}).values())
+            if fallbacks:
+                entry["fallbacks"] = fallbacks
+            if bucket.get("health_samples"):
+                entry["max_memory_mb"] = bucket.get("max_memory_mb")
+                entry["alerts"] = bucket.get("alerts", 0)
+            throughput.append(entry)
+        
+        bridges = {}
+        for name, counters in sorted(self.bridges.items()):
+            calls = max(counters["runs"], counters["fallbacks"])
+            bridges[name] = {
+                "runs": counters["runs"],
+                "completed": counters["completed"],
+                "errors": counters["errors"],
+                "fallbacks": counters["fallbacks"],
+                "fallback_rate": round(counters["fallbacks"] / calls, 4) if calls else 0.0,
+                "duration_ms": counters["durations"].summary()
+            }
+        
+        return {
+            "training": {
+                **self.training,
+                "failure_rate": round(self.training["failed"] / self.training["repos"], 4) if self.training["repos"] else 0.0,
+                "repo_duration_ms": self.repo_durations.summary()
+            },
+            "bridges": bridges,
+            "health": {**self.health, "event_loop_lag_p99_ms": self.event_loop_p99.summary()},
+            "throughput": throughput,
+            "malformed_lines": self.malformed_lines
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": ROLLUP_VERSION,
+            "bucket_s": self.bucket_s,
+            "relative_accuracy": self.relative_accuracy,
+            "sources": self.sources,
+            "summaries_read": sorted(self.summaries_read),
+            "state": {
+                "training": self.training,
+                "repo_durations": self.repo_durations.to_dict(),
+                "bridges": {
+                    name: {**counters, "durations": counters["durations"].to_dict()}
+                    for name, counters in self.bridges.items()
+                },
+                "health": self.health,
+                "event_loop_p99": self.event_loop_p99.to_dict(),
+                "buckets": self.buckets,
+                "malformed_lines": self.malformed_lines
+            },
+            "summary": self.summary()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DiagnosticsRollup':
+        if data.get('version') != ROLLUP_VERSION:
+            raise ValueError(f"Unsupported rollup version: {data.get('version')!r}")
+        
+        rollup = cls(data['bucket_s'], data['relative_accuracy'])
+        rollup.sources = data['sources']
+        rollup.summaries_read = set(data['summaries_read'])
+        
+        state = data['state']
+        rollup.training = state['training']
+        rollup.repo_durations = LogHistogram.from_dict(state['repo_durations'])
+        rollup.bridges = {
+            name: {**counters, "durations": LogHistogram.from_dict(counters['durations'])}
+            for name, counters in state['bridges'].items()
+        }
+        rollup.health = state['health']
+        rollup.event_loop_p99 = LogHistogram.from_dict(state['event_loop_p99'])
+        rollup.buckets = state['buckets']
+        rollup.malformed_lines = state['malformed_lines']
+        return rollup
+    
+    def save(self, path: str):
+        """Écrire le rollup (fichier temporaire renommé)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'DiagnosticsRollup':
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
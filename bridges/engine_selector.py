@@ -0,0 +1,226 @@
+"""
+Engine Selector - Choix du moteur de comptage par modèle de coût
+
+Remplace le seuil fixe `timelineCount > 10000` de PatternLearningEngineV2 :
+avec `config.engine = "auto"`, le bridge estime le coût de chaque moteur
+disponible et exécute le moins cher qui respecte l'exactitude demandée.
+
+Moteurs :
+- `naive` : comptage dict paires puis triplets (une passe par longueur)
+- `fused` : comptage dict paires + triplets en une passe
+- `apriori` : level-wise sur codes entiers, élagage préfixe / suffixe
+- `approximate` : sketch Space-Saving (seulement si `exactness = "approximate"`)
+
+Coût estimé = opérations × µs par opération. Les opérations viennent de
+statistiques bon marché des séquences (items, n-grams, part des items dont le
+label est fréquent → candidats Apriori restants). Les µs par opération partent
+de valeurs par défaut mesurées puis sont recalibrées (moyenne mobile) à chaque
+exécution à partir des durées enregistrées dans bridges_versions.json.
+
+Seul le moteur exécuté est recalibré : un moteur peu ou anciennement calibré
+dont l'estimation reste proche de la meilleure est donc exécuté de temps en
+temps à sa place (exploration), sans quoi il resterait figé sur sa valeur par
+défaut et ne serait jamais choisi.
+"""
+
+import json
+import logging
+from typing import List, Dict, Any, Optional, Iterable
+
+from bridge_io import VERSIONS_FILE
+
+logger = logging.getLogger(__name__)
+
+# µs par opération avant calibration (mesurés sur timelines synthétiques et réelles)
+DEFAULT_US_PER_OP = {
+    'naive': 0.7,
+    'fused': 0.6,
+    'apriori': 0.55,
+    'approximate': 1.5
+}
+
+EXACT_ENGINES = ('naive', 'fused', 'apriori')
+
+# Poids de la nouvelle mesure dans la moyenne mobile
+CALIBRATION_ALPHA = 0.3
+
+# En dessous, la durée mesurée est trop bruitée pour calibrer
+MIN_CALIBRATION_OPS = 10000
+
+# Exploration : un moteur mesuré moins de EXPLORATION_RUNS fois, ou pas depuis
+# EXPLORATION_PERIOD calibrations du bridge, remplace le moins cher si son
+# estimation ne dépasse pas EXPLORATION_FACTOR × celle du moins cher
+EXPLORATION_RUNS = 3
+EXPLORATION_PERIOD = 50
+EXPLORATION_FACTOR = 1.5
+
+
+def sequence_stats(
+    sequences: List[List],
+    weights: Optional[List[int]],
+    min_support: float
+) -> Dict[str, Any]:
+    """
+    Statistiques d'entrée du modèle de coût (une passe sur les séquences)
+    
+    Args:
+        sequences: Séquences de patterns (dédupliquées)
+        weights: Multiplicité de chaque séquence
+        min_support: Support minimum
+    
+    Returns:
+        sequences, items, pairs, triplets, vocabulary, frequent_item_ratio
+    """
+    if weights is None:
+        weights = [1] * len(sequences)
+    total_sequences = sum(weights)
+    
+    label_counts: Dict[Any, int] = {}
+    items = pairs = triplets = 0
+    
+    for seq, weight in zip(sequences, weights):
+        for label in seq:
+            label_counts[label] = label_counts.get(label, 0) + weight
+        items += len(seq)
+        pairs += max(len(seq) - 1, 0)
+        triplets += max(len(seq) - 2, 0)
+    
+    occurrences = sum(label_counts.values())
+    frequent = sum(
+        count for count in label_counts.values()
+        if total_sequences and count / total_sequences >= min_support
+    )
+    
+    return {
+        "sequences": len(sequences),
+        "items": items,
+        "pairs": pairs,
+        "triplets": triplets,
+        "vocabulary": len(label_counts),
+        "frequent_item_ratio": round(frequent / occurrences, 4) if occurrences else 0.0
+    }
+
+
+def estimate_ops(stats: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Nombre d'opérations de chaque moteur
+    
+    Apriori encode les séquences puis ne compte que les n-grams dont tous les
+    items sont fréquents : une paire survit avec probabilité ~p², un triplet ~p³.
+    """
+    ngrams = stats["pairs"] + stats["triplets"]
+    p = stats["frequent_item_ratio"]
+    
+    return {
+        'naive': ngrams,
+        'fused': ngrams,
+        'apriori': stats["items"] + stats["pairs"] * p ** 2 + stats["triplets"] * p ** 3,
+        'approximate': ngrams
+    }
+
+
+def select_engine(
+    stats: Dict[str, Any],
+    engines: Iterable[str],
+    history: Optional[Dict[str, Dict[str, Any]]] = None,
+    exact: bool = True
+) -> Dict[str, Any]:
+    """
+    Choisir le moteur de coût estimé minimal (ou un moteur proche à explorer)
+    
+    Args:
+        stats: Statistiques de sequence_stats()
+        engines: Moteurs proposés par le bridge
+        history: Calibration par moteur ({"us_per_op", "runs"})
+        exact: N'autoriser que les moteurs exacts
+    
+    Returns:
+        Décision (moteur, coûts estimés, calibration utilisée)
+    """
+    history = history or {}
+    ops = estimate_ops(stats)
+    
+    candidates = [
+        engine for engine in engines
+        if not exact or engine in EXACT_ENGINES
+    ]
+    if not candidates:
+        raise ValueError(f"No engine satisfies exactness among {list(engines)}")
+    
+    estimates = {}
+    for engine in candidates:
+        us_per_op = history.get(engine, {}).get('us_per_op', DEFAULT_US_PER_OP[engine])
+        estimates[engine] = round(ops[engine] * us_per_op / 1000, 2)
+    
+    cheapest = min(candidates, key=lambda engine: estimates[engine])
+    selected = cheapest
+    
+    # Le moins cher sera recalibré par cette exécution : n'explorer que sinon
+    explore = [
+        engine for engine in candidates
+        if needs_calibration(history, engine)
+        and ops[engine] >= MIN_CALIBRATION_OPS
+        and estimates[engine] <= EXPLORATION_FACTOR * estimates[cheapest]
+    ]
+    if explore and cheapest not in explore:
+        selected = min(explore, key=lambda engine: (history.get(engine, {}).get('runs', 0), estimates[engine]))
+        logger.info(f"Engine selection: exploring {selected} instead of {cheapest} (estimates ms: {estimates})")
+    else:
+        logger.info(f"Engine selection: {selected} (estimates ms: {estimates})")
+    
+    return {
+        "engine": selected,
+        "cheapest": cheapest,
+        "explored": selected != cheapest,
+        "exact": exact,
+        "estimates_ms": estimates,
+        "estimated_ms": estimates[selected],
+        "ops": ops[selected],
+        "calibrated": sorted(engine for engine in candidates if engine in history),
+        "stats": stats
+    }
+
+
+def needs_calibration(history: Dict[str, Dict[str, Any]], engine: str) -> bool:
+    """Moteur jamais assez mesuré, ou dont la calibration date de EXPLORATION_PERIOD calibrations"""
+    entry = history.get(engine)
+    if entry is None or entry.get('runs', 0) < EXPLORATION_RUNS:
+        return True
+    
+    total_runs = sum(other.get('runs', 0) for other in history.values())
+    return total_runs - entry.get('calibrated_at', 0) >= EXPLORATION_PERIOD
+
+
+def load_engine_history(bridge: str, versions_file: str = VERSIONS_FILE) -> Dict[str, Dict[str, Any]]:
+    """Calibration enregistrée pour un bridge (vide si absente)"""
+    try:
+        with open(versions_file, 'r') as f:
+            versions = json.load(f)
+        return versions['bridges'][bridge].get('engines', {})
+    except (OSError, ValueError, KeyError) as e:
+        logger.debug(f"No engine history for {bridge}: {e}")
+        return {}
+
+
+def record_engine_run(history: Dict[str, Dict[str, Any]], engine: str, ops: float, duration_ms: float):
+    """
+    Recalibrer les µs par opération d'un moteur avec une exécution mesurée
+    
+    Args:
+        history: Calibration par moteur (modifiée en place)
+        engine: Moteur exécuté
+        ops: Opérations estimées de l'exécution
+        duration_ms: Durée mesurée
+    """
+    if ops < MIN_CALIBRATION_OPS:
+        return
+    
+    measured = duration_ms * 1000 / ops
+    entry = history.setdefault(engine, {"us_per_op": DEFAULT_US_PER_OP[engine], "runs": 0})
+    
+    entry["us_per_op"] = round(
+        (1 - CALIBRATION_ALPHA) * entry["us_per_op"] + CALIBRATION_ALPHA * measured, 4
+    )
+    entry["runs"] += 1
+    # Rang de la calibration parmi celles du bridge (voir needs_calibration)
+    entry["calibrated_at"] = sum(other.get('runs', 0) for other in history.values())
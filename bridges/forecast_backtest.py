@@ -0,0 +1,230 @@
+"""
+Forecast Backtest - Backtest rolling-origin des forecasts HyperTS
+
+Mesure si les probabilités ML prédisent vraiment les commits suivants.
+La timeline est parcourue une seule fois : à chaque origine t, le modèle
+(`IncrementalForecaster`) ne connaît que les events 0..t, prédit les events
+t+1..t+H, puis absorbe l'event t+1. Pas de réapprentissage par origine :
+O(n × H × vocabulaire) au lieu de O(n²).
+
+Deux prévisionnistes sont évalués :
+- `frequency` : la probabilité ML actuelle de HyperTS (fréquence historique
+  × atténuation d'horizon, voir forecast_models.horizon_decay)
+- `transition` : P(pattern à t + h | patterns à t), repli sur la part
+  d'events contenant le pattern tant que les transitions sont inconnues
+
+Métriques par horizon 1..H : accuracy (le pattern le plus probable apparaît
+bien à t + h), Brier score (sur chaque pattern du vocabulaire), et courbe de
+calibration (probabilité prédite moyenne vs fréquence observée par tranche).
+
+Le corpus est évalué en parallèle (un process par timeline).
+"""
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Set
+
+from forecast_models import IncrementalForecaster
+from timeline_reader import read_timeline_file, timeline_paths
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CALIBRATION_BINS = 10
+FORECASTERS = ('frequency', 'transition')
+
+
+class ForecastScore:
+    """Accumulateur de métriques (fusionnable entre repos)"""
+    
+    def __init__(self, max_horizon: int, bins: int = DEFAULT_CALIBRATION_BINS):
+        self.max_horizon = max_horizon
+        self.bins = bins
+        
+        # Par horizon : [prédictions top-1, succès top-1, termes Brier, somme Brier]
+        self.horizons = [[0, 0, 0, 0.0] for _ in range(max_horizon + 1)]
+        
+        # Par tranche de probabilité : [nombre, somme prédite, somme observée]
+        self.calibration = [[0, 0.0, 0] for _ in range(bins)]
+    
+    def add(self, horizon: int, probabilities: Dict[str, float], outcome: Set[str]):
+        """
+        Scorer une prédiction pour l'event t + horizon
+        
+        Args:
+            horizon: Horizon de la prédiction
+            probabilities: Pattern → probabilité prédite
+            outcome: Patterns réellement présents dans l'event cible
+        """
+        stats = self.horizons[horizon]
+        
+        if probabilities:
+            # Égalités départagées par nom : résultat identique d'un process à l'autre
+            best = max(sorted(probabilities), key=probabilities.get)
+            stats[0] += 1
+            stats[1] += best in outcome
+        
+        # Brier sur le vocabulaire connu + les patterns observés (prédits à 0)
+        for pattern in sorted(probabilities.keys() | outcome):
+            p = probabilities.get(pattern, 0.0)
+            y = 1 if pattern in outcome else 0
+            stats[2] += 1
+            stats[3] += (p - y) ** 2
+            
+            bucket = self.calibration[min(int(p * self.bins), self.bins - 1)]
+            bucket[0] += 1
+            bucket[1] += p
+            bucket[2] += y
+    
+    def merge(self, other: 'ForecastScore'):
+        """Ajouter les compteurs d'un autre accumulateur (même H et bins)"""
+        for mine, theirs in zip(self.horizons, other.horizons):
+            for i in range(4):
+                mine[i] += theirs[i]
+        
+        for mine, theirs in zip(self.calibration, other.calibration):
+            for i in range(3):
+                mine[i] += theirs[i]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Métriques agrégées par horizon, globales et courbe de calibration"""
+        horizons = []
+        for h in range(1, self.max_horizon + 1):
+            predictions, hits, terms, brier = self.horizons[h]
+            horizons.append({
+                "horizon": h,
+                "predictions": predictions,
+                "accuracy": round(hits / predictions, 4) if predictions else None,
+                "brier": round(brier / terms, 4) if terms else None
+            })
+        
+        predictions = sum(stats[0] for stats in self.horizons)
+        hits = sum(stats[1] for stats in self.horizons)
+        terms = sum(stats[2] for stats in self.horizons)
+        brier = sum(stats[3] for stats in self.horizons)
+        
+        calibration = [
+            {
+                "bin": [round(i / self.bins, 3), round((i + 1) / self.bins, 3)],
+                "count": count,
+                "mean_predicted": round(predicted / count, 4),
+                "observed_rate": round(observed / count, 4)
+            }
+            for i, (count, predicted, observed) in enumerate(self.calibration)
+            if count
+        ]
+        
+        return {
+            "accuracy": round(hits / predictions, 4) if predictions else None,
+            "brier": round(brier / terms, 4) if terms else None,
+            "horizons": horizons,
+            "calibration": calibration
+        }
+
+
+def backtest_events(
+    events: List[Dict],
+    max_horizon: int = 5,
+    bins: int = DEFAULT_CALIBRATION_BINS,
+    min_history: int = 1
+) -> Dict[str, ForecastScore]:
+    """
+    Backtest rolling-origin d'une timeline en une passe
+    
+    Args:
+        events: Events de la timeline (ordre chronologique)
+        max_horizon: Horizon maximal H
+        bins: Nombre de tranches de calibration
+        min_history: Events vus avant la première origine
+    
+    Returns:
+        Prévisionniste → accumulateur de métriques
+    """
+    patterns = [event.get('patterns', []) for event in events]
+    outcomes = [set(event_patterns) for event_patterns in patterns]
+    model = IncrementalForecaster(max_horizon)
+    scores = {name: ForecastScore(max_horizon, bins) for name in FORECASTERS}
+    
+    for t, current in enumerate(patterns):
+        model.update(current)
+        
+        if t + 1 < min_history:
+            continue
+        
+        for h in range(1, max_horizon + 1):
+            if t + h >= len(outcomes):
+                break
+            
+            outcome = outcomes[t + h]
+            scores['frequency'].add(h, model.frequency_probabilities(h), outcome)
+            
+            transition = model.transition_probabilities(h)
+            if transition is None:
+                transition = model.occurrence_probabilities()
+            scores['transition'].add(h, transition, outcome)
+    
+    return scores
+
+
+def backtest_file(path: str, max_horizon: int, bins: int, min_history: int) -> Dict[str, Any]:
+    """Backtest d'un fichier timeline (exécuté dans un process du pool)"""
+    data = read_timeline_file(path)
+    events = data if isinstance(data, list) else data.get('events', [])
+    repo = None if isinstance(data, list) else data.get('repo')
+    
+    return {
+        "repo": repo or os.path.basename(path),
+        "events": len(events),
+        "scores": backtest_events(events, max_horizon, bins, min_history)
+    }
+
+
+def backtest_corpus(
+    paths: List[str],
+    max_horizon: int = 5,
+    bins: int = DEFAULT_CALIBRATION_BINS,
+    min_history: int = 1,
+    workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Backtest de plusieurs timelines en parallèle
+    
+    Args:
+        paths: Fichiers timeline
+        max_horizon: Horizon maximal H
+        bins: Nombre de tranches de calibration
+        min_history: Events vus avant la première origine
+        workers: Nombre de process (défaut : nombre de CPU)
+    
+    Returns:
+        Métriques par repo et agrégées sur le corpus
+    """
+    totals = {name: ForecastScore(max_horizon, bins) for name in FORECASTERS}
+    repos = []
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(backtest_file, path, max_horizon, bins, min_history)
+            for path in paths
+        ]
+        
+        for future in futures:
+            result = future.result()
+            for name, score in result['scores'].items():
+                totals[name].merge(score)
+            
+            repos.append({
+                "repo": result['repo'],
+                "events": result['events'],
+                "forecasters": {name: score.to_dict() for name, score in result['scores'].items()}
+            })
+    
+    return {
+        "repos": repos,
+        "corpus": {name: score.to_dict() for name, score in totals.items()}
+    }
+
+
+def corpus_paths(corpus_dir: str) -> List[str]:
+    """Timelines `timeline_*` d'un dossier (brutes, compressées ou NDJSON), triées"""
+    return timeline_paths(corpus_dir)
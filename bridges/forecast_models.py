@@ -0,0 +1,129 @@
+"""
+Forecast Models - Modèles de prévision partagés par le bridge HyperTS
+
+- `horizon_decay` : atténuation de la probabilité ML avec l'horizon (la même
+  formule que `HyperTSBridge._enrich_forecasts`)
+- `IncrementalForecaster` : statistiques de fréquence et de transitions
+  décalées (pattern à t → pattern à t + h), mises à jour event par event.
+  Le backtest (forecast_backtest.py) s'en sert pour évaluer à chaque origine
+  sans réapprendre depuis le début de la timeline.
+"""
+
+from collections import deque
+from typing import List, Dict, Iterable, Optional
+
+# Probabilité minimale conservée après atténuation par l'horizon
+MIN_HORIZON_DECAY = 0.3
+HORIZON_DECAY_STEP = 0.1
+
+
+def horizon_decay(horizon: int) -> float:
+    """Facteur d'atténuation pour un horizon donné (plus loin = moins certain)"""
+    return max(MIN_HORIZON_DECAY, 1.0 - (horizon * HORIZON_DECAY_STEP))
+
+
+class IncrementalForecaster:
+    """Fréquences + transitions décalées 1..max_horizon, mises à jour en O(patterns)"""
+    
+    def __init__(self, max_horizon: int):
+        if max_horizon < 1:
+            raise ValueError(f"max_horizon must be >= 1, got {max_horizon!r}")
+        
+        self.max_horizon = max_horizon
+        self.events = 0
+        self.total_patterns = 0
+        self.pattern_counts: Dict[str, int] = {}
+        self.event_counts: Dict[str, int] = {}
+        
+        # Par horizon h : nombre d'events suivis (à h) d'un event contenant a,
+        # et nombre de fois où b apparaît h events après a
+        self.source_counts: List[Dict[str, int]] = [{} for _ in range(max_horizon + 1)]
+        self.transition_counts: List[Dict[str, Dict[str, int]]] = [{} for _ in range(max_horizon + 1)]
+        
+        self._recent: deque = deque(maxlen=max_horizon)
+    
+    def update(self, patterns: Iterable[str]):
+        """Ajouter l'event suivant de la timeline"""
+        # Dédoublonné dans l'ordre de l'event : les sommes flottantes ne
+        # dépendent pas de l'ordre d'itération des sets (PYTHONHASHSEED)
+        patterns = list(patterns)
+        current = tuple(dict.fromkeys(patterns))
+        
+        for h in range(1, len(self._recent) + 1):
+            sources = self.source_counts[h]
+            transitions = self.transition_counts[h]
+            
+            for a in self._recent[-h]:
+                sources[a] = sources.get(a, 0) + 1
+                targets = transitions.setdefault(a, {})
+                for b in current:
+                    targets[b] = targets.get(b, 0) + 1
+        
+        for pattern in patterns:
+            self.pattern_counts[pattern] = self.pattern_counts.get(pattern, 0) + 1
+            self.total_patterns += 1
+        
+        for pattern in current:
+            self.event_counts[pattern] = self.event_counts.get(pattern, 0) + 1
+        
+        self.events += 1
+        self._recent.append(current)
+    
+    @property
+    def vocabulary(self) -> List[str]:
+        """Patterns déjà observés"""
+        return list(self.pattern_counts)
+    
+    def frequency_probabilities(self, horizon: int) -> Dict[str, float]:
+        """
+        Probabilité ML de HyperTS : fréquence historique × atténuation d'horizon
+        
+        Args:
+            horizon: Horizon de prédiction
+        
+        Returns:
+            Dict pattern → probabilité
+        """
+        if self.total_patterns == 0:
+            return {}
+        
+        decay = horizon_decay(horizon)
+        return {
+            pattern: count / self.total_patterns * decay
+            for pattern, count in self.pattern_counts.items()
+        }
+    
+    def transition_probabilities(self, horizon: int) -> Optional[Dict[str, float]]:
+        """
+        P(b dans l'event t + h | patterns de l'event t), moyenne sur les patterns
+        de l'event courant ayant déjà des transitions observées à cet horizon
+        
+        Args:
+            horizon: Horizon de prédiction (1..max_horizon)
+        
+        Returns:
+            Dict pattern → probabilité, ou None sans statistique exploitable
+        """
+        if not self._recent:
+            return None
+        
+        sources = self.source_counts[horizon]
+        transitions = self.transition_counts[horizon]
+        known = [a for a in self._recent[-1] if sources.get(a)]
+        
+        if not known:
+            return None
+        
+        probabilities: Dict[str, float] = {}
+        for a in known:
+            total = sources[a]
+            for b, count in transitions[a].items():
+                probabilities[b] = probabilities.get(b, 0.0) + count / total
+        
+        return {b: p / len(known) for b, p in probabilities.items()}
+    
+    def occurrence_probabilities(self) -> Dict[str, float]:
+        """Part des events passés contenant chaque pattern (repli des transitions)"""
+        if self.events == 0:
+            return {}
+        return {pattern: count / self.events for pattern, count in self.event_counts.items()}
@@ -14,9 +14,20 @@ import sys
 import json
 import time
 import logging
-from typing import List, Dict, Any
-from datetime import datetime
-import hashlib
+from typing import List, Dict, Any, Optional
+
+from timeline_windows import extract_sequences
+from pattern_counters import SpillingCounter, SpaceSavingCounter
+from sequence_miners import mine_frequent_ngrams, condense_patterns, PATTERN_MODES
+from bridge_io import (
+    NDJSONWriter, ProgressReporter, is_streaming, DEFAULT_PROGRESS_INTERVAL_S,
+    resolve_timeline_input, write_result_file, print_error, update_bridge_versions
+)
+from deadline import Deadline, order_by_weight
+from progressive_sampling import mine_progressive, sampling_params
+from result_diff import result_fingerprint, diff_response
+from threshold_sweep import sweep_thresholds, sweep_patterns, DEFAULT_HISTOGRAM_BINS
+from engine_selector import sequence_stats, select_engine, load_engine_history, record_engine_run
 
 # Configuration du logger
 logging.basicConfig(
@@ -29,15 +40,39 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Nombre de séquences entre deux points de contrôle (progression)
+CHECKPOINT_EVERY = 1024
+
 
 class FPGrowthBridge:
     """Bridge pour FP-Growth - High-performance pattern mining"""
     
     VERSION = "1.0.0"
     
+    # Moteurs de comptage disponibles (voir engine_selector.py)
+    ENGINES = ('naive', 'fused', 'apriori', 'approximate')
+    
     def __init__(self):
         self.start_time = None
         self.patterns_found = 0
+        self.windowing = {}
+        self.weights = None
+        self.counting = None
+        self.sketch = None
+        self.levels = None
+        self.writer = None
+        self.progress = None
+        self.deadline = None
+        self.partial = False
+        self.coverage = 1.0
+        self.engine = None
+        self.selection = None
+        self.pattern_mode = 'all'
+        self.compression = None
+        self.denominators = {}
+        self.sweep = None
+        self.sampling = None
+        self.fingerprint = None
         
     def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -58,16 +93,73 @@ class FPGrowthBridge:
         min_support = config.get('min_support', 0.3)
         min_confidence = config.get('min_confidence', 0.5)
         
+        # Mode streaming : records NDJSON sur stdout + heartbeats sur stderr
+        if is_streaming(config):
+            self.writer = NDJSONWriter()
+            self.progress = ProgressReporter(
+                'fpgrowth',
+                config.get('progress_interval_s', DEFAULT_PROGRESS_INTERVAL_S)
+            )
+        
         logger.info(f"Processing repo: {repo}, timeline size: {len(timeline)} (HIGH VOLUME)")
         
         try:
+            # Deadline comptée depuis le début du traitement (parse inclus)
+            self.deadline = Deadline.from_config(config, self.start_time)
+            
             # Extraire séquences
-            sequences = self._extract_sequences(timeline)
+            sequences = self._extract_sequences(timeline, config)
+            self._checkpoint(
+                events_processed=len(timeline),
+                sequences=self.windowing['sequences'],
+                unique_sequences=len(sequences)
+            )
             
             # Appliquer FP-Growth optimisé
-            patterns = self._mine_patterns_fpgrowth(sequences, min_support, min_confidence)
+            # Balayage de seuils : un seul comptage au seuil le plus bas
+            thresholds = None
+            mine_config = config
+            if config.get('sweep') is not None:
+                if config.get('sampling'):
+                    raise ValueError("sweep and sampling cannot be combined: each threshold needs its own stopping rule")
+                thresholds = sweep_thresholds(config['sweep'], min_support, min_confidence)
+                min_support = min(support for support, _ in thresholds)
+                min_confidence = min(confidence for _, confidence in thresholds)
+                # Condensation (closed / maximal) appliquée à chaque seuil
+                mine_config = {**config, 'pattern_mode': 'all'}
+            
+            patterns = self._run_miner(sequences, min_support, min_confidence, mine_config)
+            
+            data = patterns
+            if thresholds is not None:
+                data = sweep_patterns(
+                    patterns,
+                    self.denominators,
+                    thresholds,
+                    config.get('sweep_output', 'patterns'),
+                    config.get('pattern_mode', 'all'),
+                    config.get('histogram_bins', DEFAULT_HISTOGRAM_BINS)
+                )
+                self.sweep = {
+                    "counting_passes": 1,
+                    "thresholds": [
+                        {key: entry[key] for key in ('min_support', 'min_confidence', 'patterns_found')}
+                        for entry in data['thresholds']
+                    ]
+                }
             
             self.patterns_found = len(patterns)
+            self.fingerprint = result_fingerprint(data)
+            
+            if self.writer is not None and thresholds is not None:
+                # Les records `pattern` sont ceux du seuil le plus bas : résultat par seuil à part
+                self.writer.write({"type": "sweep", "data": data})
+            
+            # Résultat conservé / réduit au diff demandé (hors sortie en flux : patterns déjà émis)
+            diff = None
+            if self.writer is None:
+                data, diff = diff_response(data, self.fingerprint, 'fpgrowth', repo, config)
+            
             duration_ms = int((time.time() - self.start_time) * 1000)
             
             # Mettre à jour bridges_versions.json
@@ -77,13 +169,26 @@ class FPGrowthBridge:
             
             return {
                 "success": True,
-                "data": patterns,
+                "data": data,
                 "metadata": {
                     "duration_ms": duration_ms,
                     "patterns_found": self.patterns_found,
                     "repo": repo,
                     "algorithm": "fp-growth",
-                    "optimization": "high_volume"
+                    "optimization": "high_volume",
+                    "windowing": self.windowing,
+                    "counting": self.counting,
+                    "sketch": self.sketch,
+                    "levels": self.levels,
+                    "partial": self.partial,
+                    "coverage": self.coverage,
+                    "engine": self.engine,
+                    "selection": self.selection,
+                    "compression": self.compression,
+                    "sweep": self.sweep,
+                    "sampling": self.sampling,
+                    "fingerprint": self.fingerprint,
+                    "diff": diff
                 }
             }
             
@@ -99,122 +204,465 @@ class FPGrowthBridge:
                     "repo": repo
                 }
             }
+        
+        finally:
+            if self.progress is not None:
+                self.progress.stop()
     
-    def _extract_sequences(self, timeline: List[Dict]) -> List[List[str]]:
-        """Extraire séquences (identique à PAMI)"""
-        sequences = []
-        window_size = 5
+    def _extract_sequences(self, timeline: List[Dict], config: Dict[str, Any]) -> List[List[str]]:
+        """Extraire séquences (identique à PAMI, voir timeline_windows.py)"""
+        sequences, self.weights, self.windowing = extract_sequences(timeline, config)
+        return sequences
+    
+    def _run_miner(
+        self,
+        sequences: List[List[str]],
+        min_support: float,
+        min_confidence: float,
+        config: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Choisir le miner selon la config (identique à PAMI)"""
+        if self.deadline is not None:
+            sequences, self.weights = order_by_weight(sequences, self.weights)
+        
+        # Résultat condensé : validé avant le mining, émis une fois filtré
+        self.pattern_mode = config.get('pattern_mode', 'all')
+        if self.pattern_mode not in PATTERN_MODES:
+            raise ValueError(f"Unknown pattern mode {self.pattern_mode!r}, expected one of {PATTERN_MODES}")
+        
+        if config.get('sampling'):
+            # Échantillons croissants : remplace le moteur de comptage
+            self.engine = 'sampling'
+        else:
+            self.engine = self._resolve_engine(sequences, min_support, config)
+        mine_start = time.time()
         
-        for i in range(len(timeline) - window_size + 1):
-            window = timeline[i:i + window_size]
-            sequence = []
+        if self.engine == 'sampling':
+            patterns = self._mine_patterns_sampled(
+                sequences,
+                min_support,
+                min_confidence,
+                config.get('max_length') or 3,
+                sampling_params(config['sampling']),
+                self.weights
+            )
+        elif self.engine == 'apriori':
+            patterns = self._mine_patterns_apriori(
+                sequences,
+                min_support,
+                min_confidence,
+                config.get('max_length') or 3,
+                self.weights
+            )
+        elif self.engine == 'approximate':
+            patterns = self._mine_patterns_approximate(
+                sequences,
+                min_support,
+                min_confidence,
+                config.get('sketch_capacity'),
+                config.get('epsilon'),
+                self.weights
+            )
+        else:
+            patterns = self._mine_patterns_fpgrowth(
+                sequences,
+                min_support,
+                min_confidence,
+                config.get('memory_budget_mb'),
+                config.get('spill_dir'),
+                self.weights,
+                fused=self.engine != 'naive'
+            )
+        
+        if self.selection is not None:
+            self.selection['actual_ms'] = round((time.time() - mine_start) * 1000, 2)
+        
+        if self.pattern_mode != 'all':
+            patterns, self.compression = condense_patterns(patterns, self.pattern_mode)
             
-            for event in window:
-                patterns = event.get('patterns', [])
-                sequence.extend(patterns)
+            logger.info(
+                f"{self.pattern_mode.capitalize()} patterns: {self.compression['patterns_after']}"
+                f"/{self.compression['patterns_before']} (×{self.compression['compression_ratio']})"
+            )
             
-            if len(sequence) >= 2:
-                sequences.append(sequence)
+            if self.writer is not None:
+                for pattern in patterns:
+                    self.writer.write({"type": "pattern", "data": pattern})
         
-        return sequences
+        return patterns
+    
+    def _resolve_engine(
+        self,
+        sequences: List[List[str]],
+        min_support: float,
+        config: Dict[str, Any]
+    ) -> str:
+        """
+        Moteur de comptage à utiliser
+        
+        `config.engine` explicite, `"auto"` (modèle de coût, voir
+        engine_selector.py), ou à défaut déduit de max_length / counting.
+        
+        Args:
+            sequences: Séquences de patterns (dédupliquées, voir self.weights)
+            min_support: Support minimum
+            config: Config de l'input
+            
+        Returns:
+            Nom du moteur (un de ENGINES)
+        """
+        engine = config.get('engine')
+        
+        if engine is None:
+            if config.get('max_length') is not None:
+                return 'apriori'
+            if config.get('counting') == 'approximate':
+                return 'approximate'
+            return 'fused'
+        
+        if engine != 'auto':
+            if engine not in self.ENGINES:
+                raise ValueError(f"Unknown engine {engine!r}, expected one of {self.ENGINES} or 'auto'")
+            return engine
+        
+        engines = self.ENGINES
+        if config.get('max_length') not in (None, 3):
+            # Seul Apriori mine au-delà des triplets
+            engines = ('apriori',)
+        elif config.get('memory_budget_mb'):
+            # Apriori n'a pas de déversement sur disque
+            engines = tuple(engine for engine in engines if engine != 'apriori')
+        
+        default_exactness = 'approximate' if config.get('counting') == 'approximate' else 'exact'
+        exact = config.get('exactness', default_exactness) == 'exact'
+        
+        self.selection = select_engine(
+            sequence_stats(sequences, self.weights, min_support),
+            engines,
+            load_engine_history('fpgrowth'),
+            exact
+        )
+        return self.selection['engine']
     
     def _mine_patterns_fpgrowth(
         self,
         sequences: List[List[str]],
         min_support: float,
-        min_confidence: float
+        min_confidence: float,
+        memory_budget_mb: Optional[float] = None,
+        spill_dir: Optional[str] = None,
+        weights: Optional[List[int]] = None,
+        fused: bool = True
     ) -> List[Dict[str, Any]]:
         """
         FP-Growth optimisé pour grands volumes
         
         Note: Version simplifiée. L'intégration complète utilisera pyfpgrowth.
+        Avec `memory_budget_mb`, le comptage déverse sur disque (SpillingCounter).
+        Avec `fused=False` (moteur `naive`), une passe par longueur comme PAMI.
         """
-        # Utilise la même logique que PAMI mais optimisée
-        pattern_counts = {}
-        total_sequences = len(sequences)
+        if weights is None:
+            weights = [1] * len(sequences)
+        total_sequences = sum(weights)
         
         if total_sequences == 0:
             return []
         
-        # Mining optimisé (utilise dict au lieu de list)
-        for seq in sequences:
-            # Paires
-            for i in range(len(seq) - 1):
-                pair = tuple(seq[i:i+2])
-                pattern_counts[pair] = pattern_counts.get(pair, 0) + 1
+        # Utilise la même logique que PAMI mais optimisée
+        if memory_budget_mb:
+            pattern_counts = SpillingCounter(memory_budget_mb, spill_dir)
+        else:
+            pattern_counts = {}
+        
+        if fused:
+            # Mining optimisé (utilise dict au lieu de list)
+            n = 0
+            for n, (seq, weight) in enumerate(zip(sequences, weights), 1):
+                # Paires
+                for i in range(len(seq) - 1):
+                    pair = tuple(seq[i:i+2])
+                    pattern_counts[pair] = pattern_counts.get(pair, 0) + weight
             
-            # Triplets (limité pour performance)
-            for i in range(len(seq) - 2):
-                triplet = tuple(seq[i:i+3])
-                pattern_counts[triplet] = pattern_counts.get(triplet, 0) + 1
+                # Triplets (limité pour performance)
+                for i in range(len(seq) - 2):
+                    triplet = tuple(seq[i:i+3])
+                    pattern_counts[triplet] = pattern_counts.get(triplet, 0) + weight
+            
+                if n % CHECKPOINT_EVERY == 0 and self._checkpoint(sequences_processed=n, candidates=len(pattern_counts)):
+                    break
+            counted = {2: sum(weights[:n]), 3: sum(weights[:n])}
+        else:
+            # Une passe par longueur : paires, puis triplets s'il reste du temps
+            counted = {2: 0, 3: 0}
+            for length, stage in ((2, 'pairs'), (3, 'triplets')):
+                n = 0
+                if length == 3 and self._deadline_expired():
+                    break
+                for n, (seq, weight) in enumerate(zip(sequences, weights), 1):
+                    for i in range(len(seq) - length + 1):
+                        ngram = tuple(seq[i:i+length])
+                        pattern_counts[ngram] = pattern_counts.get(ngram, 0) + weight
+                    
+                    if n % CHECKPOINT_EVERY == 0 and self._checkpoint(stage=stage, sequences_processed=n, candidates=len(pattern_counts)):
+                        break
+                counted[length] = sum(weights[:n])
+        
+        # Deadline atteinte : supports estimés sur les séquences effectivement comptées
+        self._record_coverage(counted[2] + counted[3], 2 * total_sequences)
+        self.denominators = counted
         
         # Filtrage rapide
         patterns = []
         for pattern_tuple, count in pattern_counts.items():
-            support = count / total_sequences
+            support = count / counted[len(pattern_tuple)]
             
             if support >= min_support:
                 confidence = min(1.0, support * 1.5)
                 
                 if confidence >= min_confidence:
-                    patterns.append({
+                    pattern = {
                         "sequence": list(pattern_tuple),
                         "support": round(support, 3),
                         "confidence": round(confidence, 3),
                         "frequency": count
-                    })
+                    }
+                    patterns.append(pattern)
+                    self._emit(pattern)
+        
+        if memory_budget_mb:
+            self.counting = pattern_counts.stats()
         
         patterns.sort(key=lambda x: x['support'], reverse=True)
         return patterns
     
-    def _update_versions(self, repo: str, duration_ms: int):
-        """Mettre à jour bridges_versions.json"""
-        try:
-            versions_file = '.reasoning_rl4/meta/bridges_versions.json'
+    def _mine_patterns_apriori(
+        self,
+        sequences: List[List[str]],
+        min_support: float,
+        min_confidence: float,
+        max_length: int,
+        weights: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Mining level-wise Apriori des n-grams 2..max_length (identique à PAMI)"""
+        if weights is None:
+            weights = [1] * len(sequences)
+        total_sequences = sum(weights)
+        
+        if total_sequences == 0:
+            return []
+        
+        patterns = []
+        
+        # Un niveau terminé est définitif : ses patterns sont émis sans attendre la fin
+        def on_level(length: int, level_counts: Dict[tuple, int], counted_weight: int):
+            self.denominators[length] = counted_weight
+            for pattern_tuple, count in level_counts.items():
+                support = count / counted_weight
+                confidence = min(1.0, support * 1.5)
+                
+                if confidence >= min_confidence:
+                    pattern = {
+                        "sequence": list(pattern_tuple),
+                        "support": round(support, 3),
+                        "confidence": round(confidence, 3),
+                        "frequency": count
+                    }
+                    patterns.append(pattern)
+                    self._emit(pattern)
             
-            with open(versions_file, 'r') as f:
-                versions = json.load(f)
+            self._checkpoint(level=length, frequent=len(level_counts), patterns=len(patterns))
+        
+        _, self.levels = mine_frequent_ngrams(
+            sequences, min_support, max_length, weights, on_level,
+            self._deadline_expired if self.deadline is not None else None
+        )
+        
+        # Niveau interrompu par la deadline : niveaux suivants non minés
+        if self.levels and self.levels[-1].get('interrupted'):
+            done = sum(level.get('coverage', 1.0) for level in self.levels)
+            self._record_coverage(done, max_length - 1)
+        
+        patterns.sort(key=lambda x: x['support'], reverse=True)
+        return patterns
+    
+    def _mine_patterns_approximate(
+        self,
+        sequences: List[List[str]],
+        min_support: float,
+        min_confidence: float,
+        capacity: Optional[int] = None,
+        epsilon: Optional[float] = None,
+        weights: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Mining approximé Space-Saving (identique à PAMI, mémoire fixe, sur-ensemble si `guaranteed`)"""
+        if weights is None:
+            weights = [1] * len(sequences)
+        total_sequences = sum(weights)
+        
+        if total_sequences == 0:
+            return []
+        
+        sketch = SpaceSavingCounter(capacity, epsilon)
+        
+        n = 0
+        for n, (seq, weight) in enumerate(zip(sequences, weights), 1):
+            for i in range(len(seq) - 1):
+                sketch.add(tuple(seq[i:i+2]), weight)
             
-            if 'fpgrowth' in versions.get('bridges', {}):
-                fpgrowth_data = versions['bridges']['fpgrowth']
-                
-                if fpgrowth_data.get('avg_duration_ms'):
-                    old_avg = fpgrowth_data['avg_duration_ms']
-                    fpgrowth_data['avg_duration_ms'] = int((old_avg + duration_ms) / 2)
-                else:
-                    fpgrowth_data['avg_duration_ms'] = duration_ms
-                
-                result_hash = hashlib.sha256(str(self.patterns_found).encode()).hexdigest()[:8]
-                fpgrowth_data['result_hash'] = result_hash
-                fpgrowth_data['last_used'] = datetime.utcnow().isoformat() + 'Z'
-                fpgrowth_data['status'] = 'active'
-                
-                versions['meta']['last_updated'] = datetime.utcnow().isoformat() + 'Z'
-                
-                with open(versions_file, 'w') as f:
-                    json.dump(versions, f, indent=2)
-                
-        except Exception as e:
-            logger.warning(f"Failed to update bridges_versions.json: {e}")
+            for i in range(len(seq) - 2):
+                sketch.add(tuple(seq[i:i+3]), weight)
+            
+            if n % CHECKPOINT_EVERY == 0 and self._checkpoint(sequences_processed=n, candidates=len(sketch)):
+                break
+        
+        counted = sum(weights[:n])
+        self._record_coverage(counted, total_sequences)
+        total_sequences = counted
+        self.denominators = {2: counted, 3: counted}
+        
+        patterns = []
+        for pattern_tuple, count, error in sketch.heavy_hitters(min_support * total_sequences):
+            support = count / total_sequences
+            confidence = min(1.0, support * 1.5)
+            
+            if confidence >= min_confidence:
+                pattern = {
+                    "sequence": list(pattern_tuple),
+                    "support": round(support, 3),
+                    "confidence": round(confidence, 3),
+                    "frequency": count,
+                    "error_bound": error,
+                    "guaranteed_support": round((count - error) / total_sequences, 3)
+                }
+                patterns.append(pattern)
+                self._emit(pattern)
+        
+        guaranteed = sketch.guarantees(min_support * total_sequences)
+        if not guaranteed:
+            logger.warning(
+                f"Sketch too small for min_support {min_support} (min count {sketch.min_count()}): "
+                f"superset not guaranteed, raise sketch_capacity"
+            )
+        
+        self.sketch = {
+            **sketch.stats(),
+            "achieved_support_error": round(sketch.min_count() / total_sequences, 3),
+            "guaranteed": guaranteed
+        }
+        
+        patterns.sort(key=lambda x: x['support'], reverse=True)
+        return patterns
+    
+    def _mine_patterns_sampled(
+        self,
+        sequences: List[List[str]],
+        min_support: float,
+        min_confidence: float,
+        max_length: int,
+        params: Dict[str, Any],
+        weights: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Mining sur échantillons croissants de fenêtres (voir progressive_sampling.py)
+        
+        Args:
+            sequences: Séquences de patterns
+            min_support: Support minimum
+            min_confidence: Confidence minimum
+            max_length: Longueur maximale des n-grams
+            params: Paramètres de config.sampling
+            weights: Multiplicité de chaque séquence (fenêtres dédupliquées)
+        
+        Returns:
+            Patterns avec support estimé et intervalle de confiance
+        """
+        patterns, sampled, self.sampling = mine_progressive(
+            sequences, weights, min_support, min_confidence, max_length, params, self._checkpoint
+        )
+        self.denominators = {length: sampled for length in range(2, max_length + 1)}
+        
+        if self.sampling['stopped'] == 'deadline':
+            self._record_coverage(sampled, self.sampling['total_windows'])
+        
+        for pattern in patterns:
+            self._emit(pattern)
+        
+        return patterns
+    
+    def _emit(self, pattern: Dict[str, Any]):
+        """Écrire un pattern finalisé sur le flux NDJSON (mode streaming)"""
+        # Mode closed / maximal : un pattern n'est définitif qu'une fois le mining terminé
+        if self.writer is not None and self.pattern_mode == 'all':
+            self.writer.write({"type": "pattern", "data": pattern})
+    
+    def _checkpoint(self, **counters) -> bool:
+        """
+        Point de contrôle : publier les compteurs de progression
+        
+        Returns:
+            True si la deadline est passée (le mining doit s'arrêter)
+        """
+        if self.progress is not None:
+            self.progress.update(**counters)
+        return self._deadline_expired()
+    
+    def _deadline_expired(self) -> bool:
+        """La deadline (config.deadline_ms) est-elle passée"""
+        return self.deadline is not None and self.deadline.expired()
+    
+    def _record_coverage(self, done: float, planned: float):
+        """Fraction du travail prévu effectivement faite (résultat partiel si < 1)"""
+        self.coverage = round(done / planned, 4) if planned else 1.0
+        self.partial = done < planned
+        
+        if self.partial:
+            logger.warning(f"Deadline reached: partial result, coverage {self.coverage:.1%}")
+    
+    def _update_versions(self, repo: str, duration_ms: int):
+        """Mettre à jour bridges_versions.json (verrou + remplacement atomique, voir bridge_io.py)"""
+        def calibrate(data: Dict[str, Any]):
+            # Calibration du modèle de coût (engine = "auto")
+            if self.selection is not None and not self.partial:
+                record_engine_run(
+                    data.setdefault('engines', {}),
+                    self.selection['engine'],
+                    self.selection['ops'],
+                    self.selection['actual_ms']
+                )
+            
+        update_bridge_versions('fpgrowth', duration_ms, self.fingerprint, calibrate)
 
 
 def main():
     """Point d'entrée principal"""
+    config: Dict[str, Any] = {}
+    
     try:
         input_data = json.load(sys.stdin)
+        config = input_data.get('config') or {}
+        input_data = resolve_timeline_input(input_data)
         bridge = FPGrowthBridge()
         result = bridge.process(input_data)
-        print(json.dumps(result, indent=2))
+        if bridge.writer is not None:
+            bridge.writer.write({
+                "type": "result",
+                **{key: value for key, value in result.items() if key != 'data'}
+            })
+        elif input_data.get('config', {}).get('result_path'):
+            # Gros résultat : écrit dans un fichier, seul le résumé passe par stdout
+            print(json.dumps(write_result_file(result, input_data['config']['result_path']), indent=2))
+        else:
+            print(json.dumps(result, indent=2))
         sys.exit(0 if result['success'] else 1)
         
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON input: {e}")
-        print(json.dumps({"success": False, "error": str(e), "metadata": {}}, indent=2))
+        print_error({"success": False, "error": str(e), "metadata": {}}, config)
         sys.exit(1)
         
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
-        print(json.dumps({"success": False, "error": str(e), "metadata": {}}, indent=2))
+        print_error({"success": False, "error": str(e), "metadata": {}}, config)
         sys.exit(1)
 
 
@@ -22,6 +22,20 @@ Input (stdin JSON):
   }
 }
 
+Mode backtest (`"mode": "backtest"`) : rejoue la timeline (ou un corpus :
+`"corpus": [chemins]` / `"corpus_dir": ".reasoning_rl4"`, en parallèle) et
+mesure à chaque origine si les probabilités ML prédisent les events suivants.
+Config : `forecast_horizon` (H), `calibration_bins` (10), `min_history` (1),
+`workers`. Output `data` : `repos` (métriques par repo) et `corpus` (agrégées),
+chacun par prévisionniste (`frequency` = ml_probability, `transition`) avec
+`accuracy`, `brier`, `horizons` (1..H) et `calibration`.
+
+Mode query (`"mode": "query"`) : top-N patterns suivants après `context` (ou
+les derniers patterns de `timeline`, ou `queries`: [{repo, context}]), via un
+modèle n-gram de préfixes précalculé sur le corpus (`prefix_model.py`),
+persisté dans `model_path` (`.reasoning_rl4/meta/prefix_model.bin`).
+Config : `top_n` (5), `order` (3), `min_count` (2), `rebuild`, `check_corpus` (true).
+
 Output (stdout JSON):
 {
   "success": true,
@@ -44,13 +58,25 @@ Output (stdout JSON):
 }
 """
 
+import os
 import sys
 import json
 import time
 import logging
-from typing import List, Dict, Any
-from datetime import datetime
-import hashlib
+from typing import List, Dict, Any, Optional
+
+from timeline_index import TimelineIndex
+from bridge_io import resolve_timeline_input, write_result_file, update_bridge_versions
+from timeline_reader import timeline_paths
+from forecast_models import horizon_decay
+from result_diff import result_fingerprint, diff_response
+from prefix_model import (
+    PrefixModel, timeline_stream, corpus_fingerprint,
+    DEFAULT_ORDER, DEFAULT_MIN_COUNT, DEFAULT_TOP_N
+)
+from forecast_backtest import (
+    backtest_events, backtest_corpus, corpus_paths, DEFAULT_CALIBRATION_BINS
+)
 
 # Configuration du logger
 logging.basicConfig(
@@ -63,6 +89,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+DEFAULT_CORPUS_DIR = '.reasoning_rl4'
+DEFAULT_MODEL_PATH = '.reasoning_rl4/meta/prefix_model.bin'
+
 
 class HyperTSBridge:
     """Bridge pour HyperTS - Time Series Forecasting"""
@@ -72,6 +101,7 @@ class HyperTSBridge:
     def __init__(self):
         self.start_time = None
         self.forecasts_enriched = 0
+        self.fingerprint = None
         
     def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -85,6 +115,11 @@ class HyperTSBridge:
         """
         self.start_time = time.time()
         
+        if input_data.get('mode') == 'backtest':
+            return self.backtest(input_data)
+        if input_data.get('mode') == 'query':
+            return self.query(input_data)
+        
         repo = input_data.get('repo', 'unknown')
         forecasts = input_data.get('forecasts', [])
         timeline = input_data.get('timeline', {})
@@ -100,6 +135,10 @@ class HyperTSBridge:
             enriched = self._enrich_forecasts(forecasts, timeline, forecast_horizon, min_confidence)
             self.forecasts_enriched = len(enriched)
             
+            data = {"enriched_forecasts": enriched}
+            self.fingerprint = result_fingerprint(data)
+            data, diff = diff_response(data, self.fingerprint, 'hyperts', repo, config)
+            
             duration_ms = int((time.time() - self.start_time) * 1000)
             
             # Mettre à jour bridges_versions.json
@@ -109,13 +148,13 @@ class HyperTSBridge:
             
             return {
                 "success": True,
-                "data": {
-                    "enriched_forecasts": enriched
-                },
+                "data": data,
                 "metadata": {
                     "duration_ms": duration_ms,
                     "forecasts_enriched": self.forecasts_enriched,
-                    "repo": repo
+                    "repo": repo,
+                    "fingerprint": self.fingerprint,
+                    "diff": diff
                 }
             }
             
@@ -132,12 +171,180 @@ class HyperTSBridge:
                 }
             }
     
+    def backtest(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Backtest rolling-origin des probabilités ML (voir forecast_backtest.py)
+        
+        Args:
+            input_data: timeline (un repo) ou corpus / corpus_dir (plusieurs
+                timelines, traitées en parallèle), config
+        
+        Returns:
+            Accuracy, Brier score et calibration par horizon, par repo et agrégés
+        """
+        repo = input_data.get('repo', 'unknown')
+        config = input_data.get('config', {})
+        
+        max_horizon = config.get('forecast_horizon', 5)
+        bins = config.get('calibration_bins', DEFAULT_CALIBRATION_BINS)
+        min_history = config.get('min_history', 1)
+        
+        try:
+            paths = input_data.get('corpus')
+            if paths is None and input_data.get('corpus_dir'):
+                paths = corpus_paths(input_data['corpus_dir'])
+            
+            if paths is not None:
+                logger.info(f"Backtesting corpus: {len(paths)} timelines, horizon {max_horizon}")
+                data = backtest_corpus(paths, max_horizon, bins, min_history, config.get('workers'))
+            else:
+                events = input_data.get('timeline', {}).get('events', [])
+                logger.info(f"Backtesting repo: {repo}, events: {len(events)}, horizon {max_horizon}")
+                scores = backtest_events(events, max_horizon, bins, min_history)
+                forecasters = {name: score.to_dict() for name, score in scores.items()}
+                data = {
+                    "repos": [{"repo": repo, "events": len(events), "forecasters": forecasters}],
+                    "corpus": forecasters
+                }
+            
+            duration_ms = int((time.time() - self.start_time) * 1000)
+            
+            logger.info(f"Backtested {len(data['repos'])} timelines in {duration_ms}ms")
+            
+            return {
+                "success": True,
+                "data": data,
+                "metadata": {
+                    "duration_ms": duration_ms,
+                    "mode": "backtest",
+                    "repos": len(data['repos']),
+                    "forecast_horizon": max_horizon,
+                    "repo": repo
+                }
+            }
+        
+        except Exception as e:
+            logger.error(f"Error backtesting {repo}: {e}")
+            duration_ms = int((time.time() - self.start_time) * 1000)
+            
+            return {
+                "success": False,
+                "error": str(e),
+                "metadata": {
+                    "duration_ms": duration_ms,
+                    "mode": "backtest",
+                    "repo": repo
+                }
+            }
+    
+    def query(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Prédire les patterns suivants avec le modèle de préfixes (prefix_model.py)
+        
+        Le modèle persistant est chargé, ou reconstruit si absent, construit avec
+        un autre order / min_count, ou si le corpus a changé.
+        
+        Args:
+            input_data: context (derniers patterns) ou timeline (ses derniers
+                patterns), ou queries (liste de {repo, context}), config
+        
+        Returns:
+            Top-N patterns suivants avec probabilités, par requête
+        """
+        repo = input_data.get('repo', 'unknown')
+        config = input_data.get('config', {})
+        top_n = config.get('top_n', DEFAULT_TOP_N)
+        
+        try:
+            model, built = self._load_prefix_model(input_data, config)
+            load_ms = int((time.time() - self.start_time) * 1000)
+            
+            queries = input_data.get('queries')
+            if queries is None:
+                context = input_data.get('context')
+                if context is None:
+                    events = input_data.get('timeline', {}).get('events', [])
+                    context = timeline_stream(events[-model.order:])
+                queries = [{"repo": repo, "context": context}]
+            
+            query_start = time.perf_counter()
+            predictions = [
+                {"repo": q.get('repo', repo), "context": q['context'], **model.predict(q['context'], top_n)}
+                for q in queries
+            ]
+            query_us = (time.perf_counter() - query_start) * 1_000_000 / max(len(queries), 1)
+            
+            duration_ms = int((time.time() - self.start_time) * 1000)
+            
+            logger.info(f"Answered {len(queries)} queries in {duration_ms}ms ({query_us:.1f}us/query)")
+            
+            return {
+                "success": True,
+                "data": {
+                    "predictions": predictions
+                },
+                "metadata": {
+                    "duration_ms": duration_ms,
+                    "mode": "query",
+                    "load_ms": load_ms,
+                    "query_us": round(query_us, 1),
+                    "model_built": built,
+                    "model": model.summary(),
+                    "repo": repo
+                }
+            }
+        
+        except Exception as e:
+            logger.error(f"Error answering queries for {repo}: {e}")
+            duration_ms = int((time.time() - self.start_time) * 1000)
+            
+            return {
+                "success": False,
+                "error": str(e),
+                "metadata": {
+                    "duration_ms": duration_ms,
+                    "mode": "query",
+                    "repo": repo
+                }
+            }
+    
+    def _load_prefix_model(self, input_data: Dict[str, Any], config: Dict[str, Any]):
+        """
+        Charger le modèle de préfixes, ou le (re)construire sur le corpus
+        
+        Returns:
+            (modèle, reconstruit ou non)
+        """
+        corpus_dir = input_data.get('corpus_dir', DEFAULT_CORPUS_DIR)
+        model_path = input_data.get('model_path', DEFAULT_MODEL_PATH)
+        order = config.get('order', DEFAULT_ORDER)
+        min_count = config.get('min_count', DEFAULT_MIN_COUNT)
+        
+        if os.path.exists(model_path) and not config.get('rebuild'):
+            try:
+                model = PrefixModel.load(model_path)
+                if model.order == order and model.min_count == min_count:
+                    # Empreinte du corpus vérifiée sauf `check_corpus: false` (coût : un stat par timeline)
+                    if not config.get('check_corpus', True):
+                        return model, False
+                    paths = timeline_paths(corpus_dir)
+                    if model.meta.get('fingerprint') == corpus_fingerprint(paths):
+                        return model, False
+                logger.info("Prefix model outdated, rebuilding")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Unreadable prefix model {model_path}, rebuilding: {e}")
+        
+        model = PrefixModel.build_from_corpus(corpus_dir, order, min_count)
+        model.save(model_path)
+        return model, True
+    
     def _enrich_forecasts(
         self,
         forecasts: List[Dict],
         timeline: Dict,
         horizon: int,
-        min_confidence: float
+        min_confidence: float,
+        index: Optional[TimelineIndex] = None
     ) -> List[Dict]:
         """
         Enrichir les forecasts avec probabilités ML
@@ -150,6 +357,7 @@ class HyperTSBridge:
             timeline: Timeline complète
             horizon: Horizon de prédiction
             min_confidence: Confidence minimum
+            index: Index partagé (fréquences déjà calculées)
             
         Returns:
             Forecasts enrichis avec ml_probability et vraisemblance
@@ -158,7 +366,10 @@ class HyperTSBridge:
         events = timeline.get('events', [])
         
         # Calculer fréquences historiques des patterns
-        pattern_frequencies = self._calculate_pattern_frequencies(events)
+        if index is not None:
+            pattern_frequencies = index.frequencies()
+        else:
+            pattern_frequencies = self._calculate_pattern_frequencies(events)
         
         for forecast in forecasts:
             predicted = forecast.get('predicted')
@@ -169,8 +380,7 @@ class HyperTSBridge:
             historical_freq = pattern_frequencies.get(predicted, 0)
             
             # Ajuster par horizon (plus loin = moins certain)
-            horizon_decay = max(0.3, 1.0 - (forecast_horizon * 0.1))
-            ml_probability = historical_freq * horizon_decay
+            ml_probability = historical_freq * horizon_decay(forecast_horizon)
             
             # Vraisemblance = moyenne des deux confidences
             vraisemblance = (native_confidence + ml_probability) / 2
@@ -226,53 +436,26 @@ class HyperTSBridge:
             repo: Nom du repo traité
             duration_ms: Durée d'exécution
         """
-        try:
-            versions_file = '.reasoning_rl4/meta/bridges_versions.json'
-            
-            with open(versions_file, 'r') as f:
-                versions = json.load(f)
-            
-            if 'hyperts' in versions.get('bridges', {}):
-                hyperts_data = versions['bridges']['hyperts']
-                
-                # Calculer durée moyenne
-                if hyperts_data.get('avg_duration_ms'):
-                    old_avg = hyperts_data['avg_duration_ms']
-                    hyperts_data['avg_duration_ms'] = int((old_avg + duration_ms) / 2)
-                else:
-                    hyperts_data['avg_duration_ms'] = duration_ms
-                
-                # Hash du résultat
-                result_hash = hashlib.sha256(
-                    str(self.forecasts_enriched).encode()
-                ).hexdigest()[:8]
-                hyperts_data['result_hash'] = result_hash
-                hyperts_data['last_used'] = datetime.utcnow().isoformat() + 'Z'
-                hyperts_data['status'] = 'active'
-                
-                versions['meta']['last_updated'] = datetime.utcnow().isoformat() + 'Z'
-                
-                with open(versions_file, 'w') as f:
-                    json.dump(versions, f, indent=2)
-                
-                logger.debug("Updated bridges_versions.json for HyperTS")
-                
-        except Exception as e:
-            logger.warning(f"Failed to update bridges_versions.json: {e}")
+        update_bridge_versions('hyperts', duration_ms, self.fingerprint)
 
 
 def main():
     """Point d'entrée principal"""
     try:
         # Lire input JSON depuis stdin
-        input_data = json.load(sys.stdin)
+        input_data = resolve_timeline_input(json.load(sys.stdin), wrap_events=True)
         
         # Créer le bridge et traiter
         bridge = HyperTSBridge()
         result = bridge.process(input_data)
         
         # Écrire résultat JSON vers stdout
-        print(json.dumps(result, indent=2))
+        result_path = input_data.get('config', {}).get('result_path')
+        if result_path:
+            # Gros résultat : écrit dans un fichier, seul le résumé passe par stdout
+            print(json.dumps(write_result_file(result, result_path), indent=2))
+        else:
+            print(json.dumps(result, indent=2))
         
         # Exit code basé sur le succès
         sys.exit(0 if result['success'] else 1)
@@ -18,7 +18,8 @@ Input (stdin JSON):
   },
   "config": {
     "causal_threshold": 0.5,
-    "anomaly_detection": true
+    "anomaly_detection": true,
+    "change_points": true   # optionnel : ruptures du mix de patterns (voir change_points.py)
   }
 }
 
@@ -38,7 +39,12 @@ Output (stdout JSON):
     ],
     "detected_anomalies": [
       {"pattern": "bugfix", "t": 15, "severity": 0.8}
-    ]
+    ],
+    "change_points": [   # avec config.change_points
+      {"t": 120, "commit": "abc123", "shift": 0.62,
+       "before": {"feature": 0.7, ...}, "after": {"bugfix": 0.5, ...}}
+    ],
+    "segments": [...]
   },
   "metadata": {
     "duration_ms": 2345,
@@ -53,9 +59,12 @@ import sys
 import json
 import time
 import logging
-from typing import List, Dict, Any
-from datetime import datetime
-import hashlib
+from typing import List, Dict, Any, Optional
+
+from timeline_index import TimelineIndex
+from bridge_io import resolve_timeline_input, write_result_file, update_bridge_versions
+from result_diff import result_fingerprint, diff_response
+from change_points import change_point_params, detect_change_points
 
 # Configuration du logger
 logging.basicConfig(
@@ -78,6 +87,9 @@ class MerlionBridge:
         self.start_time = None
         self.correlations_refined = 0
         self.anomalies_found = 0
+        self.change_points_found = 0
+        self.change_point_stats = None
+        self.fingerprint = None
         
     def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -112,6 +124,18 @@ class MerlionBridge:
                 anomalies = self._detect_anomalies(timeline)
                 self.anomalies_found = len(anomalies)
             
+            data = {
+                "refined_correlations": refined,
+                "detected_anomalies": anomalies
+            }
+            
+            # Ruptures de régime du mix de patterns
+            if config.get('change_points'):
+                data.update(self._detect_change_points(timeline, config['change_points']))
+            
+            self.fingerprint = result_fingerprint(data)
+            data, diff = diff_response(data, self.fingerprint, 'merlion', repo, config)
+            
             duration_ms = int((time.time() - self.start_time) * 1000)
             
             # Mettre à jour bridges_versions.json
@@ -124,15 +148,16 @@ class MerlionBridge:
             
             return {
                 "success": True,
-                "data": {
-                    "refined_correlations": refined,
-                    "detected_anomalies": anomalies
-                },
+                "data": data,
                 "metadata": {
                     "duration_ms": duration_ms,
                     "correlations_refined": self.correlations_refined,
                     "anomalies_found": self.anomalies_found,
-                    "repo": repo
+                    "change_points_found": self.change_points_found,
+                    "change_point_stats": self.change_point_stats,
+                    "repo": repo,
+                    "fingerprint": self.fingerprint,
+                    "diff": diff
                 }
             }
             
@@ -153,7 +178,8 @@ class MerlionBridge:
         self,
         correlations: List[Dict],
         timeline: Dict,
-        threshold: float
+        threshold: float,
+        index: Optional[TimelineIndex] = None
     ) -> List[Dict]:
         """
         Raffiner les corrélations causales avec analyse temporelle
@@ -165,6 +191,7 @@ class MerlionBridge:
             correlations: Corrélations brutes du CorrelationEngineV2
             timeline: Timeline complète
             threshold: Seuil minimum de causalité
+            index: Index partagé de la timeline (pipeline fusionné)
             
         Returns:
             Corrélations raffinées avec causal_score
@@ -187,7 +214,7 @@ class MerlionBridge:
             lag = corr.get('lag', 0)
             
             # Analyser la régularité temporelle
-            regularity_score = self._calculate_regularity(cause, effect, events, lag)
+            regularity_score = self._calculate_regularity(cause, effect, events, lag, index)
             
             # Score de causalité = moyenne pondérée
             causal_score = (
@@ -214,7 +241,8 @@ class MerlionBridge:
         cause: str,
         effect: str,
         events: List[Dict],
-        expected_lag: int
+        expected_lag: int,
+        index: Optional[TimelineIndex] = None
     ) -> float:
         """
         Calculer la régularité temporelle d'une corrélation causale
@@ -224,6 +252,7 @@ class MerlionBridge:
             effect: Pattern effet
             events: Liste des events de la timeline
             expected_lag: Lag attendu (en commits)
+            index: Index partagé (positions des patterns), évite le scan complet
             
         Returns:
             Score de régularité (0-1)
@@ -234,20 +263,30 @@ class MerlionBridge:
         if expected_lag is None or expected_lag < 0:
             expected_lag = 1
         
-        # Chercher toutes les occurrences de cause → effect
-        for i, event in enumerate(events):
-            patterns = event.get('patterns', [])
-            
-            if cause in patterns:
-                # Chercher effect dans les N prochains events
+        # Avec index : sauter directement d'une occurrence de cause à l'effect suivant
+        if index is not None:
+            for i in index.positions.get(cause, []):
                 search_window = min(expected_lag + 3, len(events) - i - 1)
+                j = index.next_occurrence(effect, i)
                 
-                for j in range(1, max(1, search_window + 1)):
-                    if i + j < len(events):
-                        future_patterns = events[i + j].get('patterns', [])
-                        if effect in future_patterns:
-                            observed_lags.append(j)
-                            break
+                if j is not None and j - i <= search_window:
+                    observed_lags.append(j - i)
+        
+        else:
+            # Chercher toutes les occurrences de cause → effect
+            for i, event in enumerate(events):
+                patterns = event.get('patterns', [])
+                
+                if cause in patterns:
+                    # Chercher effect dans les N prochains events
+                    search_window = min(expected_lag + 3, len(events) - i - 1)
+                    
+                    for j in range(1, max(1, search_window + 1)):
+                        if i + j < len(events):
+                            future_patterns = events[i + j].get('patterns', [])
+                            if effect in future_patterns:
+                                observed_lags.append(j)
+                                break
         
         if not observed_lags:
             return 0.0
@@ -262,7 +301,11 @@ class MerlionBridge:
         
         return regularity
     
-    def _detect_anomalies(self, timeline: Dict) -> List[Dict]:
+    def _detect_anomalies(
+        self,
+        timeline: Dict,
+        index: Optional[TimelineIndex] = None
+    ) -> List[Dict]:
         """
         Détecter les anomalies temporelles dans la timeline
         
@@ -271,6 +314,7 @@ class MerlionBridge:
         
         Args:
             timeline: Timeline complète
+            index: Index partagé (comptages déjà calculés)
             
         Returns:
             Liste d'anomalies détectées
@@ -282,10 +326,13 @@ class MerlionBridge:
             return anomalies
         
         # Détecter patterns inhabituels (fréquence basse)
-        pattern_counts = {}
-        for event in events:
-            for pattern in event.get('patterns', []):
-                pattern_counts[pattern] = pattern_counts.get(pattern, 0) + 1
+        if index is not None:
+            pattern_counts = index.counts
+        else:
+            pattern_counts = {}
+            for event in events:
+                for pattern in event.get('patterns', []):
+                    pattern_counts[pattern] = pattern_counts.get(pattern, 0) + 1
         
         total_patterns = sum(pattern_counts.values())
         
@@ -310,6 +357,28 @@ class MerlionBridge:
         anomalies.sort(key=lambda x: x['severity'], reverse=True)
         return anomalies[:10]
     
+    def _detect_change_points(self, timeline: Dict, raw_params: Any) -> Dict[str, List[Dict]]:
+        """
+        Détecter les changements de régime du mix de patterns (voir change_points.py)
+        
+        Args:
+            timeline: Timeline complète
+            raw_params: config.change_points (`true` ou dict de paramètres)
+            
+        Returns:
+            {"change_points": [...], "segments": [...]}
+        """
+        params = change_point_params(raw_params)
+        result = detect_change_points(timeline.get('events', []), params)
+        
+        self.change_points_found = len(result['change_points'])
+        self.change_point_stats = result['stats']
+        
+        return {
+            "change_points": result['change_points'],
+            "segments": result['segments']
+        }
+    
     def _update_versions(self, repo: str, duration_ms: int):
         """
         Mettre à jour bridges_versions.json avec les métriques
@@ -318,53 +387,26 @@ class MerlionBridge:
             repo: Nom du repo traité
             duration_ms: Durée d'exécution
         """
-        try:
-            versions_file = '.reasoning_rl4/meta/bridges_versions.json'
-            
-            with open(versions_file, 'r') as f:
-                versions = json.load(f)
-            
-            if 'merlion' in versions.get('bridges', {}):
-                merlion_data = versions['bridges']['merlion']
-                
-                # Calculer durée moyenne
-                if merlion_data.get('avg_duration_ms'):
-                    old_avg = merlion_data['avg_duration_ms']
-                    merlion_data['avg_duration_ms'] = int((old_avg + duration_ms) / 2)
-                else:
-                    merlion_data['avg_duration_ms'] = duration_ms
-                
-                # Hash du résultat
-                result_hash = hashlib.sha256(
-                    f"{self.correlations_refined}:{self.anomalies_found}".encode()
-                ).hexdigest()[:8]
-                merlion_data['result_hash'] = result_hash
-                merlion_data['last_used'] = datetime.utcnow().isoformat() + 'Z'
-                merlion_data['status'] = 'active'
-                
-                versions['meta']['last_updated'] = datetime.utcnow().isoformat() + 'Z'
-                
-                with open(versions_file, 'w') as f:
-                    json.dump(versions, f, indent=2)
-                
-                logger.debug("Updated bridges_versions.json for Merlion")
-                
-        except Exception as e:
-            logger.warning(f"Failed to update bridges_versions.json: {e}")
+        update_bridge_versions('merlion', duration_ms, self.fingerprint)
 
 
 def main():
     """Point d'entrée principal"""
     try:
         # Lire input JSON depuis stdin
-        input_data = json.load(sys.stdin)
+        input_data = resolve_timeline_input(json.load(sys.stdin), wrap_events=True)
         
         # Créer le bridge et traiter
         bridge = MerlionBridge()
         result = bridge.process(input_data)
         
         # Écrire résultat JSON vers stdout
-        print(json.dumps(result, indent=2))
+        result_path = input_data.get('config', {}).get('result_path')
+        if result_path:
+            # Gros résultat : écrit dans un fichier, seul le résumé passe par stdout
+            print(json.dumps(write_result_file(result, result_path), indent=2))
+        else:
+            print(json.dumps(result, indent=2))
         
         # Exit code basé sur le succès
         sys.exit(0 if result['success'] else 1)
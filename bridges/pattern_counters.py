@@ -0,0 +1,306 @@
+"""
+Pattern Counters - Compteurs de patterns pour les bridges de mining
+
+Compteurs utilisés à la place du dict `pattern_counts` quand le volume de
+n-grams devient trop grand pour rester en mémoire.
+
+- `SpillingCounter` : comptage exact sous budget mémoire. Quand la croissance
+  mémoire du process (mesurée via psutil) approche `memory_budget_mb`, les
+  comptes partiels sont triés et déversés dans des fichiers de run temporaires.
+  Une fusion k-way finale (heapq.merge) restitue les comptes exacts.
+- `SpaceSavingCounter` : comptage approximé à mémoire fixe (algorithme
+  Space-Saving, Metwally et al.). Au plus `capacity` compteurs ; chaque compte
+  est surestimé d'au plus son `error`, lui-même borné par N / capacity.
+  Tout pattern de fréquence réelle ≥ seuil est garanti dans le résultat tant
+  que le seuil dépasse le compte minimal du sketch (`guarantees`).
+"""
+
+import os
+import json
+import math
+import heapq
+import logging
+import tempfile
+from typing import Dict, Any, Iterator, List, Tuple, Optional, Hashable
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# Fraction du budget à partir de laquelle on déverse sur disque
+SPILL_HIGH_WATERMARK = 0.9
+
+# Nombre d'écritures entre deux mesures psutil
+CHECK_INTERVAL = 4096
+
+# Erreur relative par défaut du mode approximé (capacity = 1 / epsilon)
+DEFAULT_EPSILON = 0.001
+
+
+class SpillingCounter:
+    """Compteur exact à budget mémoire, avec déversement sur disque"""
+    
+    def __init__(
+        self,
+        memory_budget_mb: float,
+        spill_dir: Optional[str] = None,
+        check_interval: int = CHECK_INTERVAL
+    ):
+        if memory_budget_mb <= 0:
+            raise ValueError(f"memory_budget_mb must be positive, got {memory_budget_mb!r}")
+        
+        self.memory_budget_mb = memory_budget_mb
+        self.budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.check_interval = check_interval
+        
+        self.counts: Dict[Hashable, int] = {}
+        self.runs = []
+        self.spilled_entries = 0
+        self.spilled_bytes = 0
+        
+        self._process = psutil.Process()
+        # Le budget porte sur la croissance du process depuis la création du compteur
+        self._baseline_rss = self._process.memory_info().rss
+        self._spill_rss = None
+        self._peak_growth = 0
+        self._writes = 0
+        self._spill_dir = spill_dir
+        self._tmpdir = None
+    
+    def get(self, key: Hashable, default: int = 0) -> int:
+        """Compte partiel en mémoire (les runs déversés ne sont pas consultés)"""
+        return self.counts.get(key, default)
+    
+    def __setitem__(self, key: Hashable, value: int):
+        self.counts[key] = value
+        self._writes += 1
+        
+        if self._writes % self.check_interval == 0:
+            self._check_memory()
+    
+    def __len__(self) -> int:
+        return len(self.counts)
+    
+    def _check_memory(self):
+        """
+        Déverser si la croissance RSS depuis la baseline initiale approche le budget
+        
+        Après un déversement, la RSS ne redescend pas forcément (mémoire gardée
+        par l'allocateur, réutilisée par le nouveau dict) : on ne redéverse
+        au-dessus du seuil que si la RSS a grandi depuis le dernier déversement.
+        """
+        rss = self._process.memory_info().rss
+        growth = rss - self._baseline_rss
+        self._peak_growth = max(self._peak_growth, growth)
+        
+        if growth < self.budget_bytes * SPILL_HIGH_WATERMARK:
+            return
+        
+        if self._spill_rss is None or rss > self._spill_rss:
+            self.spill()
+    
+    def spill(self):
+        """
+        Trier les comptes en mémoire et les écrire dans un nouveau fichier de run
+        
+        Format : une ligne JSON `[clé, compte]` par entrée, triée par clé.
+        """
+        if not self.counts:
+            return
+        
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.TemporaryDirectory(prefix='rl4_spill_', dir=self._spill_dir)
+        
+        path = os.path.join(self._tmpdir.name, f"run_{len(self.runs):05d}.jsonl")
+        
+        with open(path, 'w') as f:
+            for key in sorted(self.counts):
+                f.write(json.dumps([list(key), self.counts[key]]))
+                f.write('\n')
+        
+        entries = len(self.counts)
+        self.runs.append(path)
+        self.spilled_entries += entries
+        self.spilled_bytes += os.path.getsize(path)
+        
+        logger.info(f"Spilled {entries} partial counts to run #{len(self.runs)}")
+        
+        self.counts = {}
+        self._spill_rss = self._process.memory_info().rss
+    
+    def items(self) -> Iterator[Tuple[Hashable, int]]:
+        """
+        Itérer sur les comptes exacts (fusion k-way des runs + mémoire)
+        
+        Sans déversement, l'ordre est celui d'insertion (identique au dict).
+        Avec déversement, les clés sortent triées.
+        """
+        if not self.runs:
+            yield from self.counts.items()
+            return
+        
+        streams = [self._read_run(path) for path in self.runs]
+        streams.append(iter(sorted(self.counts.items())))
+        
+        current_key = None
+        current_count = 0
+        
+        for key, count in heapq.merge(*streams):
+            if key == current_key:
+                current_count += count
+            else:
+                if current_key is not None:
+                    yield current_key, current_count
+                current_key, current_count = key, count
+        
+        if current_key is not None:
+            yield current_key, current_count
+        
+        self.close()
+    
+    def _read_run(self, path: str) -> Iterator[Tuple[Hashable, int]]:
+        """Relire un fichier de run en flux"""
+        with open(path, 'r') as f:
+            for line in f:
+                key, count = json.loads(line)
+                yield tuple(key), count
+    
+    def close(self):
+        """Supprimer les fichiers de run temporaires"""
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
+            self._tmpdir = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Métadonnées de comptage (déversement éventuel)"""
+        return {
+            "memory_budget_mb": self.memory_budget_mb,
+            "spilled": bool(self.runs),
+            "spill_runs": len(self.runs),
+            "spilled_entries": self.spilled_entries,
+            "spilled_bytes": self.spilled_bytes,
+            "peak_growth_mb": round(self._peak_growth / (1024 * 1024), 2),
+            "within_budget": self._peak_growth <= self.budget_bytes
+        }
+
+
+class SpaceSavingCounter:
+    """Compteur approximé Space-Saving à mémoire fixe (heavy hitters)"""
+    
+    def __init__(self, capacity: Optional[int] = None, epsilon: Optional[float] = None):
+        if capacity is None:
+            epsilon = epsilon or DEFAULT_EPSILON
+            if not 0 < epsilon < 1:
+                raise ValueError(f"epsilon must be in (0, 1), got {epsilon!r}")
+            capacity = math.ceil(1 / epsilon)
+        
+        if capacity < 1:
+            raise ValueError(f"capacity must be a positive integer, got {capacity!r}")
+        
+        self.capacity = capacity
+        self.epsilon = epsilon if epsilon is not None else round(1 / capacity, 6)
+        self.stream_length = 0
+        self.evictions = 0
+        
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        
+        # Une entrée par clé suivie ; le compte stocké peut être périmé (mise à jour paresseuse)
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._sequence = 0
+    
+    def add(self, key: Hashable, n: int = 1):
+        """
+        Compter une occurrence de key
+        
+        Si key n'est pas suivie et que la table est pleine, le compteur minimal
+        est recyclé : key hérite de son compte (→ erreur) plus n.
+        """
+        self.stream_length += n
+        
+        if key in self.counts:
+            self.counts[key] += n
+            return
+        
+        if len(self.counts) < self.capacity:
+            self.counts[key] = n
+            self.errors[key] = 0
+            self._push(n, key)
+            return
+        
+        min_key, min_count = self._pop_min()
+        del self.counts[min_key]
+        del self.errors[min_key]
+        self.evictions += 1
+        
+        self.counts[key] = min_count + n
+        self.errors[key] = min_count
+        self._push(min_count + n, key)
+    
+    def __len__(self) -> int:
+        return len(self.counts)
+    
+    def _push(self, count: int, key: Hashable):
+        # Le numéro de séquence départage les égalités sans comparer les clés
+        self._sequence += 1
+        heapq.heappush(self._heap, (count, self._sequence, key))
+    
+    def _pop_min(self) -> Tuple[Hashable, int]:
+        """Extraire la clé de compte minimal (réinsère les entrées périmées)"""
+        while True:
+            count, _, key = heapq.heappop(self._heap)
+            current = self.counts[key]
+            
+            if current == count:
+                return key, count
+            
+            self._push(current, key)
+    
+    def min_count(self) -> int:
+        """Borne d'erreur globale : compte minimal si la table est pleine, 0 sinon"""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+    
+    def guarantees(self, min_count: float) -> bool:
+        """
+        heavy_hitters(min_count) contient-il tous les patterns réellement fréquents ?
+        
+        Une clé évincée a une fréquence réelle ≤ min_count() : elle ne peut
+        manquer que si le seuil ne dépasse pas ce compte minimal.
+        """
+        return len(self.counts) < self.capacity or min_count > self.min_count()
+    
+    def heavy_hitters(self, min_count: float) -> Iterator[Tuple[Hashable, int, int]]:
+        """
+        Patterns dont le compte estimé atteint min_count
+        
+        Les comptes étant surestimés, le résultat est un sur-ensemble des
+        patterns réellement fréquents si `guarantees(min_count)` ; sinon un
+        pattern évincé de fréquence réelle entre min_count et min_count() peut
+        manquer (sketch trop petit pour le seuil).
+        
+        Args:
+            min_count: Seuil en nombre d'occurrences
+            
+        Returns:
+            Itérateur (clé, compte estimé, borne d'erreur)
+        """
+        for key, count in self.counts.items():
+            if count >= min_count:
+                yield key, count, self.errors[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Paramètres du sketch et erreur effectivement atteinte"""
+        max_error = self.min_count()
+        
+        return {
+            "algorithm": "space-saving",
+            "capacity": self.capacity,
+            "epsilon": self.epsilon,
+            "stream_length": self.stream_length,
+            "tracked": len(self.counts),
+            "evictions": self.evictions,
+            "max_error": max_error,
+            "achieved_epsilon": round(max_error / self.stream_length, 6) if self.stream_length else 0.0
+        }
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Pipeline Bridge - Analyse fusionnée (Analytical + Reflective + Forecast)
+
+Point d'entrée unique qui remplace trois appels séparés à `pami_bridge.py`,
+`merlion_bridge.py` et `hyperts_bridge.py` pour une même timeline.
+
+La timeline est parsée et encodée une seule fois (`TimelineIndex`), puis les
+trois étapes lisent les mêmes index (comptages, positions) :
+- **patterns** : mining PAMI sur les fenêtres encodées
+- **causality** : raffinement Merlion des corrélations + anomalies
+- **forecasts** : enrichissement HyperTS des forecasts
+
+Les étapes sont indépendantes et s'exécutent l'une après l'autre : elles sont
+en pur Python (le GIL sérialiserait des threads) et un pool de processus devrait
+copier l'index dans chaque worker, ce qui annulerait le parse partagé.
+
+Input (stdin JSON):
+{
+  "repo": "repo-name",
+  "timeline": {"events": [...]},        # ou directement la liste d'events
+  "timeline_path": "...",               # ou timeline(s) lue(s) sur disque (chemin ou liste)
+  "correlations": [...],                # optionnel (étape causality)
+  "forecasts": [...],                   # optionnel (étape forecasts)
+  "config": {
+    "patterns": {"min_support": 0.3, "min_confidence": 0.5},
+    "causality": {"causal_threshold": 0.5, "anomaly_detection": true},
+    "forecast": {"forecast_horizon": 5, "min_confidence": 0.4}
+  }
+}
+
+Output (stdout JSON):
+{
+  "success": true,
+  "data": {
+    "patterns": [...],
+    "refined_correlations": [...],
+    "detected_anomalies": [...],
+    "enriched_forecasts": [...]
+  },
+  "metadata": {
+    "duration_ms": 1234,
+    "index_ms": 12,
+    "stages": {"patterns": {"duration_ms": 40}, ...},
+    "repo": "repo-name"
+  }
+}
+"""
+
+import sys
+import json
+import time
+import logging
+from typing import List, Dict, Any, Callable
+
+from timeline_index import TimelineIndex
+from bridge_io import resolve_timeline_input, write_result_file, update_bridge_versions
+from timeline_windows import extract_sequences
+from deadline import Deadline
+from pami_bridge import PAMIBridge
+from merlion_bridge import MerlionBridge
+from hyperts_bridge import HyperTSBridge
+from result_diff import result_fingerprint, diff_response
+
+# Configuration du logger (remplace celle posée à l'import des autres bridges)
+logging.basicConfig(
+    level=logging.INFO,
+    format='[%(asctime)s] [%(levelname)s] [PIPELINE] %(message)s',
+    handlers=[
+        logging.FileHandler('.reasoning_rl4/logs/bridges/pipeline.log'),
+        logging.StreamHandler(sys.stderr)
+    ],
+    force=True
+)
+logger = logging.getLogger(__name__)
+
+
+class PipelineBridge:
+    """Bridge fusionné - un seul parse pour patterns, causalité et forecasts"""
+    
+    VERSION = "1.0.0"
+    
+    def __init__(self):
+        self.start_time = None
+        self.stages = {}
+        self.fingerprint = None
+    
+    def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analyser une timeline avec les trois étapes sur des index partagés
+        
+        Args:
+            input_data: Données d'entrée (repo, timeline, correlations, forecasts, config)
+        
+        Returns:
+            Patterns, corrélations raffinées, anomalies et forecasts enrichis
+        """
+        self.start_time = time.time()
+        
+        repo = input_data.get('repo', 'unknown')
+        timeline = input_data.get('timeline', {})
+        correlations = input_data.get('correlations', [])
+        forecasts = input_data.get('forecasts', [])
+        config = input_data.get('config', {})
+        
+        events = timeline if isinstance(timeline, list) else timeline.get('events', [])
+        
+        logger.info(
+            f"Processing repo: {repo}, timeline size: {len(events)}, "
+            f"correlations: {len(correlations)}, forecasts: {len(forecasts)}"
+        )
+        
+        try:
+            # Parser et encoder une seule fois
+            index_start = time.time()
+            index = TimelineIndex(events)
+            index_ms = int((time.time() - index_start) * 1000)
+            
+            stages = {
+                'patterns': lambda: self._run_patterns(
+                    index, config.get('patterns', {})
+                ),
+                'causality': lambda: self._run_causality(
+                    index, correlations, config.get('causality', {})
+                ),
+                'forecasts': lambda: self._run_forecasts(
+                    index, forecasts, config.get('forecast', {})
+                )
+            }
+            
+            results = self._run_stages(stages)
+            
+            data = {
+                "patterns": results['patterns'],
+                "refined_correlations": results['causality']['refined_correlations'],
+                "detected_anomalies": results['causality']['detected_anomalies'],
+                "enriched_forecasts": results['forecasts']
+            }
+            self.fingerprint = result_fingerprint(data)
+            data, diff = diff_response(data, self.fingerprint, 'pipeline', repo, config)
+            
+            duration_ms = int((time.time() - self.start_time) * 1000)
+            
+            self._update_versions(repo, duration_ms)
+            
+            logger.info(
+                f"Pipeline done in {duration_ms}ms: "
+                f"{len(results['patterns'])} patterns, "
+                f"{len(results['causality']['refined_correlations'])} correlations, "
+                f"{len(results['forecasts'])} forecasts"
+            )
+            
+            return {
+                "success": True,
+                "data": data,
+                "metadata": {
+                    "duration_ms": duration_ms,
+                    "index_ms": index_ms,
+                    "index": index.summary(),
+                    "stages": self.stages,
+                    "repo": repo,
+                    "fingerprint": self.fingerprint,
+                    "diff": diff
+                }
+            }
+        
+        except Exception as e:
+            logger.error(f"Error processing repo {repo}: {e}")
+            duration_ms = int((time.time() - self.start_time) * 1000)
+            
+            return {
+                "success": False,
+                "error": str(e),
+                "metadata": {
+                    "duration_ms": duration_ms,
+                    "repo": repo
+                }
+            }
+    
+    def _run_stages(
+        self,
+        stages: Dict[str, Callable[[], Any]]
+    ) -> Dict[str, Any]:
+        """
+        Exécuter les étapes l'une après l'autre en chronométrant chacune
+        
+        Args:
+            stages: Nom d'étape → fonction sans argument
+        
+        Returns:
+            Nom d'étape → résultat
+        """
+        def timed(name: str, stage: Callable[[], Any]) -> Any:
+            stage_start = time.time()
+            result = stage()
+            self.stages.setdefault(name, {})['duration_ms'] = int((time.time() - stage_start) * 1000)
+            return result
+        
+        return {name: timed(name, stage) for name, stage in stages.items()}
+    
+    def _run_patterns(self, index: TimelineIndex, config: Dict[str, Any]) -> List[Dict]:
+        """
+        Étape patterns : mining PAMI sur les fenêtres encodées
+        
+        Les séquences sont construites sur les codes entiers de l'index puis
+        décodées après filtrage, ce qui évite de hasher des tuples de chaînes.
+        
+        Args:
+            index: Index partagé de la timeline
+            config: Config PAMI (min_support, min_confidence, fenêtrage, miner, deadline_ms)
+        
+        Returns:
+            Patterns fréquents (format pami_bridge.py)
+        """
+        pami = PAMIBridge()
+        pami.deadline = Deadline.from_config(config, self.start_time)
+        sequences, pami.weights, windowing = extract_sequences(
+            index.events, config, index.event_codes
+        )
+        
+        patterns = pami._run_miner(
+            sequences,
+            config.get('min_support', 0.3),
+            config.get('min_confidence', 0.5),
+            config
+        )
+        
+        for pattern in patterns:
+            pattern['sequence'] = [index.labels[code] for code in pattern['sequence']]
+        
+        self.stages.setdefault('patterns', {}).update({
+            "windowing": windowing,
+            "counting": pami.counting,
+            "sketch": pami.sketch,
+            "levels": pami.levels,
+            "partial": pami.partial,
+            "coverage": pami.coverage,
+            "compression": pami.compression
+        })
+        return patterns
+    
+    def _run_causality(
+        self,
+        index: TimelineIndex,
+        correlations: List[Dict],
+        config: Dict[str, Any]
+    ) -> Dict[str, List[Dict]]:
+        """
+        Étape causality : raffinement Merlion + détection d'anomalies
+        
+        Args:
+            index: Index partagé de la timeline
+            correlations: Corrélations brutes du CorrelationEngineV2
+            config: Config Merlion (causal_threshold, anomaly_detection)
+        
+        Returns:
+            Corrélations raffinées et anomalies
+        """
+        merlion = MerlionBridge()
+        timeline = {"events": index.events}
+        
+        refined = merlion._refine_causality(
+            correlations,
+            timeline,
+            config.get('causal_threshold', 0.5),
+            index
+        )
+        
+        anomalies = []
+        if config.get('anomaly_detection', True):
+            anomalies = merlion._detect_anomalies(timeline, index)
+        
+        return {
+            "refined_correlations": refined,
+            "detected_anomalies": anomalies
+        }
+    
+    def _run_forecasts(
+        self,
+        index: TimelineIndex,
+        forecasts: List[Dict],
+        config: Dict[str, Any]
+    ) -> List[Dict]:
+        """
+        Étape forecasts : enrichissement HyperTS
+        
+        Args:
+            index: Index partagé de la timeline
+            forecasts: Forecasts natifs du ForecastEngineV3
+            config: Config HyperTS (forecast_horizon, min_confidence)
+        
+        Returns:
+            Forecasts enrichis
+        """
+        return HyperTSBridge()._enrich_forecasts(
+            forecasts,
+            {"events": index.events},
+            config.get('forecast_horizon', 5),
+            config.get('min_confidence', 0.4),
+            index
+        )
+    
+    def _update_versions(self, repo: str, duration_ms: int):
+        """
+        Mettre à jour bridges_versions.json avec les métriques
+        
+        Args:
+            repo: Nom du repo traité
+            duration_ms: Durée d'exécution
+        """
+        update_bridge_versions('pipeline', duration_ms, self.fingerprint)
+
+
+def main():
+    """Point d'entrée principal"""
+    try:
+        # Lire input JSON depuis stdin (un seul parse pour les trois étapes)
+        input_data = resolve_timeline_input(json.load(sys.stdin), wrap_events=True)
+        
+        bridge = PipelineBridge()
+        result = bridge.process(input_data)
+        
+        result_path = input_data.get('config', {}).get('result_path')
+        if result_path:
+            # Gros résultat : écrit dans un fichier, seul le résumé passe par stdout
+            print(json.dumps(write_result_file(result, result_path), indent=2))
+        else:
+            print(json.dumps(result, indent=2))
+        
+        sys.exit(0 if result['success'] else 1)
+    
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid JSON input: {e}")
+        error_result = {
+            "success": False,
+            "error": f"Invalid JSON input: {e}",
+            "metadata": {}
+        }
+        print(json.dumps(error_result, indent=2))
+        sys.exit(1)
+    
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        error_result = {
+            "success": False,
+            "error": str(e),
+            "metadata": {}
+        }
+        print(json.dumps(error_result, indent=2))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+"""
+Prefix Model - Modèle n-gram de prédiction du pattern suivant
+
+Répond à « vu les k derniers patterns d'un repo, quels sont les N patterns
+suivants les plus probables ? » en quelques microsecondes, sans attendre un
+forecast de ForecastEngineV3.
+
+Le modèle est précalculé sur le corpus : chaque timeline est aplatie en flux
+de patterns (events dans l'ordre, patterns de l'event dans l'ordre), puis pour
+chaque position on compte le pattern suivant de chaque contexte de longueur
+0..order. Les contextes ne traversent pas les frontières de repo.
+
+Table de contextes hachée : un contexte est encodé en entier (chiffres en base
+V + 1 des identifiants de labels, 0 réservé), les clés sont triées et la
+recherche est une dichotomie. Chaque contexte porte ses suivants triés par
+compte décroissant.
+
+Backoff : la requête utilise le plus long suffixe du contexte observé au moins
+`min_count` fois, et redescend vers des contextes plus courts sinon (jusqu'au
+contexte vide = fréquence globale). Les probabilités sont les fréquences
+conditionnelles de ce contexte.
+
+Format binaire (chargé en une lecture, tableaux numpy sans copie) :
+    magic `RL4P` | uint32 longueur de l'en-tête | en-tête JSON (vocabulaire,
+    order, min_count, tailles, empreinte du corpus) | keys int64[C] |
+    totals uint32[C] | offsets uint32[C + 1] | next uint16[E] | counts uint32[E]
+"""
+
+import os
+import json
+import struct
+import logging
+from bisect import bisect_left
+from typing import List, Dict, Any, Optional, Iterable
+
+import numpy as np
+
+from timeline_reader import read_timeline_file, timeline_paths
+
+logger = logging.getLogger(__name__)
+
+MODEL_MAGIC = b'RL4P'
+MODEL_VERSION = 1
+DEFAULT_ORDER = 3
+DEFAULT_MIN_COUNT = 2
+DEFAULT_TOP_N = 5
+
+
+def timeline_stream(events: List[Dict]) -> List[str]:
+    """Flux des patterns d'une timeline (ordre des events puis de l'event)"""
+    return [pattern for event in events for pattern in event.get('patterns', [])]
+
+
+def corpus_fingerprint(paths: Iterable[str]) -> List[int]:
+    """Empreinte bon marché d'un corpus : [fichiers, mtime_ns max, taille totale]"""
+    count = latest = size = 0
+    
+    for path in paths:
+        st = os.stat(path)
+        count += 1
+        latest = max(latest, st.st_mtime_ns)
+        size += st.st_size
+    
+    return [count, latest, size]
+
+
+class PrefixModel:
+    """Table de contextes n-gram avec backoff, sérialisable en binaire compact"""
+    
+    def __init__(
+        self,
+        vocabulary: List[str],
+        order: int,
+        min_count: int,
+        keys: np.ndarray,
+        totals: np.ndarray,
+        offsets: np.ndarray,
+        next_ids: np.ndarray,
+        counts: np.ndarray,
+        meta: Optional[Dict[str, Any]] = None
+    ):
+        self.vocabulary = vocabulary
+        self.label_ids = {label: i + 1 for i, label in enumerate(vocabulary)}
+        self.order = order
+        self.min_count = min_count
+        self.base = len(vocabulary) + 1
+        
+        self.keys = keys
+        self.totals = totals
+        self.offsets = offsets
+        self.next_ids = next_ids
+        self.counts = counts
+        self.meta = meta or {}
+        
+        # Copie Python des clés pour la dichotomie (plus rapide que numpy par requête)
+        self._keys = keys.tolist()
+    
+    @classmethod
+    def build(
+        cls,
+        streams: Iterable[List[str]],
+        order: int = DEFAULT_ORDER,
+        min_count: int = DEFAULT_MIN_COUNT,
+        meta: Optional[Dict[str, Any]] = None
+    ) -> 'PrefixModel':
+        """
+        Construire le modèle à partir de flux de patterns (un par repo)
+        
+        Args:
+            streams: Flux de patterns
+            order: Longueur maximale du contexte
+            min_count: Occurrences minimales d'un contexte pour l'utiliser
+            meta: Informations conservées dans l'en-tête (corpus, empreinte)
+        
+        Returns:
+            Modèle prêt à interroger
+        """
+        if order < 1:
+            raise ValueError(f"order must be >= 1, got {order!r}")
+        
+        streams = list(streams)
+        vocabulary = sorted({label for stream in streams for label in stream})
+        label_ids = {label: i + 1 for i, label in enumerate(vocabulary)}
+        base = len(vocabulary) + 1
+        
+        if base ** order >= 2 ** 63 or len(vocabulary) >= 2 ** 16:
+            raise ValueError(
+                f"Vocabulary of {len(vocabulary)} labels too large for order {order}"
+            )
+        
+        table: Dict[int, Dict[int, int]] = {}
+        
+        for stream in streams:
+            ids = [label_ids[label] for label in stream]
+            
+            for i, target in enumerate(ids):
+                # Contextes de longueur 0..order se terminant juste avant i
+                key = 0
+                for length in range(0, min(order, i) + 1):
+                    if length:
+                        key = key * base + ids[i - length]
+                    followers = table.setdefault(key, {})
+                    followers[target] = followers.get(target, 0) + 1
+        
+        keys = sorted(table)
+        offsets = [0]
+        totals = []
+        next_ids: List[int] = []
+        counts: List[int] = []
+        
+        for key in keys:
+            followers = sorted(table[key].items(), key=lambda item: (-item[1], item[0]))
+            totals.append(sum(count for _, count in followers))
+            next_ids.extend(label for label, _ in followers)
+            counts.extend(count for _, count in followers)
+            offsets.append(len(next_ids))
+        
+        return cls(
+            vocabulary,
+            order,
+            min_count,
+            np.array(keys, dtype=np.int64),
+            np.array(totals, dtype=np.uint32),
+            np.array(offsets, dtype=np.uint32),
+            np.array(next_ids, dtype=np.uint16),
+            np.array(counts, dtype=np.uint32),
+            meta
+        )
+    
+    @classmethod
+    def build_from_corpus(
+        cls,
+        corpus_dir: str,
+        order: int = DEFAULT_ORDER,
+        min_count: int = DEFAULT_MIN_COUNT
+    ) -> 'PrefixModel':
+        """Construire le modèle sur les timelines `timeline_*` d'un dossier"""
+        paths = timeline_paths(corpus_dir)
+        streams = []
+        
+        for path in paths:
+            data = read_timeline_file(path)
+            events = data if isinstance(data, list) else data.get('events', [])
+            streams.append(timeline_stream(events))
+        
+        meta = {
+            "corpus_dir": corpus_dir,
+            "fingerprint": corpus_fingerprint(paths),
+            "repos": len(paths),
+            "patterns": sum(len(stream) for stream in streams)
+        }
+        
+        logger.info(f"Building prefix model: {len(paths)} timelines, order {order}")
+        return cls.build(streams, order, min_count, meta)
+    
+    def _lookup(self, key: int) -> int:
+        """Indice du contexte dans la table, -1 s'il est absent"""
+        keys = self._keys
+        i = bisect_left(keys, key)
+        return i if i < len(keys) and keys[i] == key else -1
+    
+    def predict(self, context: List[str], top_n: int = DEFAULT_TOP_N) -> Dict[str, Any]:
+        """
+        Patterns suivants les plus probables après un contexte
+        
+        Args:
+            context: Derniers patterns du repo (les `order` derniers sont utilisés)
+            top_n: Nombre de prédictions
+        
+        Returns:
+            matched_context (suffixe utilisé après backoff), support du contexte
+            et prédictions (pattern, probabilité, count)
+        """
+        # Clés de chaque suffixe, du plus court au plus long ; un label
+        # inconnu coupe le contexte (aucun suffixe plus long ne peut exister)
+        suffix_keys = [0]
+        key = 0
+        for label in reversed(context[-self.order:]):
+            label_id = self.label_ids.get(label)
+            if label_id is None:
+                break
+            # Les labels sont empilés du plus récent au plus ancien
+            key = key * self.base + label_id
+            suffix_keys.append(key)
+        
+        for length in range(len(suffix_keys) - 1, -1, -1):
+            index = self._lookup(suffix_keys[length])
+            if index < 0:
+                continue
+            
+            total = int(self.totals[index])
+            if total < self.min_count and length > 0:
+                continue
+            
+            start = int(self.offsets[index])
+            end = min(int(self.offsets[index + 1]), start + top_n)
+            
+            return {
+                "matched_context": list(context[len(context) - length:]) if length else [],
+                "context_support": total,
+                "predictions": [
+                    {
+                        "pattern": self.vocabulary[label_id - 1],
+                        "probability": round(count / total, 4),
+                        "count": count
+                    }
+                    for label_id, count in zip(
+                        self.next_ids[start:end].tolist(), self.counts[start:end].tolist()
+                    )
+                ]
+            }
+        
+        return {"matched_context": [], "context_support": 0, "predictions": []}
+    
+    def save(self, path: str):
+        """Écrire le modèle au format binaire (fichier temporaire renommé)"""
+        header = json.dumps({
+            "version": MODEL_VERSION,
+            "vocabulary": self.vocabulary,
+            "order": self.order,
+            "min_count": self.min_count,
+            "contexts": len(self.keys),
+            "entries": len(self.next_ids),
+            "meta": self.meta
+        }).encode('utf-8')
+        
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(MODEL_MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            for array in (self.keys, self.totals, self.offsets, self.next_ids, self.counts):
+                f.write(array.astype(array.dtype.newbyteorder('<'), copy=False).tobytes())
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'PrefixModel':
+        """Charger un modèle écrit par save() (une lecture, pas de copie des tableaux)"""
+        with open(path, 'rb') as f:
+            buffer = f.read()
+        
+        if buffer[:4] != MODEL_MAGIC:
+            raise ValueError(f"Not a prefix model file: {path}")
+        
+        (header_size,) = struct.unpack_from('<I', buffer, 4)
+        header = json.loads(buffer[8:8 + header_size])
+        if header.get('version') != MODEL_VERSION:
+            raise ValueError(f"Unsupported prefix model version: {header.get('version')!r}")
+        
+        offset = 8 + header_size
+        arrays = []
+        for dtype, size in (
+            ('<i8', header['contexts']),
+            ('<u4', header['contexts']),
+            ('<u4', header['contexts'] + 1),
+            ('<u2', header['entries']),
+            ('<u4', header['entries'])
+        ):
+            arrays.append(np.frombuffer(buffer, dtype=dtype, count=size, offset=offset))
+            offset += arrays[-1].nbytes
+        
+        return cls(header['vocabulary'], header['order'], header['min_count'], *arrays, header['meta'])
+    
+    def summary(self) -> Dict[str, Any]:
+        """Résumé compact pour les métadonnées"""
+        return {
+            "order": self.order,
+            "min_count": self.min_count,
+            "vocabulary": len(self.vocabulary),
+            "contexts": len(self.keys),
+            "entries": len(self.next_ids),
+            "repos": self.meta.get('repos')
+        }
@@ -0,0 +1,256 @@
+"""
+Progressive Sampling - Mining sur échantillons croissants avec arrêt statistique
+
+Sur un long historique, l'essentiel du comptage sert à confirmer des patterns
+manifestement fréquents (ou manifestement rares). Avec `config.sampling`, PAMI
+et FP-Growth comptent des échantillons aléatoires de fenêtres de taille
+croissante (×growth à chaque tour, tirage sans remise) et s'arrêtent dès que
+chaque pattern est, au niveau de confiance demandé, au-dessus ou en dessous du
+seuil : le reste de la timeline n'est pas compté.
+
+Estimation : le support d'un pattern est son nombre moyen d'occurrences par
+fenêtre. Pour chaque pattern, l'échantillon donne la moyenne et la variance
+des occurrences par fenêtre ; l'intervalle est l'intervalle normal de la
+moyenne avec correction de population finie (largeur nulle quand toutes les
+fenêtres sont tirées). Le tirage étant aléatoire, l'intervalle reste valide
+malgré le recouvrement des fenêtres glissantes.
+
+Patterns jamais vus : absent de n fenêtres tirées, un pattern présent dans une
+fraction p des fenêtres a une probabilité ≤ (1 - p)^n, d'où p ≤ ln(1/α) / n ;
+son support est au plus `max_occurrences` × p (occurrences par fenêtre).
+
+Arrêt (`metadata.sampling.stopped`) :
+- `decided` : tous les patterns vus sont au-dessus ou en dessous du seuil,
+  et la borne des patterns jamais vus est sous le seuil
+- `error_target` : demi-largeur de chaque intervalle ≤ `max_error`
+- `exhausted` : toutes les fenêtres ont été tirées (résultat exact)
+- `deadline` : config.deadline_ms atteinte (résultat partiel)
+
+Config:
+{
+  "sampling": {
+    "confidence": 0.95,        # niveau de confiance des intervalles
+    "max_error": 0.02,         # optionnel : demi-largeur visée (arrêt anticipé)
+    "initial_windows": 1000,   # taille du premier échantillon
+    "growth": 2.0,             # facteur de croissance entre deux tours
+    "seed": 0                  # graine du tirage (résultats reproductibles)
+  }
+}
+(`"sampling": true` utilise ces valeurs par défaut)
+"""
+
+import math
+import logging
+from collections import Counter
+from statistics import NormalDist
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_INITIAL_WINDOWS = 1000
+DEFAULT_GROWTH = 2.0
+DEFAULT_SEED = 0
+
+# Tirage hypergéométrique par comptage (tableau temporaire d'un entier par
+# fenêtre, bien plus rapide) jusqu'à ce nombre de fenêtres, par marginales au-delà
+COUNT_METHOD_MAX_WINDOWS = 1 << 22
+
+
+def sampling_params(sampling: Any) -> Dict[str, Any]:
+    """
+    Paramètres de `config.sampling` (true ou objet), validés
+    
+    Args:
+        sampling: Valeur de config.sampling
+    
+    Returns:
+        confidence, max_error, initial_windows, growth, seed
+    """
+    if sampling is True:
+        sampling = {}
+    if not isinstance(sampling, dict):
+        raise ValueError(f"sampling must be true or an object, got {sampling!r}")
+    
+    params = {
+        "confidence": sampling.get('confidence', DEFAULT_CONFIDENCE),
+        "max_error": sampling.get('max_error'),
+        "initial_windows": sampling.get('initial_windows', DEFAULT_INITIAL_WINDOWS),
+        "growth": sampling.get('growth', DEFAULT_GROWTH),
+        "seed": sampling.get('seed', DEFAULT_SEED)
+    }
+    
+    if not 0 < params['confidence'] < 1:
+        raise ValueError(f"sampling.confidence must be in (0, 1), got {params['confidence']!r}")
+    if params['max_error'] is not None and params['max_error'] <= 0:
+        raise ValueError(f"sampling.max_error must be positive, got {params['max_error']!r}")
+    if params['initial_windows'] < 1:
+        raise ValueError(f"sampling.initial_windows must be >= 1, got {params['initial_windows']!r}")
+    if params['growth'] <= 1:
+        raise ValueError(f"sampling.growth must be > 1, got {params['growth']!r}")
+    
+    return params
+
+
+def window_ngrams(seq: List[str], max_length: int) -> List[tuple]:
+    """Occurrences des n-grams contigus de longueur 2..max_length d'une fenêtre"""
+    return [
+        tuple(seq[i:i + length])
+        for length in range(2, max_length + 1)
+        for i in range(len(seq) - length + 1)
+    ]
+
+
+def mine_progressive(
+    sequences: List[List[str]],
+    weights: Optional[List[int]],
+    min_support: float,
+    min_confidence: float,
+    max_length: int = 3,
+    params: Optional[Dict[str, Any]] = None,
+    checkpoint: Optional[Callable[..., bool]] = None
+) -> Tuple[List[Dict[str, Any]], int, Dict[str, Any]]:
+    """
+    Miner les n-grams fréquents sur des échantillons croissants de fenêtres
+    
+    Args:
+        sequences: Séquences de patterns (dédupliquées)
+        weights: Multiplicité de chaque séquence
+        min_support: Support minimum
+        min_confidence: Confidence minimum (confidence = min(1, 1.5 × support))
+        max_length: Longueur maximale des n-grams
+        params: Paramètres de sampling_params()
+        checkpoint: Appelé après chaque tour avec les compteurs ; s'il renvoie
+            True (deadline), l'échantillonnage s'arrête
+    
+    Returns:
+        (patterns avec support estimé et `support_interval`, fenêtres tirées
+         (dénominateur du support), statistiques de l'échantillonnage)
+    """
+    if max_length < 2:
+        raise ValueError(f"max_length must be >= 2, got {max_length!r}")
+    
+    params = params or sampling_params(True)
+    if weights is None:
+        weights = [1] * len(sequences)
+    
+    remaining = np.array(weights, dtype=np.int64)
+    total = int(remaining.sum())
+    if total == 0:
+        return [], 0, {"stopped": "exhausted", "rounds": 0, "sampled_windows": 0, "total_windows": 0}
+    
+    # Le seuil de confidence est un seuil de support (confidence croissante)
+    threshold = max(min_support, min_confidence / 1.5)
+    z = NormalDist().inv_cdf((1 + params['confidence']) / 2)
+    log_alpha = math.log(1 / (1 - params['confidence']))
+    max_occurrences = max(map(len, sequences), default=1) - 1
+    
+    rng = np.random.default_rng(params['seed'])
+    draw_method = 'count' if total <= COUNT_METHOD_MAX_WINDOWS else 'marginals'
+    # Σ occurrences et Σ occurrences² par fenêtre ; le carré ne diffère de
+    # l'occurrence que pour un n-gram répété dans une fenêtre (repeats = Σ c(c - 1))
+    sums: Dict[tuple, int] = {}
+    repeats: Dict[tuple, int] = {}
+    sampled = 0
+    history = []
+    stopped = None
+    
+    while True:
+        # Tour suivant : fenêtres tirées sans remise parmi celles non encore tirées
+        target = min(total, max(params['initial_windows'], math.ceil(sampled * params['growth'])))
+        drawn = rng.multivariate_hypergeometric(remaining, target - sampled, method=draw_method)
+        remaining -= drawn
+        sampled = target
+        
+        for index in np.flatnonzero(drawn).tolist():
+            times = int(drawn[index])
+            ngrams = window_ngrams(sequences[index], max_length)
+            for ngram in ngrams:
+                sums[ngram] = sums.get(ngram, 0) + times
+            
+            if len(set(ngrams)) < len(ngrams):
+                for ngram, count in Counter(ngrams).items():
+                    if count > 1:
+                        repeats[ngram] = repeats.get(ngram, 0) + times * count * (count - 1)
+        
+        # Intervalles : moyenne par fenêtre ± z × erreur type (population finie)
+        correction = 1 - sampled / total
+        occurrences = np.fromiter(sums.values(), dtype=np.float64, count=len(sums))
+        means = occurrences / sampled
+        if sampled > 1:
+            squares = occurrences + np.fromiter(
+                (repeats.get(ngram, 0) for ngram in sums), dtype=np.float64, count=len(sums)
+            )
+            variances = (squares - occurrences * means) / (sampled - 1)
+        else:
+            variances = np.zeros_like(means)
+        half_widths = z * np.sqrt(np.maximum(variances, 0.0) / sampled * correction)
+        
+        undecided = int(np.count_nonzero((means - half_widths < threshold) & (threshold <= means + half_widths)))
+        max_half_width = float(half_widths.max()) if len(half_widths) else 0.0
+        
+        unseen_bound = max_occurrences * log_alpha / sampled if correction > 0 else 0.0
+        history.append({"sampled_windows": sampled, "candidates": len(sums), "undecided": undecided})
+        
+        logger.debug(f"Sampling round {len(history)}: {sampled}/{total} windows, {undecided} undecided")
+        
+        if sampled == total:
+            stopped = 'exhausted'
+        elif undecided == 0 and unseen_bound < threshold:
+            stopped = 'decided'
+        elif (
+            params['max_error'] is not None
+            and max_half_width <= params['max_error']
+            and unseen_bound <= params['max_error']
+        ):
+            stopped = 'error_target'
+        elif checkpoint is not None and checkpoint(
+            stage='sampling', sampled_windows=sampled, candidates=len(sums), undecided=undecided
+        ):
+            stopped = 'deadline'
+        
+        if stopped is not None:
+            break
+    
+    patterns = []
+    for ngram, mean, half_width in zip(sums, means.tolist(), half_widths.tolist()):
+        confidence = min(1.0, mean * 1.5)
+        
+        if mean >= min_support and confidence >= min_confidence:
+            patterns.append({
+                "sequence": list(ngram),
+                "support": round(mean, 3),
+                "confidence": round(confidence, 3),
+                "frequency": sums[ngram],
+                "support_interval": [round(max(0.0, mean - half_width), 3), round(mean + half_width, 3)]
+            })
+    
+    patterns.sort(key=lambda x: x['support'], reverse=True)
+    widths = [pattern['support_interval'][1] - pattern['support_interval'][0] for pattern in patterns]
+    
+    stats = {
+        "stopped": stopped,
+        "rounds": len(history),
+        "sampled_windows": sampled,
+        "total_windows": total,
+        "sampled_fraction": round(sampled / total, 4),
+        "confidence": params['confidence'],
+        "threshold": round(threshold, 4),
+        "undecided": history[-1]['undecided'],
+        "max_error": round(max_half_width, 4),
+        "unseen_support_bound": round(unseen_bound, 4),
+        "interval_width": {
+            "max": round(max(widths), 4) if widths else 0.0,
+            "mean": round(sum(widths) / len(widths), 4) if widths else 0.0
+        },
+        "history": history
+    }
+    
+    logger.info(
+        f"Progressive sampling stopped ({stopped}) after {sampled}/{total} windows "
+        f"({stats['sampled_fraction']:.1%}), {len(patterns)} patterns"
+    )
+    
+    return patterns, sampled, stats
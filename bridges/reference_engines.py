@@ -0,0 +1,183 @@
+"""
+Reference Engines - Implémentations de référence figées des bridges
+
+Copie des versions pur Python d'origine de `_extract_sequences` /
+`_mine_patterns` (PAMI, identiques dans FP-Growth), `_calculate_regularity`
+(Merlion) et `_calculate_pattern_frequencies` (HyperTS), avant toute
+optimisation (fenêtrage configurable, déduplication, index partagé, moteurs
+Apriori / approximé / échantillonné...).
+
+Ce module ne sert qu'à vérifier les moteurs optimisés
+(`scripts/check-engines.py`) : il ne doit être ni optimisé ni modifié, même si
+le code des bridges change. Un écart avec un moteur est un bug du moteur.
+"""
+
+from typing import List, Dict, Any
+
+
+def extract_sequences(timeline: List[Dict]) -> List[List[str]]:
+    """
+    Extraire des séquences de patterns depuis la timeline
+    
+    Args:
+        timeline: Timeline avec events et patterns
+    
+    Returns:
+        Liste de séquences de patterns
+    """
+    sequences = []
+    window_size = 5  # Fenêtre glissante de 5 commits
+    
+    for i in range(len(timeline) - window_size + 1):
+        window = timeline[i:i + window_size]
+        sequence = []
+        
+        for event in window:
+            patterns = event.get('patterns', [])
+            sequence.extend(patterns)
+        
+        if len(sequence) >= 2:  # Au moins 2 patterns
+            sequences.append(sequence)
+    
+    return sequences
+
+
+def mine_patterns(
+    sequences: List[List[str]],
+    min_support: float,
+    min_confidence: float
+) -> List[Dict[str, Any]]:
+    """
+    Comptage exact des paires et triplets contigus
+    
+    Args:
+        sequences: Séquences de patterns
+        min_support: Support minimum
+        min_confidence: Confidence minimum
+    
+    Returns:
+        Patterns fréquents avec support et confidence
+    """
+    # Compter les occurrences de chaque pattern
+    pattern_counts = {}
+    total_sequences = len(sequences)
+    
+    if total_sequences == 0:
+        return []
+    
+    # Patterns de longueur 2 (paires)
+    for seq in sequences:
+        for i in range(len(seq) - 1):
+            pair = tuple(seq[i:i+2])
+            pattern_counts[pair] = pattern_counts.get(pair, 0) + 1
+    
+    # Patterns de longueur 3 (triplets)
+    for seq in sequences:
+        for i in range(len(seq) - 2):
+            triplet = tuple(seq[i:i+3])
+            pattern_counts[triplet] = pattern_counts.get(triplet, 0) + 1
+    
+    # Filtrer par support minimum
+    patterns = []
+    for pattern_tuple, count in pattern_counts.items():
+        support = count / total_sequences
+        
+        if support >= min_support:
+            # Calculer confidence (simplifié : basé sur fréquence relative)
+            confidence = min(1.0, support * 1.5)
+            
+            if confidence >= min_confidence:
+                patterns.append({
+                    "sequence": list(pattern_tuple),
+                    "support": round(support, 3),
+                    "confidence": round(confidence, 3),
+                    "frequency": count
+                })
+    
+    # Trier par support décroissant
+    patterns.sort(key=lambda x: x['support'], reverse=True)
+    
+    return patterns
+
+
+def calculate_regularity(
+    cause: str,
+    effect: str,
+    events: List[Dict],
+    expected_lag: int
+) -> float:
+    """
+    Calculer la régularité temporelle d'une corrélation causale
+    
+    Args:
+        cause: Pattern cause
+        effect: Pattern effet
+        events: Liste des events de la timeline
+        expected_lag: Lag attendu (en commits)
+    
+    Returns:
+        Score de régularité (0-1)
+    """
+    observed_lags = []
+    
+    # Vérifier que expected_lag est valide
+    if expected_lag is None or expected_lag < 0:
+        expected_lag = 1
+    
+    # Chercher toutes les occurrences de cause → effect
+    for i, event in enumerate(events):
+        patterns = event.get('patterns', [])
+        
+        if cause in patterns:
+            # Chercher effect dans les N prochains events
+            search_window = min(expected_lag + 3, len(events) - i - 1)
+            
+            for j in range(1, max(1, search_window + 1)):
+                if i + j < len(events):
+                    future_patterns = events[i + j].get('patterns', [])
+                    if effect in future_patterns:
+                        observed_lags.append(j)
+                        break
+    
+    if not observed_lags:
+        return 0.0
+    
+    # Calculer variance des lags
+    avg_lag = sum(observed_lags) / len(observed_lags)
+    variance = sum((lag - avg_lag) ** 2 for lag in observed_lags) / len(observed_lags)
+    std_dev = variance ** 0.5
+    
+    # Score = inverse de la variance normalisée
+    regularity = max(0.0, 1.0 - (std_dev / (expected_lag + 1)))
+    
+    return regularity
+
+
+def calculate_pattern_frequencies(events: List[Dict]) -> Dict[str, float]:
+    """
+    Calculer les fréquences historiques des patterns
+    
+    Args:
+        events: Liste des events de la timeline
+    
+    Returns:
+        Dict pattern → fréquence (0-1)
+    """
+    pattern_counts = {}
+    total_patterns = 0
+    
+    for event in events:
+        for pattern in event.get('patterns', []):
+            pattern_counts[pattern] = pattern_counts.get(pattern, 0) + 1
+            total_patterns += 1
+    
+    if total_patterns == 0:
+        return {}
+    
+    # Normaliser en fréquences
+    frequencies = {
+        pattern: count / total_patterns
+        for pattern, count in pattern_counts.items()
+    }
+    
+    return frequencies
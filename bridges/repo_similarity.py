@@ -0,0 +1,290 @@
+"""
+Repo Similarity - Index MinHash / LSH des profils de patterns des repos
+
+Répond à « quels repos ont un comportement de commits proche de celui-ci ? »
+(transfert de forecasts, repos de référence) sans comparer les ~500
+timelines deux à deux.
+
+- Profil d'un repo : ensemble de ses n-grams de patterns (2..max_length),
+  comme dans l'index universel (`repo_ngrams`)
+- Signature MinHash : pour chacune des `num_perm` fonctions de hachage
+  h(x) = (a·x + b) mod (2^61 - 1), le minimum sur les n-grams du repo ; la
+  proportion de positions égales entre deux signatures estime la similarité
+  de Jaccard des deux ensembles
+- Banding LSH : la signature est découpée en `bands` bandes de r lignes, et
+  chaque bande est rangée dans un bucket (haché). Deux repos de similarité s
+  partagent au moins un bucket avec une probabilité 1 - (1 - s^r)^bands
+  (seuil ≈ (1 / bands)^(1 / r)).
+
+Une requête ne compare la signature qu'aux repos des buckets qu'elle touche
+(candidats), pas à tout le corpus. Comme l'index universel, `update()` ne
+recalcule que les timelines nouvelles ou modifiées et retire les repos dont
+la timeline a disparu.
+
+Format persistant (JSON) : signatures en hexadécimal (uint32 little-endian),
+buckets par bande (clé de bucket → repos).
+"""
+
+import os
+import json
+import zlib
+import hashlib
+import logging
+from typing import List, Dict, Any, Optional, Tuple, Set
+
+import numpy as np
+
+from universal_index import repo_ngrams, DEFAULT_MAX_LENGTH, PATTERN_SEPARATOR
+from timeline_reader import sync_timeline_sources
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_INDEX_VERSION = 1
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 32
+DEFAULT_SEED = 1
+DEFAULT_TOP_K = 10
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+# N-grams hachés par bloc (tableau num_perm × bloc en mémoire)
+HASH_CHUNK = 8192
+
+
+class RepoSimilarityIndex:
+    """Signatures MinHash des repos et buckets LSH, mis à jour incrémentalement"""
+    
+    def __init__(
+        self,
+        num_perm: int = DEFAULT_NUM_PERM,
+        bands: int = DEFAULT_BANDS,
+        max_length: int = DEFAULT_MAX_LENGTH,
+        window_config: Optional[Dict[str, Any]] = None,
+        seed: int = DEFAULT_SEED
+    ):
+        if bands < 1 or num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a positive multiple of bands ({bands})")
+        if max_length < 2:
+            raise ValueError(f"max_length must be >= 2, got {max_length!r}")
+        
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_length = max_length
+        self.window_config = window_config or {}
+        self.seed = seed
+        
+        # Fonctions de hachage : a·x + b < 2^64 pour x, a, b < 2^32 (pas de débordement)
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MAX_HASH, size=(num_perm, 1), dtype=np.uint64, endpoint=True)
+        self.b = rng.integers(0, MAX_HASH, size=(num_perm, 1), dtype=np.uint64, endpoint=True)
+        
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.ngram_counts: Dict[str, int] = {}
+        self.buckets: List[Dict[str, List[str]]] = [{} for _ in range(bands)]
+        
+        # Empreinte des fichiers indexés : chemin → [mtime_ns, taille]
+        self.sources: Dict[str, List[int]] = {}
+        self.source_repos: Dict[str, str] = {}
+    
+    def signature(self, ngrams: Set[Tuple[str, ...]]) -> Optional[np.ndarray]:
+        """
+        Signature MinHash d'un ensemble de n-grams
+        
+        Args:
+            ngrams: N-grams du repo
+        
+        Returns:
+            Tableau uint32[num_perm], None si l'ensemble est vide
+        """
+        if not ngrams:
+            return None
+        
+        hashes = np.fromiter(
+            (zlib.crc32(PATTERN_SEPARATOR.join(ngram).encode('utf-8')) for ngram in ngrams),
+            dtype=np.uint64,
+            count=len(ngrams)
+        )
+        
+        signature = np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+        for start in range(0, len(hashes), HASH_CHUNK):
+            chunk = hashes[start:start + HASH_CHUNK]
+            permuted = (self.a * chunk + self.b) % np.uint64(MERSENNE_PRIME) & np.uint64(MAX_HASH)
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        
+        return signature.astype(np.uint32)
+    
+    def band_keys(self, signature: np.ndarray) -> List[str]:
+        """Clé de bucket de chaque bande (hachage des r lignes)"""
+        return [
+            hashlib.blake2b(signature[i * self.rows:(i + 1) * self.rows].tobytes(), digest_size=8).hexdigest()
+            for i in range(self.bands)
+        ]
+    
+    def add_repo(self, repo: str, events: List[Dict]):
+        """Indexer (ou réindexer) la timeline d'un repo"""
+        if repo in self.signatures or repo in self.ngram_counts:
+            self.remove_repo(repo)
+        
+        ngrams = repo_ngrams(events, self.max_length, self.window_config)
+        self.ngram_counts[repo] = len(ngrams)
+        
+        # Repo sans n-gram : pas de similarité définie, hors des buckets
+        signature = self.signature(ngrams)
+        if signature is None:
+            return
+        
+        self.signatures[repo] = signature
+        for band, key in zip(self.buckets, self.band_keys(signature)):
+            band.setdefault(key, []).append(repo)
+    
+    def remove_repo(self, repo: str):
+        """Retirer un repo de ses buckets"""
+        self.ngram_counts.pop(repo, None)
+        signature = self.signatures.pop(repo, None)
+        if signature is None:
+            return
+        
+        for band, key in zip(self.buckets, self.band_keys(signature)):
+            members = band[key]
+            members.remove(repo)
+            if not members:
+                del band[key]
+    
+    def update(self, corpus_dir: str) -> Dict[str, int]:
+        """
+        Synchroniser l'index avec les timelines du corpus
+        
+        Seuls les fichiers nouveaux ou modifiés sont relus.
+        
+        Args:
+            corpus_dir: Dossier contenant les `timeline_*` (brutes, compressées ou NDJSON)
+        
+        Returns:
+            Nombre de repos ajoutés, réindexés, retirés et inchangés
+        """
+        stats = sync_timeline_sources(
+            corpus_dir, self.sources, self.source_repos, self.add_repo, self.remove_repo
+        )
+        
+        logger.info(
+            f"Similarity index update: {stats['added']} added, {stats['updated']} updated, "
+            f"{stats['removed']} removed, {stats['unchanged']} unchanged"
+        )
+        return stats
+    
+    def similar(
+        self,
+        signature: np.ndarray,
+        top_k: int = DEFAULT_TOP_K,
+        min_similarity: float = 0.0,
+        exclude: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Repos les plus proches d'une signature parmi les candidats LSH
+        
+        Args:
+            signature: Signature MinHash du repo de référence
+            top_k: Nombre de repos retournés
+            min_similarity: Similarité de Jaccard estimée minimale
+            exclude: Repo à ignorer (le repo de référence lui-même)
+        
+        Returns:
+            (repos par similarité décroissante, nombre de candidats comparés)
+        """
+        candidates: Set[str] = set()
+        for band, key in zip(self.buckets, self.band_keys(signature)):
+            candidates.update(band.get(key, ()))
+        candidates.discard(exclude)
+        
+        if not candidates:
+            return [], 0
+        
+        # Candidats comparés en un bloc : positions égales par ligne de la matrice
+        names = sorted(candidates)
+        equal = np.stack([self.signatures[repo] for repo in names]) == signature
+        similarities = equal.mean(axis=1)
+        bands_matched = equal.reshape(len(names), self.bands, self.rows).all(axis=2).sum(axis=1)
+        
+        results = [
+            {"repo": repo, "similarity": round(float(similarity), 3), "bands_matched": int(matched)}
+            for repo, similarity, matched in zip(names, similarities, bands_matched)
+            if similarity >= min_similarity
+        ]
+        
+        results.sort(key=lambda item: -item['similarity'])
+        return results[:top_k], len(candidates)
+    
+    def threshold(self) -> float:
+        """Similarité à partir de laquelle deux repos deviennent probablement candidats"""
+        return (1 / self.bands) ** (1 / self.rows)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Forme sérialisable (signatures en hexadécimal)"""
+        return {
+            "version": SIMILARITY_INDEX_VERSION,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "max_length": self.max_length,
+            "window_config": self.window_config,
+            "seed": self.seed,
+            "repos": {
+                repo: {
+                    "ngrams": count,
+                    "signature": self.signatures[repo].astype('<u4').tobytes().hex()
+                    if repo in self.signatures else None
+                }
+                for repo, count in self.ngram_counts.items()
+            },
+            "sources": {
+                path: {"fingerprint": fingerprint, "repo": self.source_repos[path]}
+                for path, fingerprint in self.sources.items()
+            },
+            "buckets": self.buckets
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RepoSimilarityIndex':
+        """Reconstruire un index depuis to_dict()"""
+        if data.get('version') != SIMILARITY_INDEX_VERSION:
+            raise ValueError(f"Unsupported similarity index version: {data.get('version')!r}")
+        
+        index = cls(data['num_perm'], data['bands'], data['max_length'], data.get('window_config'), data['seed'])
+        
+        for repo, entry in data['repos'].items():
+            index.ngram_counts[repo] = entry['ngrams']
+            if entry['signature'] is not None:
+                index.signatures[repo] = np.frombuffer(bytes.fromhex(entry['signature']), dtype='<u4').astype(np.uint32)
+        
+        for path, source in data['sources'].items():
+            index.sources[path] = source['fingerprint']
+            index.source_repos[path] = source['repo']
+        
+        index.buckets = data['buckets']
+        return index
+    
+    def save(self, path: str):
+        """Écrire l'index sur disque (JSON, fichier temporaire renommé)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'RepoSimilarityIndex':
+        """Charger un index écrit par save()"""
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+    
+    def summary(self) -> Dict[str, Any]:
+        """Résumé compact pour les métadonnées"""
+        return {
+            "repos": len(self.signatures),
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "rows": self.rows,
+            "threshold": round(self.threshold(), 3),
+            "buckets": sum(len(band) for band in self.buckets),
+            "max_length": self.max_length
+        }
@@ -0,0 +1,272 @@
+"""
+Result Diff - Empreinte de contenu des résultats et réponses différentielles
+
+`result_hash` ne hachait que le nombre de patterns : deux résultats différents
+de même taille avaient la même empreinte, et les moteurs TS refusionnaient les
+listes complètes à chaque cycle. Ce module donne à chaque bridge :
+
+- une empreinte canonique du contenu de `data`, indépendante de l'ordre des
+  éléments des listes (patterns, corrélations, forecasts...) : chaque élément
+  est sérialisé en JSON canonique (clés triées), puis les éléments sont triés
+- un stockage des résultats par empreinte (l'empreinte sert d'identifiant de
+  résultat), dans `.reasoning_rl4/meta/results/<bridge>/<repo>/`
+- un diff par identité d'élément : avec `config.previous_fingerprint`, le
+  bridge ne renvoie que les éléments ajoutés, retirés et modifiés depuis ce
+  résultat
+
+Identité d'un élément : les champs de COLLECTION_KEYS pour les collections
+connues (ex. `sequence` d'un pattern, `cause` / `effect` / `lag` d'une
+corrélation), l'élément entier sinon (ajouté ou retiré, jamais « modifié »).
+
+Config:
+{
+  "result_store": true,                 # conserver le résultat (diff au prochain appel)
+  "previous_fingerprint": "3f2a9c..."   # diff contre ce résultat (implique result_store)
+}
+
+Réponse différentielle : `data` = {collection: {"added": [...], "changed":
+[...], "removed": [identités], "unchanged": n}} (les autres clés de `data`
+n'apparaissent que si elles ont changé), `metadata.diff` résume le diff. Si
+le résultat de base est introuvable (`base_found: false`), `data` est complet.
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULTS_DIR = '.reasoning_rl4/meta/results'
+
+# Résultats conservés par bridge et par repo (les plus récents)
+DEFAULT_KEEP_RESULTS = 8
+
+# Collection de `data` → champs qui identifient un élément
+COLLECTION_KEYS = {
+    "patterns": ("sequence",),
+    "refined_correlations": ("cause", "effect", "lag"),
+    "detected_anomalies": ("pattern", "t", "commit"),
+    "change_points": ("t", "commit"),
+    "segments": ("start", "end"),
+    "enriched_forecasts": ("predicted", "horizon"),
+    "universals": ("sequence",),
+    "sequences": ("sequence",),
+    "thresholds": ("min_support", "min_confidence"),
+    "similar": ("repo",)
+}
+
+# Nom de la collection quand `data` est directement une liste (PAMI, FP-Growth)
+LIST_COLLECTION = "patterns"
+
+
+def canonical_json(value: Any) -> str:
+    """Sérialisation JSON canonique (clés triées, sans espaces)"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def result_sections(data: Any) -> Dict[str, Any]:
+    """Sections de `data` (une liste seule devient la collection `patterns`)"""
+    if isinstance(data, list):
+        return {LIST_COLLECTION: data}
+    if isinstance(data, dict):
+        return data
+    return {"value": data}
+
+
+def result_fingerprint(data: Any) -> str:
+    """
+    Empreinte du contenu d'un résultat, indépendante de l'ordre des listes
+    
+    Args:
+        data: `data` de la réponse du bridge
+    
+    Returns:
+        16 caractères hexadécimaux (SHA-256 tronqué)
+    """
+    digest = hashlib.sha256()
+    
+    for name, value in sorted(result_sections(data).items()):
+        digest.update(canonical_json(name).encode('utf-8'))
+        if isinstance(value, list):
+            for item in sorted(canonical_json(item) for item in value):
+                digest.update(b'\n')
+                digest.update(item.encode('utf-8'))
+        else:
+            digest.update(b'=')
+            digest.update(canonical_json(value).encode('utf-8'))
+        digest.update(b'\0')
+    
+    return digest.hexdigest()[:16]
+
+
+def item_identity(item: Any, fields: Optional[Tuple[str, ...]]) -> Any:
+    """Identité d'un élément : ses champs clés, ou l'élément entier"""
+    if fields and isinstance(item, dict) and all(field in item for field in fields):
+        return {field: item[field] for field in fields}
+    return item
+
+
+def diff_collection(
+    previous: List[Any],
+    current: List[Any],
+    fields: Optional[Tuple[str, ...]] = None
+) -> Dict[str, Any]:
+    """
+    Éléments ajoutés, modifiés et retirés entre deux versions d'une liste
+    
+    Args:
+        previous: Liste du résultat de base
+        current: Liste du résultat courant
+        fields: Champs d'identité (None : élément entier)
+    
+    Returns:
+        added / changed (éléments courants), removed (identités), unchanged
+    """
+    def indexed(items: List[Any]) -> Dict[Tuple[str, int], Any]:
+        # Identités en double (rare) : distinguées par leur rang
+        seen: Dict[str, int] = {}
+        index = {}
+        for item in items:
+            key = canonical_json(item_identity(item, fields))
+            rank = seen.get(key, 0)
+            seen[key] = rank + 1
+            index[(key, rank)] = item
+        return index
+    
+    before = indexed(previous)
+    after = indexed(current)
+    
+    added, changed = [], []
+    unchanged = 0
+    for key, item in after.items():
+        if key not in before:
+            added.append(item)
+        elif canonical_json(before[key]) != canonical_json(item):
+            changed.append(item)
+        else:
+            unchanged += 1
+    
+    removed = [item_identity(item, fields) for key, item in before.items() if key not in after]
+    
+    return {"added": added, "changed": changed, "removed": removed, "unchanged": unchanged}
+
+
+def diff_results(previous: Any, current: Any) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    Diff de deux résultats section par section
+    
+    Args:
+        previous: `data` du résultat de base
+        current: `data` du résultat courant
+    
+    Returns:
+        (data différentielle, totaux added / changed / removed / unchanged)
+    """
+    before = result_sections(previous)
+    after = result_sections(current)
+    
+    delta: Dict[str, Any] = {}
+    totals = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+    
+    for name, value in after.items():
+        base = before.get(name)
+        
+        if isinstance(value, list) and isinstance(base, list):
+            section = diff_collection(base, value, COLLECTION_KEYS.get(name))
+            delta[name] = section
+            for key in ('added', 'changed', 'removed'):
+                totals[key] += len(section[key])
+            totals["unchanged"] += section["unchanged"]
+        elif name not in before or canonical_json(base) != canonical_json(value):
+            # Valeur hors collection : renvoyée entière si elle a changé
+            delta[name] = value
+    
+    return delta, totals
+
+
+class ResultStore:
+    """Résultats d'un bridge rangés par repo et par empreinte"""
+    
+    def __init__(self, bridge: str, root: str = DEFAULT_RESULTS_DIR, keep: int = DEFAULT_KEEP_RESULTS):
+        self.directory = os.path.join(root, bridge)
+        self.keep = keep
+    
+    def _repo_dir(self, repo: str) -> str:
+        return os.path.join(self.directory, re.sub(r'[^A-Za-z0-9._-]', '_', repo) or '_')
+    
+    def save(self, repo: str, fingerprint: str, data: Any):
+        """Conserver un résultat (fichier temporaire renommé), puis élaguer les plus anciens"""
+        repo_dir = self._repo_dir(repo)
+        os.makedirs(repo_dir, exist_ok=True)
+        
+        path = os.path.join(repo_dir, f"{fingerprint}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        
+        stored = sorted(
+            (entry for entry in os.scandir(repo_dir) if entry.name.endswith('.json')),
+            key=lambda entry: entry.stat().st_mtime_ns,
+            reverse=True
+        )
+        for entry in stored[self.keep:]:
+            os.remove(entry.path)
+    
+    def load(self, repo: str, fingerprint: str) -> Optional[Any]:
+        """Résultat conservé sous cette empreinte, None s'il est absent"""
+        if not re.fullmatch(r'[0-9a-f]+', fingerprint or ''):
+            return None
+        
+        path = os.path.join(self._repo_dir(repo), f"{fingerprint}.json")
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+def diff_response(
+    data: Any,
+    fingerprint: str,
+    bridge: str,
+    repo: str,
+    config: Dict[str, Any]
+) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """
+    Conserver le résultat et le réduire à un diff si une base est demandée
+    
+    Args:
+        data: `data` complète de la réponse
+        fingerprint: Empreinte de data (result_fingerprint)
+        bridge: Nom du bridge (dossier de stockage)
+        repo: Repo du résultat
+        config: Config de l'input (result_store, previous_fingerprint)
+    
+    Returns:
+        (data complète ou différentielle, metadata.diff ou None)
+    """
+    previous = config.get('previous_fingerprint')
+    if previous is None and not config.get('result_store'):
+        return data, None
+    
+    store = ResultStore(bridge)
+    store.save(repo, fingerprint, data)
+    
+    if previous is None:
+        return data, None
+    
+    base = store.load(repo, previous)
+    if base is None:
+        logger.info(f"Base result {previous} not found for {repo}, returning full result")
+        return data, {"base": previous, "base_found": False}
+    
+    delta, totals = diff_results(base, data)
+    logger.info(
+        f"Diff against {previous}: {totals['added']} added, {totals['changed']} changed, "
+        f"{totals['removed']} removed, {totals['unchanged']} unchanged"
+    )
+    return delta, {"base": previous, "base_found": True, **totals}
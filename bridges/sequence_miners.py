@@ -0,0 +1,240 @@
+"""
+Sequence Miners - Algorithmes de mining de n-grams partagés par les bridges
+
+Algorithmes utilisés par `pami_bridge.py` et `fpgrowth_bridge.py` en plus du
+comptage naïf paires + triplets.
+
+- `mine_frequent_ngrams` : mining level-wise (Apriori) des n-grams contigus de
+  longueur 2..max_length. Un (k+1)-gram n'est compté que si son préfixe et son
+  suffixe de longueur k sont fréquents, ce qui borne l'espace des candidats.
+  Les n-grams sont encodés en entiers (base = taille du vocabulaire), donc les
+  ensembles fréquents de chaque niveau sont de simples `set[int]`.
+- `condense_patterns` : réduction d'un résultat aux patterns fermés (closed)
+  ou maximaux (maximal).
+"""
+
+import logging
+from typing import List, Dict, Any, Tuple, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+# Nombre de séquences entre deux appels à should_stop
+CHECK_EVERY = 1024
+
+# Modes de sortie : tous les patterns, fermés, maximaux
+PATTERN_MODES = ('all', 'closed', 'maximal')
+
+
+def encode_sequences(sequences: List[List]) -> Tuple[List[List[int]], List]:
+    """
+    Encoder les labels des séquences en entiers
+    
+    Args:
+        sequences: Séquences de patterns
+    
+    Returns:
+        (séquences encodées, labels indexés par code)
+    """
+    codes: Dict[Any, int] = {}
+    encoded = []
+    
+    for sequence in sequences:
+        encoded.append([codes.setdefault(label, len(codes)) for label in sequence])
+    
+    return encoded, list(codes)
+
+
+def decode_ngram(code: int, length: int, base: int, labels: List) -> Tuple:
+    """Décoder un n-gram encodé en base `base` vers le tuple de labels"""
+    items = []
+    
+    for _ in range(length):
+        code, digit = divmod(code, base)
+        items.append(labels[digit])
+    
+    return tuple(reversed(items))
+
+
+def mine_frequent_ngrams(
+    sequences: List[List],
+    min_support: float,
+    max_length: int = 3,
+    weights: Optional[List[int]] = None,
+    on_level: Optional[Callable[[int, Dict[Tuple, int], int], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> Tuple[Dict[Tuple, int], List[Dict[str, Any]]]:
+    """
+    Miner les n-grams contigus fréquents de longueur 2..max_length (Apriori)
+    
+    Le support d'un n-gram est son nombre d'occurrences (pondéré) divisé par
+    le nombre de séquences, comme dans le comptage naïf. Une occurrence d'un
+    (k+1)-gram implique une occurrence de son préfixe et de son suffixe : un
+    candidat dont l'un des deux est rare ne peut pas être fréquent.
+    
+    Args:
+        sequences: Séquences de patterns
+        min_support: Support minimum
+        max_length: Longueur maximale des n-grams
+        weights: Multiplicité de chaque séquence (fenêtres dédupliquées)
+        on_level: Appelé avec (longueur, n-grams fréquents du niveau, poids des
+            séquences comptées) dès qu'un niveau est terminé : ses résultats
+            sont alors définitifs
+        should_stop: Consulté tous les CHECK_EVERY séquences ; s'il renvoie
+            True, le niveau en cours s'arrête (marqué `interrupted`, avec sa
+            `coverage`) : son support est estimé sur les séquences déjà
+            comptées et les niveaux suivants ne sont pas minés
+    
+    Returns:
+        (n-gram → occurrences pour les n-grams fréquents de longueur ≥ 2,
+         statistiques par niveau)
+    """
+    if max_length < 2:
+        raise ValueError(f"max_length must be >= 2, got {max_length!r}")
+    
+    if weights is None:
+        weights = [1] * len(sequences)
+    total_sequences = sum(weights)
+    
+    if total_sequences == 0:
+        return {}, []
+    
+    encoded, labels = encode_sequences(sequences)
+    base = max(len(labels), 1)
+    
+    # Niveau 1 : occurrences des labels seuls (ne sont pas émis, servent à l'élagage)
+    unigram_counts: Dict[int, int] = {}
+    for seq, weight in zip(encoded, weights):
+        for code in seq:
+            unigram_counts[code] = unigram_counts.get(code, 0) + weight
+    
+    frequent = {
+        code for code, count in unigram_counts.items()
+        if count / total_sequences >= min_support
+    }
+    
+    # Par séquence : position de départ → code du (k-1)-gram fréquent qui y commence
+    starts = [
+        {i: code for i, code in enumerate(seq) if code in frequent}
+        for seq in encoded
+    ]
+    
+    results: Dict[Tuple, int] = {}
+    levels = []
+    
+    for length in range(2, max_length + 1):
+        counts: Dict[int, int] = {}
+        candidates = []
+        n_candidates = 0
+        interrupted = False
+        
+        for n, (seq, weight, previous) in enumerate(zip(encoded, weights, starts)):
+            if should_stop is not None and n % CHECK_EVERY == 0 and should_stop():
+                interrupted = True
+                break
+            
+            # Préfixe fréquent en i et suffixe fréquent en i + 1
+            seq_candidates = [
+                (i, gram * base + seq[i + length - 1])
+                for i, gram in previous.items()
+                if i + 1 in previous
+            ]
+            
+            for _, gram in seq_candidates:
+                counts[gram] = counts.get(gram, 0) + weight
+            
+            candidates.append(seq_candidates)
+            n_candidates += len(seq_candidates)
+        
+        # Niveau interrompu : support estimé sur les n premières séquences
+        counted_weight = sum(weights[:n]) if interrupted else total_sequences
+        
+        frequent = set()
+        level_results: Dict[Tuple, int] = {}
+        for gram, count in counts.items():
+            if count / counted_weight >= min_support:
+                frequent.add(gram)
+                level_results[decode_ngram(gram, length, base, labels)] = count
+        
+        results.update(level_results)
+        if on_level is not None:
+            on_level(length, level_results, counted_weight)
+        
+        level_stats = {
+            "length": length,
+            "occurrences_counted": n_candidates,
+            "distinct_candidates": len(counts),
+            "frequent": len(frequent)
+        }
+        if interrupted:
+            level_stats["interrupted"] = True
+            level_stats["coverage"] = round(counted_weight / total_sequences, 4)
+        levels.append(level_stats)
+        
+        logger.debug(f"Level {length}: {len(counts)} candidates, {len(frequent)} frequent")
+        
+        if interrupted:
+            logger.info(f"Level {length} interrupted after {n} sequences")
+            break
+        
+        if not frequent:
+            break
+        
+        starts = [
+            {i: gram for i, gram in seq_candidates if gram in frequent}
+            for seq_candidates in candidates
+        ]
+    
+    return results, levels
+
+
+def condense_patterns(
+    patterns: List[Dict[str, Any]],
+    mode: str
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Retirer les patterns subsumés par un pattern plus long du résultat
+    
+    - `closed` : un n-gram est retiré si une extension d'un item (à gauche ou
+      à droite) présente dans le résultat a la même fréquence
+    - `maximal` : un n-gram est retiré dès qu'une extension d'un item est
+      présente dans le résultat
+    
+    Tester les extensions d'un item suffit : une occurrence d'un n-gram plus
+    long implique une occurrence de chaque n-gram intermédiaire, dont la
+    fréquence est donc comprise entre les deux. Chaque pattern de longueur
+    ≥ 3 marque son préfixe et son suffixe par lookup dans une table
+    séquence → fréquence : O(patterns).
+    
+    Args:
+        patterns: Patterns du miner (`sequence`, `frequency`)
+        mode: Un de PATTERN_MODES
+    
+    Returns:
+        (patterns conservés dans l'ordre d'origine, statistiques de compression)
+    """
+    if mode not in PATTERN_MODES:
+        raise ValueError(f"Unknown pattern mode {mode!r}, expected one of {PATTERN_MODES}")
+    
+    kept = patterns
+    if mode != 'all':
+        frequencies = {tuple(pattern['sequence']): pattern['frequency'] for pattern in patterns}
+        subsumed = set()
+        
+        for pattern in patterns:
+            sequence = tuple(pattern['sequence'])
+            if len(sequence) < 3:
+                continue
+            
+            for sub in (sequence[:-1], sequence[1:]):
+                frequency = frequencies.get(sub)
+                if frequency is not None and (mode == 'maximal' or frequency == pattern['frequency']):
+                    subsumed.add(sub)
+        
+        kept = [pattern for pattern in patterns if tuple(pattern['sequence']) not in subsumed]
+    
+    return kept, {
+        "mode": mode,
+        "patterns_before": len(patterns),
+        "patterns_after": len(kept),
+        "compression_ratio": round(len(patterns) / len(kept), 3) if kept else 1.0
+    }
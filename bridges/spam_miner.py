@@ -0,0 +1,367 @@
+"""
+SPAM Miner - Motifs séquentiels d'itemsets par bitmaps verticaux
+
+Les autres moteurs aplatissent chaque fenêtre (`sequence.extend(patterns)`) :
+une paire y mélange deux labels d'un même commit et une transition d'un commit
+au suivant, et chaque support est recompté en reparcourant les séquences.
+
+Ce moteur (`config.engine = "spam"`, PAMI) garde chaque commit comme un
+itemset et mine de vrais motifs séquentiels avec trous, à la manière de SPAM
+(Ayres et al., 2002) :
+- chaque label fréquent a un bitmap vertical : ses positions dans la timeline,
+  découpées par fenêtre et empaquetées (np.packbits), un mot par fenêtre
+  (uint8 pour la fenêtre par défaut de 5 commits)
+- I-step (label ajouté au dernier itemset, même commit) : AND des bitmaps
+- S-step (nouvel itemset dans un commit ultérieur de la fenêtre) : bits
+  strictement après le premier bit à 1, puis AND
+- support = nombre de fenêtres dont le bitmap est non nul
+
+Un motif est `<{a, b}, {c}>` : `a` et `b` dans un même commit, suivis de `c`
+dans un commit ultérieur de la même fenêtre (trous autorisés). Le support est
+la fraction des fenêtres (d'au moins 2 labels, même dénominateur que les
+autres moteurs) qui contiennent le motif, `frequency` leur nombre : une
+fenêtre compte une fois même si le motif y apparaît plusieurs fois.
+
+Le parcours est en profondeur avec élagage Apriori : seuls les labels restés
+fréquents après un S-step (resp. I-step) sont candidats aux extensions du
+nœud suivant. La longueur d'un motif est son nombre total de labels
+(`max_length`, 3 par défaut comme les triplets des autres moteurs).
+"""
+
+import logging
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_LENGTH = 3
+
+# Séparateur des labels d'un même itemset dans `sequence` (ex. "feature+test")
+ITEMSET_SEPARATOR = '+'
+
+# Largeur de mot (bits) → dtype little-endian : bit i du mot = i-ème commit de la fenêtre
+WORD_DTYPES = ((8, '<u1'), (16, '<u2'), (32, '<u4'), (64, '<u8'))
+
+# Taille maximale du bitmap d'un label (fenêtres temporelles très larges : refus explicite)
+MAX_BITMAP_BYTES = 64 * 1024 * 1024
+
+# Cellules (fenêtre × commit) dépaquetées à la fois lors de la construction d'un bitmap
+BUILD_BLOCK_CELLS = 1 << 22
+
+
+def word_layout(max_window: int) -> Tuple[int, np.dtype, int]:
+    """
+    Format des bitmaps pour une longueur de fenêtre maximale
+    
+    Args:
+        max_window: Nombre maximal d'events dans une fenêtre
+    
+    Returns:
+        (bits par mot, dtype du mot, nombre de mots par fenêtre)
+    """
+    for bits, dtype in WORD_DTYPES:
+        if max_window <= bits:
+            return bits, np.dtype(dtype), 1
+    
+    return 64, np.dtype('<u8'), -(-max_window // 64)
+
+
+def after_first(bitmap: np.ndarray) -> np.ndarray:
+    """
+    Transformation du S-step : bits strictement après le premier bit à 1 de chaque fenêtre
+    
+    Args:
+        bitmap: Bitmaps par fenêtre, (fenêtres,) ou (fenêtres, mots)
+    
+    Returns:
+        Bitmap de même forme (nul pour les fenêtres vides)
+    """
+    one = bitmap.dtype.type(1)
+    
+    # Bit le plus bas de chaque mot, puis tous les bits au-dessus
+    # (mot vide : low = 0, (0 << 1) - 1 = ~0, complément nul)
+    low = bitmap & (~bitmap + one)
+    after = ~((low << one) - one)
+    
+    if bitmap.ndim == 2 and bitmap.shape[1] > 1:
+        # Mots suivant le premier mot non nul : entièrement après le premier bit
+        seen = np.logical_or.accumulate(bitmap != 0, axis=1)
+        after[:, 1:][seen[:, :-1]] = np.iinfo(bitmap.dtype).max
+    
+    return after
+
+
+def count_windows(bitmap: np.ndarray) -> int:
+    """Nombre de fenêtres dont le bitmap est non nul"""
+    if bitmap.ndim == 2:
+        return int(np.count_nonzero(bitmap.any(axis=1)))
+    return int(np.count_nonzero(bitmap))
+
+
+def windows_containing(
+    positions: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray
+) -> int:
+    """
+    Nombre de fenêtres contenant au moins une des positions d'un label
+    
+    Les fenêtres contenant une position p forment l'intervalle
+    [searchsorted(ends, p, 'right'), searchsorted(starts, p, 'right')) car
+    starts et ends sont croissants : la taille de l'union des intervalles se
+    calcule en O(occurrences), sans construire le bitmap.
+    
+    Args:
+        positions: Positions (indices d'events) triées du label
+        starts: Débuts des fenêtres
+        ends: Fins (exclusives) des fenêtres
+    
+    Returns:
+        Nombre de fenêtres couvertes
+    """
+    lo = np.searchsorted(ends, positions, side='right')
+    hi = np.searchsorted(starts, positions, side='right')
+    
+    # Intervalles triés : ne compter que la partie au-delà des précédents
+    reached = np.maximum.accumulate(hi)
+    previous = np.concatenate(([0], reached[:-1]))
+    
+    return int(np.maximum(0, hi - np.maximum(lo, previous)).sum())
+
+
+class VerticalBitmaps:
+    """Bitmaps verticaux des labels d'une timeline découpée en fenêtres"""
+    
+    def __init__(self, event_patterns: List[List], bounds: List[Tuple[int, int]]):
+        """
+        Indexer les positions des labels et retenir les fenêtres comptées
+        
+        Args:
+            event_patterns: Patterns de chaque event
+            bounds: Bornes (start, end) des fenêtres (voir timeline_windows.py)
+        """
+        n_events = len(event_patterns)
+        
+        # Fenêtres d'au moins 2 labels (dénominateur des autres moteurs)
+        label_counts = np.zeros(n_events + 1, dtype=np.int64)
+        np.cumsum([len(patterns) for patterns in event_patterns], out=label_counts[1:])
+        
+        starts = np.array([start for start, _ in bounds], dtype=np.int64)
+        ends = np.array([end for _, end in bounds], dtype=np.int64)
+        if len(bounds) > 0:
+            kept = label_counts[ends] - label_counts[starts] >= 2
+            starts, ends = starts[kept], ends[kept]
+        
+        self.n_events = n_events
+        self.starts = starts
+        self.ends = ends
+        self.windows = len(starts)
+        
+        # Positions de chaque label (un commit = un itemset : doublons ignorés)
+        positions: Dict[Any, List[int]] = {}
+        for i, patterns in enumerate(event_patterns):
+            for label in set(patterns):
+                positions.setdefault(label, []).append(i)
+        self.positions = {label: np.array(indices, dtype=np.int64) for label, indices in positions.items()}
+        
+        lengths = ends - starts
+        max_window = int(lengths.max()) if self.windows else 1
+        self.bits, self.dtype, self.n_words = word_layout(max_window)
+        self.width = self.bits * self.n_words
+        
+        bitmap_bytes = self.windows * self.width // 8
+        if bitmap_bytes > MAX_BITMAP_BYTES:
+            raise ValueError(
+                f"Windows too wide for the spam engine: {max_window} events max, "
+                f"{bitmap_bytes} bytes per label bitmap (limit {MAX_BITMAP_BYTES}); "
+                f"reduce window_hours or use window_size"
+            )
+        
+        # Longueurs à masquer : fenêtres plus courtes que le mot (ou temporelles)
+        self.lengths = lengths
+        self.masked = self.windows > 0 and int(lengths.min()) < self.width
+    
+    def label_windows(self, label: Any) -> int:
+        """Nombre de fenêtres comptées contenant le label"""
+        return windows_containing(self.positions[label], self.starts, self.ends)
+    
+    def bitmap(self, label: Any) -> np.ndarray:
+        """
+        Bitmap vertical d'un label : un mot (ou n_words mots) par fenêtre
+        
+        Args:
+            label: Label de pattern
+        
+        Returns:
+            Tableau (fenêtres,) ou (fenêtres, mots) du dtype de word_layout
+        """
+        # Vue glissante sans copie : ligne i = commits i..i+width de la timeline
+        present = np.zeros(self.n_events + self.width, dtype=bool)
+        present[self.positions[label]] = True
+        rows = np.lib.stride_tricks.sliding_window_view(present, self.width)
+        
+        offsets = np.arange(self.width)
+        packed = np.empty((self.windows, self.width // 8), dtype=np.uint8)
+        block = max(1, BUILD_BLOCK_CELLS // self.width)
+        for first in range(0, self.windows, block):
+            cells = rows[self.starts[first:first + block]]
+            if self.masked:
+                # Commits au-delà de la fin de la fenêtre
+                cells &= offsets[None, :] < self.lengths[first:first + block, None]
+            packed[first:first + block] = np.packbits(cells, axis=1, bitorder='little')
+        
+        words = packed.view(self.dtype)
+        
+        return words[:, 0].copy() if self.n_words == 1 else words
+
+
+def min_window_count(min_support: float, total: int) -> int:
+    """
+    Plus petit nombre de fenêtres c ≥ 1 tel que c / total >= min_support
+    
+    Même comparaison flottante que les autres moteurs (support >= min_support),
+    sans dépendre de l'arrondi de min_support × total.
+    """
+    count = max(1, int(min_support * total))
+    while count > 1 and (count - 1) / total >= min_support:
+        count -= 1
+    while count / total < min_support:
+        count += 1
+    return count
+
+
+def pattern_record(itemsets: List[List], count: int, total: int) -> Dict[str, Any]:
+    """
+    Pattern au format des bridges, avec ses itemsets
+    
+    Args:
+        itemsets: Itemsets du motif, dans l'ordre des commits
+        count: Nombre de fenêtres contenant le motif
+        total: Nombre de fenêtres comptées
+    
+    Returns:
+        Pattern (`sequence` : un élément par itemset, labels joints par ITEMSET_SEPARATOR)
+    """
+    support = count / total
+    
+    return {
+        "sequence": [ITEMSET_SEPARATOR.join(str(label) for label in itemset) for itemset in itemsets],
+        "itemsets": [list(itemset) for itemset in itemsets],
+        "support": round(support, 3),
+        "confidence": round(min(1.0, support * 1.5), 3),
+        "frequency": count
+    }
+
+
+def mine_sequential_patterns(
+    event_patterns: List[List],
+    bounds: List[Tuple[int, int]],
+    min_support: float,
+    min_confidence: float,
+    max_length: int = DEFAULT_MAX_LENGTH,
+    checkpoint: Optional[Callable[..., bool]] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Miner les motifs séquentiels d'itemsets fréquents (2..max_length labels)
+    
+    Args:
+        event_patterns: Patterns de chaque event
+        bounds: Bornes (start, end) des fenêtres
+        min_support: Support minimum (fraction des fenêtres comptées)
+        min_confidence: Confidence minimum (confidence = min(1, 1.5 × support))
+        max_length: Nombre maximal de labels d'un motif
+        checkpoint: Appelé après chaque label racine avec les compteurs ; s'il
+            renvoie True (deadline), le parcours s'arrête
+    
+    Returns:
+        (patterns triés par support décroissant, statistiques du mining)
+    """
+    if not isinstance(max_length, int) or max_length < 2:
+        raise ValueError(f"max_length must be an integer >= 2, got {max_length!r}")
+    
+    index = VerticalBitmaps(event_patterns, bounds)
+    total = index.windows
+    stats = {
+        "engine": "spam",
+        "windows": total,
+        "labels": len(index.positions),
+        "frequent_labels": 0,
+        "words_per_window": index.n_words,
+        "word_bits": index.bits,
+        "candidates": 0,
+        "roots_done": 0,
+        "roots": 0
+    }
+    
+    if total == 0:
+        return [], stats
+    
+    min_count = min_window_count(min_support, total)
+    labels = sorted(
+        (label for label in index.positions if index.label_windows(label) >= min_count),
+        key=str
+    )
+    bitmaps = {label: index.bitmap(label) for label in labels}
+    stats["frequent_labels"] = len(labels)
+    stats["roots"] = len(labels)
+    stats["bitmap_bytes"] = sum(bitmap.nbytes for bitmap in bitmaps.values())
+    
+    patterns = []
+    
+    def expand(itemsets: List[List], bitmap: np.ndarray, length: int, s_labels: List, i_labels: List):
+        transformed = after_first(bitmap)
+        
+        # S-step : nouvel itemset dans un commit ultérieur
+        s_frequent = []
+        for label in s_labels:
+            candidate = transformed & bitmaps[label]
+            count = count_windows(candidate)
+            if count >= min_count:
+                s_frequent.append((label, candidate, count))
+        
+        # I-step : label ajouté au dernier itemset (ordre des labels, pas de doublon)
+        i_frequent = []
+        for label in i_labels:
+            candidate = bitmap & bitmaps[label]
+            count = count_windows(candidate)
+            if count >= min_count:
+                i_frequent.append((label, candidate, count))
+        
+        stats["candidates"] += len(s_labels) + len(i_labels)
+        
+        s_next = [label for label, _, _ in s_frequent]
+        children = [
+            (itemsets + [[label]], candidate, count, s_next[position + 1:])
+            for position, (label, candidate, count) in enumerate(s_frequent)
+        ]
+        children += [
+            (itemsets[:-1] + [itemsets[-1] + [label]], candidate, count,
+             [other for other, _, _ in i_frequent[position + 1:]])
+            for position, (label, candidate, count) in enumerate(i_frequent)
+        ]
+        
+        for child, candidate, count, child_i_labels in children:
+            pattern = pattern_record(child, count, total)
+            if pattern["confidence"] >= min_confidence:
+                patterns.append(pattern)
+            
+            if length + 1 < max_length:
+                expand(child, candidate, length + 1, s_next, child_i_labels)
+    
+    for position, label in enumerate(labels):
+        expand([[label]], bitmaps[label], 1, labels, labels[position + 1:])
+        stats["roots_done"] = position + 1
+        
+        if checkpoint is not None and checkpoint(
+            stage='spam', roots_done=position + 1, roots=len(labels), patterns=len(patterns)
+        ):
+            break
+    
+    logger.debug(
+        f"SPAM: {len(patterns)} patterns from {len(labels)} frequent labels "
+        f"over {total} windows ({stats['candidates']} candidates)"
+    )
+    
+    patterns.sort(key=lambda x: x['support'], reverse=True)
+    return patterns, stats
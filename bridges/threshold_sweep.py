@@ -0,0 +1,150 @@
+"""
+Threshold Sweep - Plusieurs seuils de support / confidence en un seul comptage
+
+Régler `min_support` / `min_confidence` demandait un appel du bridge par
+valeur, chacun recomptant la même timeline. Avec `config.sweep`, PAMI et
+FP-Growth comptent une seule fois au seuil le plus bas, puis chaque couple de
+seuils est un filtre sur la table triée des patterns obtenus.
+
+Le résultat de chaque seuil est identique à celui d'un appel séparé : les
+comptes ne dépendent pas du seuil (Apriori n'élague que des n-grams dont un
+sous-n-gram est rare, donc rare aussi au seuil plus haut), et le filtre
+recalcule le support exact (fréquence / séquences comptées) plutôt que le
+support arrondi du pattern.
+
+Config:
+{
+  "sweep": {
+    "min_support": [0.05, 0.1, 0.2, 0.3],   # défaut : config.min_support
+    "min_confidence": [0.5]                  # défaut : config.min_confidence
+  },
+  "sweep_output": "patterns",   # patterns (défaut) | histogram
+  "histogram_bins": 20
+}
+"""
+
+import logging
+from itertools import product
+from typing import List, Dict, Any, Tuple
+
+from sequence_miners import condense_patterns
+
+logger = logging.getLogger(__name__)
+
+SWEEP_OUTPUTS = ('patterns', 'histogram')
+DEFAULT_HISTOGRAM_BINS = 20
+
+
+def sweep_thresholds(
+    sweep: Dict[str, Any],
+    min_support: float,
+    min_confidence: float
+) -> List[Tuple[float, float]]:
+    """
+    Couples (min_support, min_confidence) à évaluer
+    
+    Args:
+        sweep: config.sweep (listes ou valeurs seules)
+        min_support: Valeur par défaut si sweep.min_support est absent
+        min_confidence: Valeur par défaut si sweep.min_confidence est absent
+    
+    Returns:
+        Produit cartésien des seuils, supports décroissants
+    """
+    supports = sweep.get('min_support', min_support)
+    confidences = sweep.get('min_confidence', min_confidence)
+    
+    if not isinstance(supports, list):
+        supports = [supports]
+    if not isinstance(confidences, list):
+        confidences = [confidences]
+    
+    if not supports or not confidences:
+        raise ValueError("sweep needs at least one min_support and one min_confidence")
+    
+    return list(product(
+        sorted(set(supports), reverse=True),
+        sorted(set(confidences), reverse=True)
+    ))
+
+
+def exact_support(pattern: Dict[str, Any], denominators: Dict[int, int]) -> float:
+    """Support non arrondi, calculé comme par le miner (fréquence / séquences comptées)"""
+    return pattern['frequency'] / denominators[len(pattern['sequence'])]
+
+
+def support_histogram(supports: List[float], bins: int = DEFAULT_HISTOGRAM_BINS) -> List[Dict[str, Any]]:
+    """
+    Histogramme des supports (tranches de largeur 1 / bins sur [0, 1])
+    
+    Args:
+        supports: Supports des patterns comptés
+        bins: Nombre de tranches
+    
+    Returns:
+        Tranches non vides avec leur nombre de patterns
+    """
+    counts = [0] * bins
+    for support in supports:
+        counts[min(int(support * bins), bins - 1)] += 1
+    
+    return [
+        {"bin": [round(i / bins, 3), round((i + 1) / bins, 3)], "patterns": count}
+        for i, count in enumerate(counts)
+        if count
+    ]
+
+
+def sweep_patterns(
+    patterns: List[Dict[str, Any]],
+    denominators: Dict[int, int],
+    thresholds: List[Tuple[float, float]],
+    output: str = 'patterns',
+    pattern_mode: str = 'all',
+    bins: int = DEFAULT_HISTOGRAM_BINS
+) -> Dict[str, Any]:
+    """
+    Patterns de chaque couple de seuils à partir d'un seul comptage
+    
+    Args:
+        patterns: Patterns minés au seuil le plus bas (triés par support)
+        denominators: Longueur → séquences comptées (dénominateur du support)
+        thresholds: Couples (min_support, min_confidence)
+        output: `patterns` (listes par seuil) ou `histogram` (nombres seulement)
+        pattern_mode: all / closed / maximal, appliqué à chaque seuil
+        bins: Nombre de tranches de l'histogramme
+    
+    Returns:
+        thresholds (par couple) et support_histogram
+    """
+    if output not in SWEEP_OUTPUTS:
+        raise ValueError(f"Unknown sweep output {output!r}, expected one of {SWEEP_OUTPUTS}")
+    
+    supports = [exact_support(pattern, denominators) for pattern in patterns]
+    
+    results = []
+    for min_support, min_confidence in thresholds:
+        # Même critère que les miners : support, puis confidence = min(1, 1.5 × support)
+        selected = [
+            pattern for pattern, support in zip(patterns, supports)
+            if support >= min_support and min(1.0, support * 1.5) >= min_confidence
+        ]
+        selected, compression = condense_patterns(selected, pattern_mode)
+        
+        entry = {
+            "min_support": min_support,
+            "min_confidence": min_confidence,
+            "patterns_found": len(selected)
+        }
+        if pattern_mode != 'all':
+            entry["compression"] = compression
+        if output == 'patterns':
+            entry["patterns"] = selected
+        results.append(entry)
+    
+    logger.info(f"Threshold sweep: {len(thresholds)} thresholds over {len(patterns)} counted patterns")
+    
+    return {
+        "thresholds": results,
+        "support_histogram": support_histogram(supports, bins)
+    }
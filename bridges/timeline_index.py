@@ -0,0 +1,108 @@
+"""
+Timeline Index - Index partagés d'une timeline encodée
+
+Parse et encode une timeline une seule fois pour que plusieurs étapes
+d'analyse (mining, causalité, forecasting) lisent les mêmes tables au lieu
+de reconstruire chacune leurs propres comptages.
+
+Index construits en une passe :
+- `labels` / `codes` : vocabulaire des patterns ↔ identifiants entiers
+- `event_codes` : codes des patterns de chaque event (ordre préservé)
+- `counts` : nombre d'occurrences de chaque pattern
+- `positions` : indices triés des events contenant chaque pattern
+
+Pas de table de transitions (pattern → pattern suivant) : aucune étape ne lit
+de comptage de transitions agrégé. La causalité cherche, pour chaque occurrence
+de la cause, l'effet suivant à distance variable (`next_occurrence` sur
+`positions`), ce qu'une table de transitions entre events consécutifs ne donne
+pas ; la construire coûterait |patterns(i)| × |patterns(i+1)| par event pour rien.
+"""
+
+import logging
+from bisect import bisect_right
+from typing import List, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TimelineIndex:
+    """Timeline encodée avec comptages et positions par pattern"""
+    
+    def __init__(self, events: List[Dict]):
+        self.events = events
+        self.labels: List[str] = []
+        self.codes: Dict[str, int] = {}
+        self.event_codes: List[List[int]] = []
+        self.counts: Dict[str, int] = {}
+        self.positions: Dict[str, List[int]] = {}
+        self.total_patterns = 0
+        
+        for i, event in enumerate(events):
+            encoded = []
+            
+            for pattern in event.get('patterns', []):
+                code = self.codes.get(pattern)
+                if code is None:
+                    code = len(self.labels)
+                    self.codes[pattern] = code
+                    self.labels.append(pattern)
+                    self.positions[pattern] = []
+                
+                encoded.append(code)
+                self.counts[pattern] = self.counts.get(pattern, 0) + 1
+                
+                occurrences = self.positions[pattern]
+                if not occurrences or occurrences[-1] != i:
+                    occurrences.append(i)
+            
+            self.event_codes.append(encoded)
+            self.total_patterns += len(encoded)
+        
+        logger.debug(
+            f"Indexed {len(events)} events, {len(self.labels)} labels, "
+            f"{self.total_patterns} pattern occurrences"
+        )
+    
+    def __len__(self) -> int:
+        return len(self.events)
+    
+    def frequencies(self) -> Dict[str, float]:
+        """
+        Fréquences relatives des patterns (0-1)
+        
+        Returns:
+            Dict pattern → fréquence
+        """
+        if self.total_patterns == 0:
+            return {}
+        
+        return {
+            pattern: count / self.total_patterns
+            for pattern, count in self.counts.items()
+        }
+    
+    def next_occurrence(self, pattern: str, after: int) -> Optional[int]:
+        """
+        Trouver le premier event strictement après `after` contenant pattern
+        
+        Args:
+            pattern: Pattern recherché
+            after: Indice d'event de départ (exclu)
+        
+        Returns:
+            Indice de l'event, ou None si absent
+        """
+        occurrences = self.positions.get(pattern)
+        if not occurrences:
+            return None
+        
+        k = bisect_right(occurrences, after)
+        return occurrences[k] if k < len(occurrences) else None
+    
+    def summary(self) -> Dict[str, int]:
+        """Résumé compact pour les métadonnées"""
+        return {
+            "events": len(self.events),
+            "labels": len(self.labels),
+            "pattern_occurrences": self.total_patterns
+        }
@@ -0,0 +1,425 @@
+"""
+Timeline Reader - Lecture des timelines brutes, compressées ou NDJSON
+
+Les timelines du corpus (`.reasoning_rl4/timeline_<repo>.json`) sont du JSON
+indenté très redondant (clés `astFeatures` / `patterns`, SHA de commits) :
+compressées, elles occupent une fraction de la place. Ce module lit :
+
+- JSON brut : une lecture bufferisée passée à json.loads (chemin le plus rapide)
+- gzip (`.gz`) et zstd (`.zst`, si le package `zstandard` est installé),
+  détectés par leurs octets magiques quel que soit le nom du fichier
+- NDJSON (`.ndjson` / `.jsonl`, compressé ou non) : un event par ligne, plus
+  une ligne d'en-tête optionnelle `{"type": "timeline", "repo": ...}`
+
+Les fichiers compressés sont décompressés en flux : le texte JSON n'est jamais
+entièrement en mémoire, les events sont décodés un par un au fil des blocs
+décompressés (`raw_decode` sur un buffer glissant). Seuls les events parsés
+sont conservés, avec des clés partagées. Un fichier compressé de moins de
+`STREAM_THRESHOLD_BYTES` est décompressé d'un bloc (plus rapide, texte petit).
+"""
+
+import io
+import os
+import re
+import glob
+import json
+import gzip
+import logging
+from typing import Any, Callable, Dict, Iterator, List, BinaryIO
+
+try:
+    import zstandard
+except ImportError:  # optionnel : timelines .zst illisibles sans le package
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Taille du buffer de lecture des timelines (une seule lecture système par Mo)
+READ_BUFFER_BYTES = 1024 * 1024
+
+# Caractères décompressés lus par bloc par le parser en flux
+STREAM_CHUNK_CHARS = 64 * 1024
+
+# En dessous (taille compressée), le fichier est décompressé d'un bloc : plus
+# rapide, et le texte décompressé reste petit (~8× la taille compressée)
+STREAM_THRESHOLD_BYTES = 1024 * 1024
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+COMPRESSION_SUFFIXES = ('.gz', '.zst')
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+TIMELINE_SUFFIXES = tuple(
+    base + compression
+    for base in ('.json',) + NDJSON_SUFFIXES
+    for compression in ('',) + COMPRESSION_SUFFIXES
+)
+
+_WHITESPACE = ' \t\n\r'
+_SIGNIFICANT = re.compile(r'[^ \t\n\r]')
+# Séparateur entre deux éléments, blancs autour compris (chemin rapide)
+_SEPARATOR = re.compile(r'[ \t\n\r]*([,\]}])[ \t\n\r]*')
+# Caractères qui peuvent prolonger un nombre (fraction, exposant, chiffres)
+_NUMBER_CHARS = frozenset('.eE+-0123456789')
+
+
+def interning_decoder() -> json.JSONDecoder:
+    """
+    Décodeur qui partage les chaînes de clés entre les appels
+    
+    json.loads mémorise les clés sur tout un document, mais chaque appel à
+    raw_decode repart d'un mémo vide : sans partage, chaque event porterait
+    ses propres copies de `patterns`, `astFeatures`... (~1.7× la mémoire).
+    """
+    keys: Dict[str, str] = {}
+    return json.JSONDecoder(
+        object_pairs_hook=lambda pairs: {keys.setdefault(key, key): value for key, value in pairs}
+    )
+
+
+def read_json_file(path: str) -> Any:
+    """
+    Lire un fichier JSON en une lecture bufferisée
+    
+    Les octets sont passés tels quels à json.loads (pas de décodage texte
+    intermédiaire ni de copie via stdin).
+    """
+    with open(path, 'rb', buffering=READ_BUFFER_BYTES) as f:
+        return json.loads(f.read())
+
+
+def detect_compression(path: str) -> str:
+    """Compression d'un fichier d'après ses octets magiques : gzip, zstd ou none"""
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+    
+    if magic.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if magic.startswith(ZSTD_MAGIC):
+        return 'zstd'
+    return 'none'
+
+
+def is_ndjson(path: str) -> bool:
+    """Fichier NDJSON d'après son extension (hors suffixe de compression)"""
+    name = path.lower()
+    for suffix in COMPRESSION_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name.endswith(NDJSON_SUFFIXES)
+
+
+def open_decompressed(path: str, compression: str) -> BinaryIO:
+    """
+    Ouvrir un fichier en flux binaire décompressé
+    
+    Args:
+        path: Chemin du fichier
+        compression: gzip, zstd ou none (voir detect_compression)
+    
+    Returns:
+        Flux binaire (à fermer par l'appelant)
+    """
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ValueError(f"Cannot read {path}: zstd timelines need the 'zstandard' package")
+        raw = open(path, 'rb')
+        return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+    
+    return open(path, 'rb', buffering=READ_BUFFER_BYTES)
+
+
+class JSONStreamParser:
+    """Décodage incrémental d'un document JSON lu par blocs (buffer glissant)"""
+    
+    def __init__(self, stream: io.TextIOBase, chunk_chars: int = STREAM_CHUNK_CHARS):
+        self.stream = stream
+        self.chunk_chars = chunk_chars
+        self.decoder = interning_decoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+    
+    def _fill(self) -> bool:
+        """Ajouter un bloc au buffer (la partie déjà consommée est jetée)"""
+        if self.eof:
+            return False
+        
+        chunk = self.stream.read(self.chunk_chars)
+        if not chunk:
+            self.eof = True
+            return False
+        
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+    
+    def peek(self) -> str:
+        """Prochain caractère significatif ('' en fin de flux)"""
+        while True:
+            match = _SIGNIFICANT.search(self.buffer, self.pos)
+            if match is not None:
+                self.pos = match.start()
+                return self.buffer[self.pos]
+            
+            self.pos = len(self.buffer)
+            if not self._fill():
+                return ''
+    
+    def expect(self, char: str):
+        """Consommer un caractère de structure attendu"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Invalid JSON stream: expected {char!r}, found {found!r}")
+        self.pos += 1
+    
+    def _maybe_truncated(self, value: Any, end: int) -> bool:
+        """
+        Valeur décodée peut-être coupée par la fin du bloc lu
+        
+        raw_decode accepte le préfixe entier de `3.5e10` coupé après `3` ou
+        `3.5e` : un nombre n'est complet que si un délimiteur le suit.
+        """
+        if end >= len(self.buffer):
+            return True
+        
+        is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+        return is_number and self.buffer[end] in _NUMBER_CHARS
+    
+    def value(self) -> Any:
+        """Décoder la valeur suivante, en lisant des blocs tant qu'elle est incomplète"""
+        if self.pos >= len(self.buffer) or self.buffer[self.pos] in _WHITESPACE:
+            self.peek()
+        
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                if self.eof or not self._maybe_truncated(value, end):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            
+            self._fill()
+    
+    def separator(self) -> str:
+        """Consommer le séparateur suivant (`,`, `]` ou `}`) et les blancs qui l'entourent"""
+        match = _SEPARATOR.match(self.buffer, self.pos)
+        if match is not None:
+            self.pos = match.end()
+            return match.group(1)
+        
+        # Blancs jusqu'à la fin du buffer : lecture du bloc suivant
+        found = self.peek()
+        self.pos += 1
+        return found
+    
+    def array_items(self) -> Iterator[Any]:
+        """Itérer sur les éléments du tableau JSON suivant"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        
+        raw_decode = self.decoder.raw_decode
+        match_separator = _SEPARATOR.match
+        
+        while True:
+            # Chemin rapide : élément et séparateur entiers dans le buffer (un
+            # séparateur juste après un nombre prouve qu'il n'est pas tronqué)
+            try:
+                item, end = raw_decode(self.buffer, self.pos)
+                match = match_separator(self.buffer, end)
+            except json.JSONDecodeError:
+                match = None
+            
+            if match is not None:
+                self.pos = match.end()
+                separator = match.group(1)
+                yield item
+            else:
+                yield self.value()
+                separator = self.separator()
+            
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Invalid JSON stream: expected ',' or ']', found {separator!r}")
+
+
+def parse_timeline_stream(stream: io.TextIOBase, chunk_chars: int = STREAM_CHUNK_CHARS) -> Any:
+    """
+    Parser une timeline JSON en flux
+    
+    Les events (`events` d'un objet, ou tableau racine) sont décodés un par un ;
+    les autres champs racine (repo, totalCommits...) sont décodés entiers.
+    
+    Args:
+        stream: Flux texte du document
+        chunk_chars: Taille des blocs lus (petite valeur : tests des coupures)
+    
+    Returns:
+        Même valeur que json.load sur le document
+    """
+    parser = JSONStreamParser(stream, chunk_chars)
+    
+    if parser.peek() == '[':
+        return list(parser.array_items())
+    
+    parser.expect('{')
+    document: Dict[str, Any] = {}
+    
+    if parser.peek() == '}':
+        return document
+    
+    while True:
+        key = parser.value()
+        parser.expect(':')
+        
+        if key == 'events' and parser.peek() == '[':
+            document[key] = list(parser.array_items())
+        else:
+            document[key] = parser.value()
+        
+        separator = parser.separator()
+        if separator == '}':
+            return document
+        if separator != ',':
+            raise ValueError(f"Invalid JSON stream: expected ',' or '}}', found {separator!r}")
+
+
+def parse_ndjson_timeline(stream: io.TextIOBase) -> Dict[str, Any]:
+    """
+    Parser une timeline NDJSON (un event par ligne)
+    
+    Une ligne `{"type": "timeline", ...}` porte les champs racine (repo...).
+    
+    Returns:
+        Timeline `{..., "events": [...]}`
+    """
+    document: Dict[str, Any] = {}
+    events: List[Dict] = []
+    decoder = interning_decoder()
+    
+    for line in stream:
+        if not line.strip():
+            continue
+        
+        record = decoder.decode(line)
+        if isinstance(record, dict) and record.get('type') == 'timeline':
+            document.update((key, value) for key, value in record.items() if key != 'type')
+        else:
+            events.append(record)
+    
+    document['events'] = events
+    return document
+
+
+def read_timeline_file(path: str) -> Any:
+    """
+    Lire une timeline brute, compressée (gzip / zstd) ou NDJSON
+    
+    Args:
+        path: Chemin du fichier
+    
+    Returns:
+        Document de la timeline (objet `{repo, events, ...}` ou liste d'events)
+    """
+    compression = detect_compression(path)
+    ndjson = is_ndjson(path)
+    
+    if compression == 'none' and not ndjson:
+        return read_json_file(path)
+    
+    if not ndjson and os.path.getsize(path) < STREAM_THRESHOLD_BYTES:
+        with open_decompressed(path, compression) as raw:
+            return json.loads(raw.read())
+    
+    with open_decompressed(path, compression) as raw:
+        with io.TextIOWrapper(raw, encoding='utf-8') as text:
+            if ndjson:
+                return parse_ndjson_timeline(text)
+            return parse_timeline_stream(text)
+
+
+def timeline_paths(corpus_dir: str) -> List[str]:
+    """Timelines `timeline_*` d'un dossier (toutes extensions lisibles), triées"""
+    return sorted(
+        path for path in glob.glob(os.path.join(corpus_dir, 'timeline_*'))
+        if path.lower().endswith(TIMELINE_SUFFIXES)
+    )
+
+
+def timeline_repo_name(path: str) -> str:
+    """Nom du repo d'après le nom de fichier `timeline_<repo>.<extensions>`"""
+    name = os.path.basename(path)
+    for suffix in sorted(TIMELINE_SUFFIXES, key=len, reverse=True):
+        if name.lower().endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    return name[len('timeline_'):] if name.startswith('timeline_') else name
+
+
+def sync_timeline_sources(
+    corpus_dir: str,
+    sources: Dict[str, List[int]],
+    source_repos: Dict[str, str],
+    add_repo: Callable[[str, List[Dict]], Any],
+    remove_repo: Callable[[str], Any]
+) -> Dict[str, int]:
+    """
+    Synchroniser un index incrémental avec les timelines d'un corpus
+    
+    Seuls les fichiers nouveaux ou modifiés (empreinte mtime + taille) sont
+    relus ; les repos des fichiers disparus sont retirés de l'index.
+    
+    Args:
+        corpus_dir: Dossier contenant les `timeline_*` (brutes, compressées ou NDJSON)
+        sources: Chemin → empreinte `[mtime_ns, taille]` (mis à jour en place)
+        source_repos: Chemin → repo indexé (mis à jour en place)
+        add_repo: Indexer (ou réindexer) un repo, appelé avec (repo, events)
+        remove_repo: Retirer un repo de l'index
+    
+    Returns:
+        Nombre de repos ajoutés, réindexés, retirés et inchangés
+    """
+    stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+    paths = timeline_paths(corpus_dir)
+    seen = set(paths)
+    
+    for path in list(sources):
+        if path not in seen:
+            repo = source_repos.pop(path)
+            del sources[path]
+            remove_repo(repo)
+            stats["removed"] += 1
+    
+    for path in paths:
+        st = os.stat(path)
+        fingerprint = [st.st_mtime_ns, st.st_size]
+        
+        if sources.get(path) == fingerprint:
+            stats["unchanged"] += 1
+            continue
+        
+        try:
+            timeline = read_timeline_file(path)
+        except (OSError, ValueError, EOFError) as e:
+            logger.warning(f"Skipping unreadable timeline {path}: {e}")
+            continue
+        
+        stats["updated" if path in sources else "added"] += 1
+        
+        if isinstance(timeline, list):
+            timeline = {"events": timeline}
+        
+        repo = timeline.get('repo') or timeline_repo_name(path)
+        add_repo(repo, timeline.get('events', []))
+        sources[path] = fingerprint
+        source_repos[path] = repo
+    
+    return stats
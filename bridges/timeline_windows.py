@@ -0,0 +1,240 @@
+"""
+Timeline Windows - Fenêtrage des timelines pour les bridges de mining
+
+Module partagé par `pami_bridge.py` et `fpgrowth_bridge.py` pour découper
+une timeline en fenêtres glissantes avant le comptage des patterns.
+
+Deux modes de fenêtrage :
+- **count** (défaut) : N events consécutifs (`window_size`, 5 par défaut)
+- **time** : tous les commits dans une fenêtre de N heures (`window_hours`)
+
+Les timestamps sont parsés une seule fois en tableau int64 (epoch secondes),
+puis les bornes des fenêtres sont calculées en une passe à deux pointeurs.
+Un `stride` > 1 ne démarre une fenêtre que tous les `stride` events : le travail
+est divisé d'autant, au prix d'une couverture partielle des séquences.
+
+Les fenêtres identiques (runs `other>other>other`...) sont dédupliquées : chaque
+séquence distincte n'est gardée qu'une fois avec sa multiplicité, et le mining
+pondère ses comptes par cette multiplicité (résultats identiques).
+
+Config (clé `config` de l'input JSON):
+{
+  "window_size": 5,      # Mode count : nombre d'events par fenêtre
+  "window_hours": 24,    # Mode time : durée de la fenêtre (prioritaire)
+  "stride": 1,           # Pas entre deux débuts de fenêtre
+  "dedup_windows": true  # Dédupliquer les fenêtres identiques
+}
+"""
+
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Tuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_SIZE = 5
+DEFAULT_STRIDE = 1
+
+
+def parse_timestamps(events: List[Dict]) -> np.ndarray:
+    """
+    Parser les timestamps des events en epoch secondes (int64)
+    
+    Les timestamps absents ou invalides reprennent la valeur précédente, et
+    l'horloge est rendue monotone (max cumulé) pour que la passe à deux
+    pointeurs reste valide malgré les rebases / commits réordonnés.
+    
+    Args:
+        events: Events de la timeline (champ `timestamp` ISO 8601 ou epoch)
+    
+    Returns:
+        Tableau int64 des epochs, de même longueur que events
+    """
+    epochs = np.zeros(len(events), dtype=np.int64)
+    previous = 0
+    
+    for i, event in enumerate(events):
+        raw = event.get('timestamp') if isinstance(event, dict) else None
+        value = previous
+        
+        if isinstance(raw, (int, float)) and not isinstance(raw, bool):
+            value = int(raw)
+        elif isinstance(raw, str) and raw:
+            try:
+                value = int(datetime.fromisoformat(raw.replace('Z', '+00:00')).timestamp())
+            except ValueError:
+                logger.debug(f"Unparseable timestamp at index {i}: {raw}")
+        
+        epochs[i] = value
+        previous = value
+    
+    if len(epochs) > 0:
+        np.maximum.accumulate(epochs, out=epochs)
+    
+    return epochs
+
+
+def window_bounds(
+    n_events: int,
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    stride: int = DEFAULT_STRIDE,
+    epochs: Optional[np.ndarray] = None,
+    window_seconds: Optional[int] = None
+) -> List[Tuple[int, int]]:
+    """
+    Calculer les bornes [start, end) des fenêtres glissantes
+    
+    Args:
+        n_events: Nombre d'events de la timeline
+        window_size: Taille de fenêtre en events (mode count)
+        stride: Pas entre deux débuts de fenêtre
+        epochs: Timestamps int64 (mode time uniquement)
+        window_seconds: Durée de fenêtre en secondes (active le mode time)
+    
+    Returns:
+        Liste de bornes (start, end), end exclusif
+    """
+    if window_seconds is None:
+        return [(i, i + window_size) for i in range(0, n_events - window_size + 1, stride)]
+    
+    # Passe à deux pointeurs : `end` ne recule jamais car l'horloge est monotone
+    clock = epochs.tolist()
+    bounds = []
+    end = 0
+    
+    for start in range(0, n_events, stride):
+        limit = clock[start] + window_seconds
+        if end < start:
+            end = start
+        while end < n_events and clock[end] <= limit:
+            end += 1
+        bounds.append((start, end))
+    
+    return bounds
+
+
+def resolve_window_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Valider et normaliser les paramètres de fenêtrage du config
+    
+    Args:
+        config: Config brute de l'input JSON
+    
+    Returns:
+        Paramètres normalisés (mode, window_size, window_hours, stride, dedup_windows)
+    """
+    window_size = config.get('window_size', DEFAULT_WINDOW_SIZE)
+    window_hours = config.get('window_hours')
+    stride = config.get('stride', DEFAULT_STRIDE)
+    
+    if not isinstance(window_size, int) or isinstance(window_size, bool) or window_size < 1:
+        raise ValueError(f"window_size must be a positive integer, got {window_size!r}")
+    if not isinstance(stride, int) or isinstance(stride, bool) or stride < 1:
+        raise ValueError(f"stride must be a positive integer, got {stride!r}")
+    if window_hours is not None and (
+        not isinstance(window_hours, (int, float)) or isinstance(window_hours, bool) or window_hours <= 0
+    ):
+        raise ValueError(f"window_hours must be a positive number, got {window_hours!r}")
+    
+    return {
+        "mode": "time" if window_hours is not None else "count",
+        "window_size": window_size,
+        "window_hours": window_hours,
+        "stride": stride,
+        "dedup_windows": bool(config.get('dedup_windows', True))
+    }
+
+
+def timeline_bounds(timeline: List[Dict], params: Dict[str, Any]) -> List[Tuple[int, int]]:
+    """
+    Bornes des fenêtres d'une timeline selon les paramètres de fenêtrage
+    
+    Args:
+        timeline: Events de la timeline
+        params: Paramètres normalisés (voir resolve_window_config)
+    
+    Returns:
+        Liste de bornes (start, end), end exclusif
+    """
+    if params['mode'] == 'time':
+        return window_bounds(
+            len(timeline),
+            stride=params['stride'],
+            epochs=parse_timestamps(timeline),
+            window_seconds=int(params['window_hours'] * 3600)
+        )
+    
+    return window_bounds(len(timeline), params['window_size'], params['stride'])
+
+
+def dedup_sequences(sequences: List[List]) -> Tuple[List[List], List[int]]:
+    """
+    Dédupliquer les séquences identiques (hash-consing sur le tuple canonique)
+    
+    L'ordre de première apparition est conservé, ce qui préserve l'ordre
+    d'insertion des comptes de patterns lors du mining pondéré.
+    
+    Args:
+        sequences: Séquences de patterns
+    
+    Returns:
+        (séquences distinctes, multiplicité de chacune)
+    """
+    multiplicities: Dict[Tuple, int] = {}
+    
+    for sequence in sequences:
+        key = tuple(sequence)
+        multiplicities[key] = multiplicities.get(key, 0) + 1
+    
+    return [list(key) for key in multiplicities], list(multiplicities.values())
+
+
+def extract_sequences(
+    timeline: List[Dict],
+    config: Optional[Dict[str, Any]] = None,
+    event_patterns: Optional[List[List]] = None
+) -> Tuple[List[List[str]], Optional[List[int]], Dict[str, Any]]:
+    """
+    Extraire des séquences de patterns depuis la timeline par fenêtre glissante
+    
+    Args:
+        timeline: Timeline avec events et patterns
+        config: Config de l'input JSON (window_size, window_hours, stride, dedup_windows)
+        event_patterns: Patterns pré-encodés par event (TimelineIndex.event_codes),
+            utilisés à la place de `event['patterns']`
+    
+    Returns:
+        (séquences, multiplicités ou None si pas de déduplication, métadonnées de fenêtrage)
+    """
+    params = resolve_window_config(config or {})
+    bounds = timeline_bounds(timeline, params)
+    
+    if event_patterns is None:
+        event_patterns = [event.get('patterns', []) for event in timeline]
+    
+    sequences = []
+    for start, end in bounds:
+        sequence = []
+        
+        for patterns in event_patterns[start:end]:
+            sequence.extend(patterns)
+        
+        if len(sequence) >= 2:  # Au moins 2 patterns
+            sequences.append(sequence)
+    
+    metadata = {**params, "windows": len(bounds), "sequences": len(sequences)}
+    weights = None
+    
+    if params['dedup_windows']:
+        sequences, weights = dedup_sequences(sequences)
+        metadata['unique_sequences'] = len(sequences)
+        metadata['dedup_ratio'] = round(metadata['sequences'] / len(sequences), 2) if sequences else 1.0
+    
+    logger.debug(
+        f"Extracted {metadata['sequences']} sequences "
+        f"({len(sequences)} unique) from {len(bounds)} windows"
+    )
+    
+    return sequences, weights, metadata
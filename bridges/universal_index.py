@@ -0,0 +1,273 @@
+"""
+Universal Index - Index inter-repos des n-grams de patterns
+
+Répond à « dans combien des 500 repos cette séquence apparaît-elle ? » sans
+relire le corpus : chaque n-gram (longueur 2..max_length) porte un bitset
+des repos qui le contiennent, stocké dans un entier Python (bit i = repo i).
+
+- support inter-repos : popcount du bitset
+- patterns communs à un groupe de repos : `bitset & masque == masque`
+- repos contenant plusieurs patterns : AND des bitsets
+
+Le corpus (`.reasoning_rl4/timeline_*.json`) est scanné une fois ; ensuite
+`update()` ne relit que les timelines nouvelles ou modifiées (mtime / taille)
+et retire les repos dont la timeline a disparu. Les identifiants de repo sont
+stables (append-only) pour que les bitsets restent valides.
+
+Format persistant (JSON) : bitsets en hexadécimal, clés `a>b>c`.
+"""
+
+import os
+import json
+import fnmatch
+import logging
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Set
+
+from timeline_windows import extract_sequences
+from timeline_reader import sync_timeline_sources
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+DEFAULT_MAX_LENGTH = 4
+PATTERN_SEPARATOR = '>'
+
+
+def popcount(bits: int) -> int:
+    """
+    Nombre de repos d'un bitset (bits à 1)
+    
+    `int.bit_count()` n'existe qu'à partir de Python 3.10 ; les bridges
+    supportent Python 3.9.
+    
+    Args:
+        bits: Bitset de repos
+    
+    Returns:
+        Nombre de bits à 1
+    """
+    return bin(bits).count('1')
+
+
+def repo_ngrams(
+    events: List[Dict],
+    max_length: int = DEFAULT_MAX_LENGTH,
+    config: Optional[Dict[str, Any]] = None
+) -> Set[Tuple[str, ...]]:
+    """
+    N-grams contigus (2..max_length) présents dans les fenêtres d'une timeline
+    
+    Args:
+        events: Events de la timeline du repo
+        max_length: Longueur maximale des n-grams
+        config: Config de fenêtrage (window_size, window_hours, stride)
+    
+    Returns:
+        Ensemble des n-grams présents au moins une fois
+    """
+    sequences, _, _ = extract_sequences(events, config or {})
+    ngrams = set()
+    
+    for seq in sequences:
+        for length in range(2, max_length + 1):
+            for i in range(len(seq) - length + 1):
+                ngrams.add(tuple(seq[i:i + length]))
+    
+    return ngrams
+
+
+class UniversalPatternIndex:
+    """Bitsets de repos par n-gram, mis à jour incrémentalement"""
+    
+    def __init__(self, max_length: int = DEFAULT_MAX_LENGTH, window_config: Optional[Dict[str, Any]] = None):
+        if max_length < 2:
+            raise ValueError(f"max_length must be >= 2, got {max_length!r}")
+        
+        self.max_length = max_length
+        self.window_config = window_config or {}
+        
+        # Slot i → nom du repo (None si retiré : l'identifiant n'est pas réutilisé)
+        self.repos: List[Optional[str]] = []
+        self.repo_ids: Dict[str, int] = {}
+        self.bitsets: Dict[Tuple[str, ...], int] = {}
+        
+        # Empreinte des fichiers indexés : chemin → [mtime_ns, taille]
+        self.sources: Dict[str, List[int]] = {}
+        self.source_repos: Dict[str, str] = {}
+    
+    def add_repo(self, repo: str, events: List[Dict]):
+        """Indexer (ou réindexer) la timeline d'un repo"""
+        if repo in self.repo_ids:
+            self.remove_repo(repo)
+        
+        repo_id = len(self.repos)
+        self.repos.append(repo)
+        self.repo_ids[repo] = repo_id
+        bit = 1 << repo_id
+        
+        for ngram in repo_ngrams(events, self.max_length, self.window_config):
+            self.bitsets[ngram] = self.bitsets.get(ngram, 0) | bit
+    
+    def remove_repo(self, repo: str):
+        """Retirer un repo de tous les bitsets (sans effet s'il n'est pas indexé)"""
+        repo_id = self.repo_ids.pop(repo, None)
+        if repo_id is None:
+            return
+        
+        self.repos[repo_id] = None
+        mask = ~(1 << repo_id)
+        
+        for ngram in list(self.bitsets):
+            bits = self.bitsets[ngram] & mask
+            if bits:
+                self.bitsets[ngram] = bits
+            else:
+                del self.bitsets[ngram]
+    
+    def update(self, corpus_dir: str) -> Dict[str, int]:
+        """
+        Synchroniser l'index avec les timelines du corpus
+        
+        Seuls les fichiers nouveaux ou modifiés sont relus.
+        
+        Args:
+            corpus_dir: Dossier contenant les `timeline_*` (brutes, compressées ou NDJSON)
+        
+        Returns:
+            Nombre de repos ajoutés, réindexés, retirés et inchangés
+        """
+        stats = sync_timeline_sources(
+            corpus_dir, self.sources, self.source_repos, self.add_repo, self.remove_repo
+        )
+        
+        logger.info(
+            f"Index update: {stats['added']} added, {stats['updated']} updated, "
+            f"{stats['removed']} removed, {stats['unchanged']} unchanged"
+        )
+        return stats
+    
+    @property
+    def repo_count(self) -> int:
+        """Nombre de repos indexés"""
+        return len(self.repo_ids)
+    
+    def repo_mask(self, repos: Iterable[str]) -> int:
+        """Bitset d'une liste de repos (noms exacts ou motifs fnmatch, insensible à la casse)"""
+        mask = 0
+        
+        for selector in repos:
+            selector = selector.lower()
+            for name, repo_id in self.repo_ids.items():
+                if fnmatch.fnmatchcase(name.lower(), selector):
+                    mask |= 1 << repo_id
+        
+        return mask
+    
+    def repos_of(self, bits: int) -> List[str]:
+        """Noms des repos d'un bitset"""
+        names = []
+        
+        while bits:
+            low = bits & -bits
+            names.append(self.repos[low.bit_length() - 1])
+            bits ^= low
+        
+        return names
+    
+    def repo_support(self, sequence: Iterable[str]) -> int:
+        """Nombre de repos contenant la séquence"""
+        return popcount(self.bitsets.get(tuple(sequence), 0))
+    
+    def repos_with_all(self, sequences: Iterable[Iterable[str]]) -> int:
+        """Bitset des repos contenant toutes les séquences"""
+        bits = -1
+        
+        for sequence in sequences:
+            bits &= self.bitsets.get(tuple(sequence), 0)
+        
+        return bits if bits != -1 else 0
+    
+    def universals(self, min_repos: int = 1, within: Optional[int] = None) -> List[Tuple[Tuple[str, ...], int]]:
+        """
+        N-grams présents dans au moins min_repos repos
+        
+        Args:
+            min_repos: Nombre minimal de repos
+            within: Masque de repos ; si fourni, seuls les n-grams présents dans
+                tous les repos du masque sont gardés (support compté dans le masque)
+        
+        Returns:
+            (n-gram, nombre de repos) par support décroissant
+        """
+        results = []
+        
+        for ngram, bits in self.bitsets.items():
+            if within is not None:
+                if bits & within != within:
+                    continue
+                bits &= within
+            
+            support = popcount(bits)
+            if support >= min_repos:
+                results.append((ngram, support))
+        
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Forme sérialisable (bitsets en hexadécimal)"""
+        return {
+            "version": INDEX_VERSION,
+            "max_length": self.max_length,
+            "window_config": self.window_config,
+            "repos": self.repos,
+            "sources": {
+                path: {"fingerprint": fingerprint, "repo": self.source_repos[path]}
+                for path, fingerprint in self.sources.items()
+            },
+            "bitsets": {
+                PATTERN_SEPARATOR.join(ngram): format(bits, 'x')
+                for ngram, bits in self.bitsets.items()
+            }
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'UniversalPatternIndex':
+        """Reconstruire un index depuis to_dict()"""
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version: {data.get('version')!r}")
+        
+        index = cls(data['max_length'], data.get('window_config'))
+        index.repos = data['repos']
+        index.repo_ids = {name: i for i, name in enumerate(index.repos) if name is not None}
+        
+        for path, source in data['sources'].items():
+            index.sources[path] = source['fingerprint']
+            index.source_repos[path] = source['repo']
+        
+        index.bitsets = {
+            tuple(key.split(PATTERN_SEPARATOR)): int(bits, 16)
+            for key, bits in data['bitsets'].items()
+        }
+        return index
+    
+    def save(self, path: str):
+        """Écrire l'index sur disque (JSON, fichier temporaire renommé)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'UniversalPatternIndex':
+        """Charger un index écrit par save()"""
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+    
+    def summary(self) -> Dict[str, int]:
+        """Résumé compact pour les métadonnées"""
+        return {
+            "repos": self.repo_count,
+            "ngrams": len(self.bitsets),
+            "max_length": self.max_length
+        }
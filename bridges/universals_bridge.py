@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Universals Bridge - Structural Layer
+
+Bridge Python qui répond aux requêtes inter-repos de la couche structurelle :
+« dans combien des repos du corpus cette séquence apparaît-elle ? »,
+« quels patterns sont communs à tous les repos FastAPI ? ».
+
+Le corpus `.reasoning_rl4/timeline_*.json` est indexé une fois dans un
+`UniversalPatternIndex` persistant (bitset de repos par n-gram, voir
+universal_index.py). Chaque appel ne relit que les timelines nouvelles ou
+modifiées, puis répond à la requête sur les bitsets (quelques microsecondes).
+
+Input (stdin JSON):
+{
+  "corpus_dir": ".reasoning_rl4",
+  "index_path": ".reasoning_rl4/meta/universal_index.json",
+  "query": {
+    "min_repos": 100,                    # universals : n-grams présents dans ≥ N repos
+    "repos": ["*fastapi*"],              # optionnel : patterns communs à tous ces repos
+    "sequences": [["feature", "test"]]   # optionnel : support de séquences précises
+  },
+  "config": {
+    "max_length": 4,       # longueur maximale des n-grams indexés
+    "window_size": 5,      # fenêtrage (voir timeline_windows.py)
+    "update": true         # synchroniser l'index avec le corpus avant la requête
+  }
+}
+
+Output (stdout JSON):
+{
+  "success": true,
+  "data": {
+    "universals": [
+      {"sequence": ["feature", "test"], "repo_support": 312, "repo_ratio": 0.624, "type": "universal"}
+    ],
+    "sequences": [
+      {"sequence": ["feature", "test"], "repo_support": 312, "repos": [...]}
+    ],
+    "repos": ["0xTheProDev-fastapi-clean-example", ...]
+  },
+  "metadata": {
+    "duration_ms": 1234,
+    "query_us": 85,
+    "update": {"added": 0, "updated": 1, "removed": 0, "unchanged": 499},
+    "index": {"repos": 500, "ngrams": 4680, "max_length": 4}
+  }
+}
+
+Mode similar (`"mode": "similar"`) : repos au comportement le plus proche d'un
+repo du corpus (`query.repo`) ou d'une timeline (`timeline` / `timeline_path`),
+par similarité de Jaccard estimée entre ensembles de n-grams. Signatures
+MinHash et buckets LSH persistés dans `similarity_index_path`
+(`.reasoning_rl4/meta/repo_similarity.json`, voir repo_similarity.py), mis à
+jour comme l'index universel. Query : `repo`, `top_k` (10), `min_similarity`.
+Config : `num_perm` (128), `bands` (32), `max_length`, fenêtrage, `update`.
+Output `data` : `{"repo": ..., "similar": [{"repo", "similarity", "bands_matched"}]}`,
+`metadata.candidates` = repos comparés (les autres n'ont partagé aucun bucket).
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+from typing import Dict, Any, Optional
+
+from universal_index import UniversalPatternIndex, DEFAULT_MAX_LENGTH, repo_ngrams, popcount
+from repo_similarity import RepoSimilarityIndex, DEFAULT_NUM_PERM, DEFAULT_BANDS, DEFAULT_TOP_K
+from bridge_io import resolve_timeline_input, update_bridge_versions
+from result_diff import result_fingerprint, diff_response
+
+# Configuration du logger
+logging.basicConfig(
+    level=logging.INFO,
+    format='[%(asctime)s] [%(levelname)s] [UNIVERSALS] %(message)s',
+    handlers=[
+        logging.FileHandler('.reasoning_rl4/logs/bridges/universals.log'),
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS_DIR = '.reasoning_rl4'
+DEFAULT_INDEX_PATH = '.reasoning_rl4/meta/universal_index.json'
+DEFAULT_SIMILARITY_INDEX_PATH = '.reasoning_rl4/meta/repo_similarity.json'
+
+# Clés de config qui changent le contenu de l'index (changement → reconstruction)
+WINDOW_KEYS = ('window_size', 'window_hours', 'stride')
+
+
+class UniversalsBridge:
+    """Bridge pour les universals inter-repos (index de bitsets)"""
+    
+    VERSION = "1.0.0"
+    
+    def __init__(self):
+        self.start_time = None
+        self.index: Optional[UniversalPatternIndex] = None
+        self.similarity_index: Optional[RepoSimilarityIndex] = None
+        self.fingerprint = None
+    
+    def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Synchroniser l'index avec le corpus puis répondre à la requête
+        
+        Args:
+            input_data: Données d'entrée (corpus_dir, index_path, query, config)
+        
+        Returns:
+            Universals, support des séquences demandées et repos du groupe
+        """
+        self.start_time = time.time()
+        
+        if input_data.get('mode') == 'similar':
+            return self.similar(input_data)
+        
+        corpus_dir = input_data.get('corpus_dir', DEFAULT_CORPUS_DIR)
+        index_path = input_data.get('index_path', DEFAULT_INDEX_PATH)
+        query = input_data.get('query', {})
+        config = input_data.get('config', {})
+        
+        logger.info(f"Processing corpus: {corpus_dir}, index: {index_path}")
+        
+        try:
+            self.index = self._load_index(index_path, config)
+            
+            update_stats = None
+            if config.get('update', True):
+                update_stats = self.index.update(corpus_dir)
+                if any(update_stats[key] for key in ('added', 'updated', 'removed')):
+                    self.index.save(index_path)
+            
+            query_start = time.perf_counter()
+            data = self._query(query)
+            query_us = int((time.perf_counter() - query_start) * 1_000_000)
+            universals_found = len(data['universals'])
+            
+            # Résultats conservés par corpus (le « repo » du diff est le dossier du corpus)
+            self.fingerprint = result_fingerprint(data)
+            corpus_name = os.path.basename(os.path.normpath(corpus_dir))
+            data, diff = diff_response(data, self.fingerprint, 'universals', corpus_name, config)
+            
+            duration_ms = int((time.time() - self.start_time) * 1000)
+            
+            self._update_versions(duration_ms)
+            
+            logger.info(
+                f"Found {universals_found} universals over "
+                f"{self.index.repo_count} repos in {duration_ms}ms (query {query_us}us)"
+            )
+            
+            return {
+                "success": True,
+                "data": data,
+                "metadata": {
+                    "duration_ms": duration_ms,
+                    "query_us": query_us,
+                    "update": update_stats,
+                    "index": self.index.summary(),
+                    "universals_found": universals_found,
+                    "fingerprint": self.fingerprint,
+                    "diff": diff
+                }
+            }
+        
+        except Exception as e:
+            logger.error(f"Error processing corpus {corpus_dir}: {e}")
+            duration_ms = int((time.time() - self.start_time) * 1000)
+            
+            return {
+                "success": False,
+                "error": str(e),
+                "metadata": {
+                    "duration_ms": duration_ms
+                }
+            }
+    
+    def similar(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Repos les plus proches d'un repo ou d'une timeline (index MinHash / LSH)
+        
+        Args:
+            input_data: query (repo, top_k, min_similarity) ou timeline /
+                timeline_path, corpus_dir, similarity_index_path, config
+        
+        Returns:
+            Repos par similarité de Jaccard estimée décroissante
+        """
+        corpus_dir = input_data.get('corpus_dir', DEFAULT_CORPUS_DIR)
+        index_path = input_data.get('similarity_index_path', DEFAULT_SIMILARITY_INDEX_PATH)
+        query = input_data.get('query', {})
+        config = input_data.get('config', {})
+        # Avec timeline_path, le repo de la timeline est exclu des résultats
+        repo = query.get('repo', input_data.get('repo'))
+        
+        try:
+            self.similarity_index = index = self._load_similarity_index(index_path, config)
+            
+            update_stats = None
+            if config.get('update', True):
+                update_stats = index.update(corpus_dir)
+                if any(update_stats[key] for key in ('added', 'updated', 'removed')):
+                    index.save(index_path)
+            
+            query_start = time.perf_counter()
+            
+            if 'timeline' in input_data:
+                # Timeline hors corpus : signature calculée à la volée
+                timeline = input_data['timeline']
+                events = timeline.get('events', []) if isinstance(timeline, dict) else timeline
+                signature = index.signature(repo_ngrams(events, index.max_length, index.window_config))
+            elif repo is not None:
+                if repo not in index.ngram_counts:
+                    raise ValueError(f"Unknown repo {repo!r}: not in the similarity index")
+                signature = index.signatures.get(repo)
+            else:
+                raise ValueError("similar mode needs query.repo, timeline or timeline_path")
+            
+            similar, candidates = [], 0
+            if signature is not None:
+                similar, candidates = index.similar(
+                    signature,
+                    query.get('top_k', DEFAULT_TOP_K),
+                    query.get('min_similarity', 0.0),
+                    exclude=repo
+                )
+            query_us = int((time.perf_counter() - query_start) * 1_000_000)
+            
+            duration_ms = int((time.time() - self.start_time) * 1000)
+            
+            self._update_versions(duration_ms)
+            
+            logger.info(
+                f"Found {len(similar)} similar repos among {candidates} candidates "
+                f"in {duration_ms}ms (query {query_us}us)"
+            )
+            
+            return {
+                "success": True,
+                "data": {
+                    "repo": repo,
+                    "similar": similar
+                },
+                "metadata": {
+                    "duration_ms": duration_ms,
+                    "mode": "similar",
+                    "query_us": query_us,
+                    "candidates": candidates,
+                    "update": update_stats,
+                    "index": index.summary()
+                }
+            }
+        
+        except Exception as e:
+            logger.error(f"Error finding repos similar to {repo}: {e}")
+            duration_ms = int((time.time() - self.start_time) * 1000)
+            
+            return {
+                "success": False,
+                "error": str(e),
+                "metadata": {
+                    "duration_ms": duration_ms,
+                    "mode": "similar"
+                }
+            }
+    
+    def _load_similarity_index(self, index_path: str, config: Dict[str, Any]) -> RepoSimilarityIndex:
+        """
+        Charger l'index de similarité persistant, ou en créer un vide
+        
+        Un index construit avec d'autres paramètres MinHash / LSH, une autre
+        longueur max ou un autre fenêtrage est ignoré : il sera reconstruit.
+        """
+        num_perm = config.get('num_perm', DEFAULT_NUM_PERM)
+        bands = config.get('bands', DEFAULT_BANDS)
+        max_length = config.get('max_length', DEFAULT_MAX_LENGTH)
+        window_config = {key: config[key] for key in WINDOW_KEYS if key in config}
+        
+        if os.path.exists(index_path):
+            try:
+                index = RepoSimilarityIndex.load(index_path)
+                if (
+                    index.num_perm == num_perm and index.bands == bands
+                    and index.max_length == max_length and index.window_config == window_config
+                ):
+                    return index
+                logger.info("Similarity index built with another configuration, rebuilding")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Unreadable similarity index {index_path}, rebuilding: {e}")
+        
+        return RepoSimilarityIndex(num_perm, bands, max_length, window_config)
+    
+    def _load_index(self, index_path: str, config: Dict[str, Any]) -> UniversalPatternIndex:
+        """
+        Charger l'index persistant, ou en créer un vide
+        
+        Un index construit avec une autre longueur max ou un autre fenêtrage
+        est ignoré : il sera reconstruit par update().
+        """
+        max_length = config.get('max_length', DEFAULT_MAX_LENGTH)
+        window_config = {key: config[key] for key in WINDOW_KEYS if key in config}
+        
+        if os.path.exists(index_path):
+            try:
+                index = UniversalPatternIndex.load(index_path)
+                if index.max_length == max_length and index.window_config == window_config:
+                    return index
+                logger.info("Index built with another configuration, rebuilding")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Unreadable index {index_path}, rebuilding: {e}")
+        
+        return UniversalPatternIndex(max_length, window_config)
+    
+    def _query(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Répondre à une requête sur les bitsets
+        
+        Args:
+            query: min_repos, repos (groupe, motifs fnmatch), sequences
+        
+        Returns:
+            universals, support des séquences demandées, repos du groupe
+        """
+        index = self.index
+        min_repos = query.get('min_repos', 1)
+        
+        within = None
+        group = []
+        if query.get('repos'):
+            within = index.repo_mask(query['repos'])
+            group = index.repos_of(within)
+        
+        total = len(group) if within is not None else index.repo_count
+        
+        universals = []
+        # Groupe sans repo : aucun pattern ne lui est « commun »
+        if within != 0:
+            universals = [
+                {
+                    "sequence": list(ngram),
+                    "repo_support": support,
+                    "repo_ratio": round(support / total, 3),
+                    "type": "universal"
+                }
+                for ngram, support in index.universals(min_repos, within)
+            ]
+        
+        sequences = []
+        for sequence in query.get('sequences', []):
+            bits = index.bitsets.get(tuple(sequence), 0)
+            sequences.append({
+                "sequence": list(sequence),
+                "repo_support": popcount(bits),
+                "repos": index.repos_of(bits)
+            })
+        
+        return {
+            "universals": universals,
+            "sequences": sequences,
+            "repos": group
+        }
+    
+    def _update_versions(self, duration_ms: int):
+        """
+        Mettre à jour bridges_versions.json avec les métriques
+        
+        Args:
+            duration_ms: Durée d'exécution
+        """
+        update_bridge_versions('universals', duration_ms, self.fingerprint)
+
+
+def main():
+    """Point d'entrée principal"""
+    try:
+        # Lire input JSON depuis stdin
+        input_data = resolve_timeline_input(json.load(sys.stdin))
+        
+        bridge = UniversalsBridge()
+        result = bridge.process(input_data)
+        
+        print(json.dumps(result, indent=2))
+        
+        sys.exit(0 if result['success'] else 1)
+    
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid JSON input: {e}")
+        error_result = {
+            "success": False,
+            "error": f"Invalid JSON input: {e}",
+            "metadata": {}
+        }
+        print(json.dumps(error_result, indent=2))
+        sys.exit(1)
+    
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        error_result = {
+            "success": False,
+            "error": str(e),
+            "metadata": {}
+        }
+        print(json.dumps(error_result, indent=2))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -104,14 +104,16 @@ export class PatternLearningEngineV2 {
     // 4. Extraire séquences temporelles (méthode native)
     const nativeSequences = this.extractSequences(repoName, enrichedEvents);
 
-    // 5. Appeler ML Bridge (PAMI ou FP-Growth) pour enrichissement
-    const mlSequences = await this.callMLBridge(repoName, timeline, enrichedEvents.length);
+    // 5. Appeler ML Bridge (PAMI, moteur choisi par coût) pour enrichissement
+    //    La timeline est d'abord écrite sur disque : le bridge la lit via timeline_path
+    const timelinePath = await this.saveTimeline(repoName, timeline);
+    const mlSequences = await this.callMLBridge(repoName, timeline, enrichedEvents.length, timelinePath);
 
     // 6. Fusionner patterns natifs et ML
     const sequences = this.mergeSequences(nativeSequences, mlSequences);
 
     // 7. Sauvegarder
-    await this.saveResults(repoName, sequences, timeline);
+    await this.saveResults(repoName, sequences);
 
     logger.success(`[${repoName}] Analysis complete: ${sequences.length} sequences (${nativeSequences.length} native + ${mlSequences.length} ML), ${timeline.events.length} timeline events`);
 
@@ -199,29 +201,29 @@ export class PatternLearningEngineV2 {
   }
 
   /**
-   * Appeler PAMI ou FP-Growth bridge selon la taille
+   * Appeler le bridge PAMI (moteur de comptage choisi côté Python)
    */
   private async callMLBridge(
     repoName: string,
     timeline: CausalTimeline,
-    timelineCount: number
+    timelineCount: number,
+    timelinePath: string | null = null
   ): Promise<PatternSequence[]> {
-    // Switch automatique vers FP-Growth si >10k séquences
-    const useFPGrowth = timelineCount > 10000;
-    const bridgePath = useFPGrowth 
-      ? 'bridges/fpgrowth_bridge.py'
-      : 'bridges/pami_bridge.py';
+    // Le moteur de comptage est choisi côté Python (modèle de coût, engine: 'auto')
+    const bridgePath = 'bridges/pami_bridge.py';
     
-    logger.info(`Using ${useFPGrowth ? 'FP-Growth' : 'PAMI'} bridge for ${timelineCount} sequences`);
+    logger.info(`Using PAMI bridge (engine: auto) for ${timelineCount} sequences`);
     
     try {
-      // Préparer input JSON
+      // Préparer input JSON (référence de fichier plutôt que timeline inline si possible)
       const input = {
         repo: repoName,
-        timeline: timeline.events,
+        ...(timelinePath ? { timeline_path: timelinePath } : { timeline: timeline.events }),
         config: {
           min_support: 0.3,
-          min_confidence: 0.5
+          min_confidence: 0.5,
+          engine: 'auto',
+          deadline_ms: 270000 // Résultat partiel plutôt que timeout (300s)
         }
       };
       
@@ -261,7 +263,11 @@ export class PatternLearningEngineV2 {
         avgLag: 1.0
       }));
       
-      logger.success(`ML Bridge returned ${mlPatterns.length} patterns (${output.metadata.duration_ms}ms)`);
+      logger.success(`ML Bridge returned ${mlPatterns.length} patterns (${output.metadata.duration_ms}ms, engine: ${output.metadata.engine})`);
+      
+      if (output.metadata.partial) {
+        logger.warn(`ML Bridge hit its deadline: partial result (coverage ${output.metadata.coverage})`);
+      }
       
       return mlPatterns;
       
@@ -442,8 +448,7 @@ export class PatternLearningEngineV2 {
    */
   private async saveResults(
     repoName: string,
-    sequences: PatternSequence[],
-    timeline: CausalTimeline
+    sequences: PatternSequence[]
   ): Promise<void> {
     try {
       await fs.mkdir(this.outputDir, { recursive: true });
@@ -457,13 +462,28 @@ export class PatternLearningEngineV2 {
       await fs.appendFile(patternsPath, patternsContent, 'utf-8');
       logger.debug(`Patterns saved to ${patternsPath}`);
 
-      // Sauvegarder timeline
+    } catch (error) {
+      logger.error(`Failed to save results: ${error}`);
+    }
+  }
+
+  /**
+   * Sauvegarder la timeline dans .reasoning_rl4/timeline_<repo>.json
+   *
+   * @returns Chemin du fichier, ou null si l'écriture a échoué
+   */
+  private async saveTimeline(repoName: string, timeline: CausalTimeline): Promise<string | null> {
+    try {
+      await fs.mkdir(this.outputDir, { recursive: true });
+
       const timelinePath = path.join(this.outputDir, `timeline_${repoName}.json`);
       await fs.writeFile(timelinePath, JSON.stringify(timeline, null, 2), 'utf-8');
       logger.debug(`Timeline saved to ${timelinePath}`);
 
+      return timelinePath;
     } catch (error) {
-      logger.error(`Failed to save results: ${error}`);
+      logger.error(`Failed to save timeline: ${error}`);
+      return null;
     }
   }
 
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark de lecture des timelines : brut vs gzip / zstd / NDJSON
+
+Convertit les timelines dans chaque format (dossier temporaire), puis mesure
+pour chacun les octets lus sur disque, le temps de parse
+(`read_timeline_file`) et le pic mémoire Python sur la plus grosse timeline.
+La ligne `json.gz (décompression entière)` sert de référence : fichier
+décompressé en mémoire puis json.loads, ce que le parser en flux évite.
+
+Les timelines du corpus sont petites (décompressées d'un bloc, voir
+STREAM_THRESHOLD_BYTES) : `--synthetic-events N` mesure aussi une timeline de
+N events (events du corpus répétés) qui passe par le parser en flux. Les
+coupures de blocs (nombres, chaînes échappées) sont vérifiées à part sur des
+blocs de quelques caractères : scripts/check-timeline-stream.py.
+
+Usage:
+    python3 scripts/bench-timeline-input.py [corpus_dir] [--repeat 3] [--synthetic-events 200000]
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bridges'))
+
+from timeline_reader import read_timeline_file, timeline_paths, zstandard  # noqa: E402
+
+
+def write_ndjson(document, out):
+    """Timeline → NDJSON (en-tête `type: timeline` puis un event par ligne)"""
+    header = {key: value for key, value in document.items() if key != 'events'}
+    out.write(json.dumps({"type": "timeline", **header}) + '\n')
+    for event in document.get('events', []):
+        out.write(json.dumps(event) + '\n')
+
+
+def convert(paths, target_dir):
+    """Écrire les timelines dans chaque format, retourne format → chemins"""
+    formats = {name: [] for name in ('json', 'json.gz', 'ndjson.gz')}
+    if zstandard is not None:
+        formats['json.zst'] = []
+
+    os.makedirs(target_dir)
+
+    for path in paths:
+        base = os.path.join(target_dir, os.path.basename(path)[:-len('.json')])
+        with open(path, 'rb') as f:
+            raw = f.read()
+
+        shutil.copyfile(path, f"{base}.json")
+        formats['json'].append(f"{base}.json")
+
+        with gzip.open(f"{base}.json.gz", 'wb') as f:
+            f.write(raw)
+        formats['json.gz'].append(f"{base}.json.gz")
+
+        with gzip.open(f"{base}.ndjson.gz", 'wt', encoding='utf-8') as f:
+            write_ndjson(json.loads(raw), f)
+        formats['ndjson.gz'].append(f"{base}.ndjson.gz")
+
+        if zstandard is not None:
+            with open(f"{base}.json.zst", 'wb') as f:
+                f.write(zstandard.ZstdCompressor(level=3).compress(raw))
+            formats['json.zst'].append(f"{base}.json.zst")
+
+    return formats
+
+
+def write_synthetic(paths, events_count, target_dir):
+    """Grosse timeline : events du corpus répétés jusqu'à events_count"""
+    events = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            events.extend(json.loads(f.read()).get('events', []))
+
+    events = (events * (events_count // max(len(events), 1) + 1))[:events_count]
+
+    path = os.path.join(target_dir, 'timeline_synthetic.json')
+    with open(path, 'w') as f:
+        json.dump({"repo": "synthetic", "events": events}, f, indent=2)
+    return path
+
+
+def read_gzip_whole(path):
+    """Référence : décompression complète en mémoire puis json.loads"""
+    with open(path, 'rb') as f:
+        return json.loads(gzip.decompress(f.read()))
+
+
+def best_time(reader, paths, repeat):
+    """Meilleur temps (s) de lecture de tous les fichiers, et nombre d'events"""
+    best = None
+    events = 0
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        events = 0
+        for path in paths:
+            document = reader(path)
+            events += len(document if isinstance(document, list) else document.get('events', []))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, events
+
+
+def peak_memory(reader, path):
+    """Pic d'allocation Python (octets) pendant la lecture d'un fichier"""
+    tracemalloc.start()
+    reader(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def report(paths, target_dir, repeat):
+    """Convertir les timelines dans chaque format et imprimer les mesures"""
+    formats = convert(paths, target_dir)
+    largest = paths.index(max(paths, key=os.path.getsize))
+
+    runs = [(name, read_timeline_file, files) for name, files in formats.items()]
+    runs.insert(2, ('json.gz (décompression entière)', read_gzip_whole, formats['json.gz']))
+
+    raw_bytes = sum(os.path.getsize(path) for path in formats['json'])
+    print(f"{'format':<34}{'octets lus':>14}{'ratio':>8}{'parse (s)':>11}{'events/s':>12}{'pic mémoire':>14}")
+
+    for name, reader, files in runs:
+        size = sum(os.path.getsize(path) for path in files)
+        elapsed, events = best_time(reader, files, repeat)
+        peak = peak_memory(reader, files[largest])
+
+        print(
+            f"{name:<34}{size:>14,}{raw_bytes / size:>8.1f}{elapsed:>11.3f}"
+            f"{events / elapsed:>12,.0f}{peak / 1024:>12,.0f}Ko"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark timeline input formats")
+    parser.add_argument('corpus_dir', nargs='?', default='.reasoning_rl4')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--synthetic-events', type=int, default=0)
+    args = parser.parse_args()
+
+    paths = [path for path in timeline_paths(args.corpus_dir) if path.endswith('.json')]
+    if not paths:
+        sys.exit(f"No timeline_*.json in {args.corpus_dir}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Corpus : {len(paths)} timelines")
+        report(paths, os.path.join(tmp, 'corpus'), args.repeat)
+
+        if args.synthetic_events:
+            synthetic = write_synthetic(paths, args.synthetic_events, tmp)
+            print(f"\nTimeline synthétique : {args.synthetic_events:,} events")
+            report([synthetic], os.path.join(tmp, 'synthetic'), 1)
+
+    if zstandard is None:
+        print("(zstd non mesuré : package zstandard absent)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+Harness de correction différentielle des moteurs de mining
+
+Compare les moteurs optimisés des bridges aux implémentations de référence
+figées (`bridges/reference_engines.py`, code pur Python d'origine) sur des
+timelines aléatoires et des cas limites (timeline vide, events sans patterns,
+runs d'un seul label, vocabulaire énorme...), et chronomètre les deux côtés
+sur chaque entrée.
+
+Vérifications :
+- moteurs exacts (PAMI naive / apriori / budget mémoire, FP-Growth fused /
+  apriori) : mêmes patterns, supports, confidences et fréquences que la
+  référence (comparaison indépendante de l'ordre, voir result_diff.py), et
+  tri par support décroissant
+- mode approximé : sur-ensemble des patterns de la référence (si le sketch
+  le garantit, `metadata.sketch.guaranteed`), fréquence
+  exacte ≤ fréquence estimée ≤ fréquence exacte + error_bound
+- échantillonnage progressif : support exact dans `support_interval` ±
+  tolérance, patterns à plus de la tolérance du seuil tranchés comme la référence
+- moteur séquentiel (PAMI spam, bitmaps verticaux) : mêmes motifs
+  d'itemsets et mêmes nombres de fenêtres qu'une énumération naïve des
+  sous-séquences de chaque fenêtre
+- ruptures Merlion (`change_points.py`) : PELT atteint le coût optimal d'une
+  programmation dynamique O(n²) sans élagage, binseg ne fait pas mieux que cet
+  optimum ; aucune rupture sur timeline vide, events sans patterns ou
+  `min_segment` > n/2, segments contigus couvrant la timeline
+- Merlion `_calculate_regularity` avec index et HyperTS `index.frequencies()` :
+  mêmes valeurs que la référence (à 1e-12 près)
+
+Le code de sortie vaut 1 si un moteur s'écarte de la référence.
+
+Usage:
+    python3 scripts/check-engines.py [--events 3000] [--seed 0] [--repeat 3]
+        [--corpus .reasoning_rl4 --corpus-sample 5] [--json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+from itertools import combinations
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bridges'))
+
+import reference_engines  # noqa: E402
+from pami_bridge import PAMIBridge  # noqa: E402
+from fpgrowth_bridge import FPGrowthBridge  # noqa: E402
+from merlion_bridge import MerlionBridge  # noqa: E402
+from timeline_index import TimelineIndex  # noqa: E402
+from timeline_reader import read_timeline_file, timeline_paths, timeline_repo_name  # noqa: E402
+from result_diff import diff_results  # noqa: E402
+from change_points import (  # noqa: E402
+    change_point_params, change_point_penalty, count_matrix, segment_costs,
+    pelt, binary_segmentation, detect_change_points
+)
+
+# Moteurs exacts : (bridge, nom, config ajoutée)
+EXACT_ENGINES = [
+    (PAMIBridge, 'pami/naive', {"engine": "naive"}),
+    (PAMIBridge, 'pami/fused', {"engine": "fused"}),
+    (PAMIBridge, 'pami/apriori', {"engine": "apriori"}),
+    (PAMIBridge, 'pami/spill', {"engine": "naive", "memory_budget_mb": 0.05}),
+    (FPGrowthBridge, 'fpgrowth/naive', {"engine": "naive"}),
+    (FPGrowthBridge, 'fpgrowth/fused', {"engine": "fused"}),
+    (FPGrowthBridge, 'fpgrowth/apriori', {"engine": "apriori"}),
+]
+
+APPROXIMATE_ENGINES = [
+    (PAMIBridge, 'pami/approximate', {"engine": "approximate"}),
+    (FPGrowthBridge, 'fpgrowth/approximate', {"engine": "approximate"}),
+]
+
+SAMPLING_ENGINES = [
+    (PAMIBridge, 'pami/sampling', {"sampling": {"initial_windows": 200}}),
+    (FPGrowthBridge, 'fpgrowth/sampling', {"sampling": {"initial_windows": 200}}),
+]
+
+SEQUENTIAL_ENGINES = [
+    (PAMIBridge, 'pami/spam', {"engine": "spam"}),
+]
+
+# Ruptures Merlion : (nom, config.change_points) ; `min_segment > n/2` est ajouté par timeline
+CHANGE_POINT_CONFIGS = [
+    ('default', {}),
+    ('low_penalty', {"penalty": 2.0, "min_segment": 3}),
+]
+# Préfixe de timeline comparé à la programmation dynamique O(n²)
+CHANGE_POINT_MAX_EVENTS = 1500
+COST_TOLERANCE = 1e-6
+
+REGULARITY_LAGS = (0, 1, 2, 5)
+FLOAT_TOLERANCE = 1e-12
+
+
+# --- Timelines -----------------------------------------------------------------
+
+def make_events(labels_per_event):
+    """Events au format des timelines (t, commit, timestamp, patterns)"""
+    return [
+        {
+            "t": i,
+            "commit": f"{i:040x}",
+            "timestamp": "2024-01-01T00:00:00Z",
+            "patterns": labels
+        }
+        for i, labels in enumerate(labels_per_event)
+    ]
+
+
+def random_labels(rng, events, vocabulary, max_patterns, zipf=True):
+    """Labels tirés d'un vocabulaire (loi de Zipf par défaut), 0..max_patterns par event"""
+    names = [f"p{k}" for k in range(vocabulary)]
+    weights = [1 / (k + 1) for k in range(vocabulary)] if zipf else None
+    return [rng.choices(names, weights, k=rng.randint(0, max_patterns)) for _ in range(events)]
+
+
+def build_cases(rng, events):
+    """Timelines générées : cas limites puis timelines aléatoires"""
+    runs = []
+    while len(runs) < events:
+        runs.extend([[f"p{rng.randrange(4)}"]] * rng.randint(1, 50))
+
+    # Mix de patterns qui change de régime au premier tiers (ruptures Merlion)
+    regimes = random_labels(rng, events // 3, 4, 3) + [
+        [f"p{int(label[1:]) + 4}" for label in labels]
+        for labels in random_labels(rng, events - events // 3, 4, 3)
+    ]
+
+    return [
+        ("empty", []),
+        ("single_event", make_events([["a", "b", "c"]])),
+        ("below_window", make_events([["a", "b"]] * 4)),
+        ("no_patterns", make_events([[] for _ in range(200)])),
+        ("missing_patterns_key", [{"t": i, "commit": str(i)} for i in range(50)]),
+        ("single_label", make_events([["a"]] * events)),
+        ("single_label_runs", make_events(runs[:events])),
+        ("repeated_in_event", make_events([["a", "a", "b", "a"]] * 100)),
+        ("random_small_vocab", make_events(random_labels(rng, events, 8, 4))),
+        ("random_zipf", make_events(random_labels(rng, events, 40, 6))),
+        ("huge_vocabulary", make_events(random_labels(rng, events, 50000, 4))),
+        ("regime_shift", make_events(regimes)),
+    ]
+
+
+def corpus_cases(corpus_dir, sample, rng):
+    """Timelines réelles tirées du corpus"""
+    paths = timeline_paths(corpus_dir)
+    cases = []
+    for path in rng.sample(paths, min(sample, len(paths))):
+        timeline = read_timeline_file(path)
+        events = timeline if isinstance(timeline, list) else timeline.get('events', [])
+        cases.append((f"corpus:{timeline_repo_name(path)}", events))
+    return cases
+
+
+# --- Mesures -------------------------------------------------------------------
+
+def best_time(fn, repeat):
+    """Meilleur temps (ms) de fn() sur repeat exécutions, et son dernier résultat"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_bridge(bridge_class, events, config, bridge=None):
+    """Extraction des séquences + mining d'un bridge (sans bridges_versions.json)"""
+    bridge = bridge or bridge_class()
+    if config.get('engine') == 'spam':
+        return bridge._mine_patterns_spam(events, config['min_support'], config['min_confidence'], config)
+    sequences = bridge._extract_sequences(events, config)
+    patterns = bridge._run_miner(sequences, config['min_support'], config['min_confidence'], config)
+    return patterns
+
+
+def run_reference(events, min_support, min_confidence):
+    sequences = reference_engines.extract_sequences(events)
+    return reference_engines.mine_patterns(sequences, min_support, min_confidence)
+
+
+def exact_supports(events):
+    """Support exact (non arrondi) et fréquence de chaque n-gram, selon la référence"""
+    sequences = reference_engines.extract_sequences(events)
+    total = len(sequences)
+    return {
+        tuple(pattern['sequence']): (pattern['frequency'] / total, pattern['frequency'])
+        for pattern in reference_engines.mine_patterns(sequences, 0.0, 0.0)
+    }
+
+
+def optimal_partition_cost(cumulative, penalty, min_segment):
+    """Minimum de Σ coûts + pénalité × ruptures, programmation dynamique O(n²) sans élagage"""
+    n = cumulative.shape[0] - 1
+    if n < 2 * min_segment:
+        return float(segment_costs(cumulative[n] - cumulative[0]))
+
+    best = np.full(n + 1, np.inf)
+    best[0] = -penalty
+    for t in range(min_segment, n + 1):
+        starts = np.arange(0, t - min_segment + 1)
+        best[t] = np.min(best[starts] + segment_costs(cumulative[t] - cumulative[starts])) + penalty
+    return float(best[n])
+
+
+def partition_cost(cumulative, change_points, penalty):
+    """Σ coûts des segments + pénalité × ruptures d'une segmentation"""
+    boundaries = [0] + [index for index, _ in change_points] + [cumulative.shape[0] - 1]
+    costs = sum(
+        float(segment_costs(cumulative[end] - cumulative[start]))
+        for start, end in zip(boundaries[:-1], boundaries[1:])
+    )
+    return costs + penalty * len(change_points)
+
+
+def window_subsequences(window, max_length=3):
+    """Motifs d'itemsets (≤ max_length labels) contenus dans une fenêtre, par énumération"""
+    found = set()
+
+    def extend(prefix, start, length):
+        if length >= 2:
+            found.add(prefix)
+        for position in range(start, len(window)):
+            labels = sorted(set(window[position]), key=str)
+            for size in range(1, max_length - length + 1):
+                for itemset in combinations(labels, size):
+                    extend(prefix + (itemset,), position + 1, length + size)
+
+    extend((), 0, 0)
+    return found
+
+
+def run_sequential_reference(events, min_support, min_confidence, window_size=5):
+    """Motifs séquentiels par énumération naïve des fenêtres de la référence"""
+    windows = [
+        [event.get('patterns', []) for event in events[i:i + window_size]]
+        for i in range(len(events) - window_size + 1)
+    ]
+    windows = [window for window in windows if sum(len(labels) for labels in window) >= 2]
+
+    counts = {}
+    for window in windows:
+        for pattern in window_subsequences(window):
+            counts[pattern] = counts.get(pattern, 0) + 1
+
+    patterns = []
+    for itemsets, count in counts.items():
+        support = count / len(windows)
+        confidence = min(1.0, support * 1.5)
+        if support >= min_support and confidence >= min_confidence:
+            patterns.append({
+                "sequence": ['+'.join(itemset) for itemset in itemsets],
+                "itemsets": [list(itemset) for itemset in itemsets],
+                "support": round(support, 3),
+                "confidence": round(confidence, 3),
+                "frequency": count
+            })
+    return patterns
+
+
+def record(case, check, engine, problems, ref_ms, engine_ms, detail=''):
+    return {
+        "case": case,
+        "check": check,
+        "engine": engine,
+        "status": "ok" if not problems else "MISMATCH",
+        "ref_ms": round(ref_ms, 2),
+        "engine_ms": round(engine_ms, 2),
+        "speedup": round(ref_ms / engine_ms, 2) if engine_ms > 0 else None,
+        "detail": "; ".join(problems) if problems else detail
+    }
+
+
+# --- Vérifications -------------------------------------------------------------
+
+def check_exact(case, events, params, repeat):
+    ref_ms, reference = best_time(
+        lambda: run_reference(events, params['min_support'], params['min_confidence']), repeat
+    )
+    records = []
+
+    for bridge_class, name, extra in EXACT_ENGINES:
+        config = {**params, **extra}
+        engine_ms, patterns = best_time(lambda: run_bridge(bridge_class, events, config), repeat)
+
+        problems = []
+        _, totals = diff_results(reference, patterns)
+        if totals['added'] or totals['changed'] or totals['removed']:
+            problems.append(
+                f"{totals['added']} extra, {totals['changed']} different, {totals['removed']} missing"
+            )
+        supports = [pattern['support'] for pattern in patterns]
+        if supports != sorted(supports, reverse=True):
+            problems.append("not sorted by decreasing support")
+
+        records.append(record(case, 'exact', name, problems, ref_ms, engine_ms, f"{len(patterns)} patterns"))
+
+    return records
+
+
+def check_approximate(case, events, params, repeat, exact):
+    ref_ms, reference = best_time(
+        lambda: run_reference(events, params['min_support'], params['min_confidence']), repeat
+    )
+    records = []
+
+    for bridge_class, name, extra in APPROXIMATE_ENGINES:
+        config = {**params, **extra}
+        bridge = bridge_class()
+        engine_ms, patterns = best_time(lambda: run_bridge(bridge_class, events, config, bridge), repeat)
+        guaranteed = bridge.sketch is None or bridge.sketch['guaranteed']
+
+        problems = []
+        found = {tuple(pattern['sequence']) for pattern in patterns}
+        missing = sum(1 for pattern in reference if tuple(pattern['sequence']) not in found)
+        if missing and guaranteed:
+            problems.append(f"{missing} reference patterns missing (superset broken)")
+
+        out_of_bounds = 0
+        for pattern in patterns:
+            true_frequency = exact.get(tuple(pattern['sequence']), (0.0, 0))[1]
+            if not true_frequency <= pattern['frequency'] <= true_frequency + pattern['error_bound']:
+                out_of_bounds += 1
+        if out_of_bounds:
+            problems.append(f"{out_of_bounds} frequencies outside [exact, exact + error_bound]")
+
+        extra_patterns = len(found) - (len(reference) - missing)
+        records.append(record(
+            case, 'approximate', name, problems, ref_ms, engine_ms,
+            f"{len(patterns)} patterns ({extra_patterns} beyond reference"
+            f"{'' if guaranteed else f', {missing} missing, superset not guaranteed'})"
+        ))
+
+    return records
+
+
+def check_sampling(case, events, params, repeat, exact, tolerance):
+    ref_ms, reference = best_time(
+        lambda: run_reference(events, params['min_support'], params['min_confidence']), repeat
+    )
+    threshold = max(params['min_support'], params['min_confidence'] / 1.5)
+    records = []
+
+    for bridge_class, name, extra in SAMPLING_ENGINES:
+        config = {**params, **extra}
+        engine_ms, patterns = best_time(lambda: run_bridge(bridge_class, events, config), repeat)
+
+        problems = []
+        outside = 0
+        found = set()
+        for pattern in patterns:
+            key = tuple(pattern['sequence'])
+            found.add(key)
+            support = exact.get(key, (0.0, 0))[0]
+            low, high = pattern['support_interval']
+            if not low - tolerance <= support <= high + tolerance:
+                outside += 1
+            if support < threshold - tolerance:
+                problems.append(f"{list(key)} reported, exact support {support:.3f}")
+        if outside:
+            problems.append(f"{outside} exact supports outside support_interval ± {tolerance}")
+
+        missed = [
+            pattern['sequence'] for pattern in reference
+            if tuple(pattern['sequence']) not in found
+            and exact[tuple(pattern['sequence'])][0] >= threshold + tolerance
+        ]
+        if missed:
+            problems.append(f"{len(missed)} clearly frequent patterns missing")
+
+        records.append(record(
+            case, 'sampling', name, problems[:3], ref_ms, engine_ms,
+            f"{len(patterns)}/{len(reference)} patterns"
+        ))
+
+    return records
+
+
+def check_sequential(case, events, params, repeat):
+    ref_ms, reference = best_time(
+        lambda: run_sequential_reference(events, params['min_support'], params['min_confidence']), repeat
+    )
+    records = []
+
+    for bridge_class, name, extra in SEQUENTIAL_ENGINES:
+        config = {**params, **extra}
+        engine_ms, patterns = best_time(lambda: run_bridge(bridge_class, events, config), repeat)
+
+        problems = []
+        _, totals = diff_results(reference, patterns)
+        if totals['added'] or totals['changed'] or totals['removed']:
+            problems.append(
+                f"{totals['added']} extra, {totals['changed']} different, {totals['removed']} missing"
+            )
+
+        records.append(record(case, 'sequential', name, problems, ref_ms, engine_ms, f"{len(patterns)} patterns"))
+
+    return records
+
+
+def check_change_points(case, events, repeat):
+    """
+    Merlion : ruptures PELT vs programmation dynamique O(n²)
+
+    PELT doit atteindre le coût optimal ; binseg (heuristique) ne peut pas
+    faire mieux que l'optimum. Cas limites attendus : aucune rupture sans
+    patterns ou avec min_segment > n/2, segments contigus couvrant la timeline.
+    """
+    events = events[:CHANGE_POINT_MAX_EVENTS]
+    n = len(events)
+    cumulative, _ = count_matrix(events)
+    no_patterns = cumulative[-1].sum() == 0
+    records = []
+
+    configs = CHANGE_POINT_CONFIGS + [('min_segment>n/2', {"min_segment": n // 2 + 1})]
+    for name, raw in configs:
+        params = change_point_params(raw)
+        penalty = change_point_penalty(params, cumulative)
+        min_segment = params['min_segment']
+        tolerance = COST_TOLERANCE * max(1.0, abs(segment_costs(cumulative[-1])))
+
+        # Référence quadratique : un seul passage (plusieurs secondes sur les grosses timelines)
+        ref_ms, optimum = best_time(lambda: optimal_partition_cost(cumulative, penalty, min_segment), 1)
+
+        searches = [
+            ('merlion/pelt', lambda: pelt(cumulative, penalty, min_segment)),
+            ('merlion/binseg', lambda: binary_segmentation(cumulative, penalty, min_segment, max(n, 1))),
+        ]
+        for engine, search in searches:
+            engine_ms, found = best_time(search, repeat)
+            cost = partition_cost(cumulative, found, penalty)
+
+            problems = []
+            if engine == 'merlion/pelt' and abs(cost - optimum) > tolerance:
+                problems.append(f"cost {cost:.6f} != optimum {optimum:.6f}")
+            if cost < optimum - tolerance:
+                problems.append(f"cost {cost:.6f} below optimum {optimum:.6f}")
+            if (no_patterns or n < 2 * min_segment) and found:
+                problems.append(f"{len(found)} change points, expected none")
+
+            result = detect_change_points(events, {**params, "method": engine.split('/')[1]})
+            spans = [(segment['start'], segment['end']) for segment in result['segments']]
+            boundaries = [0] + [point['index'] for point in result['change_points']] + [n]
+            if n and spans != list(zip(boundaries[:-1], boundaries[1:])):
+                problems.append("segments do not tile the timeline between change points")
+            if not n and (spans or result['change_points']):
+                problems.append("empty timeline with segments or change points")
+
+            records.append(record(
+                case, 'change_points', engine, problems, ref_ms, engine_ms,
+                f"{name}: {len(found)} change points"
+            ))
+
+    return records
+
+
+def check_regularity(case, events, repeat):
+    """Merlion : régularité avec index (positions) vs scan de référence"""
+    counts = TimelineIndex(events).frequencies()
+    labels = sorted(counts, key=lambda label: -counts[label])[:5] + ['absent']
+    pairs = [(cause, effect, lag) for cause in labels for effect in labels for lag in REGULARITY_LAGS]
+
+    ref_ms, expected = best_time(
+        lambda: [reference_engines.calculate_regularity(c, e, events, lag) for c, e, lag in pairs], repeat
+    )
+
+    bridge = MerlionBridge()
+
+    def indexed():
+        index = TimelineIndex(events)
+        return [bridge._calculate_regularity(c, e, events, lag, index) for c, e, lag in pairs]
+
+    engine_ms, got = best_time(indexed, repeat)
+
+    problems = [
+        f"{pair}: {value} != {reference}"
+        for pair, value, reference in zip(pairs, got, expected)
+        if abs(value - reference) > FLOAT_TOLERANCE
+    ]
+    return [record(case, 'regularity', 'merlion/index', problems[:3], ref_ms, engine_ms, f"{len(pairs)} pairs")]
+
+
+def check_frequencies(case, events, repeat):
+    """HyperTS : fréquences de l'index partagé vs comptage de référence"""
+    ref_ms, expected = best_time(lambda: reference_engines.calculate_pattern_frequencies(events), repeat)
+    engine_ms, got = best_time(lambda: TimelineIndex(events).frequencies(), repeat)
+
+    problems = []
+    if set(got) != set(expected):
+        problems.append(f"labels differ ({len(got)} vs {len(expected)})")
+    else:
+        wrong = sum(1 for label in expected if abs(got[label] - expected[label]) > FLOAT_TOLERANCE)
+        if wrong:
+            problems.append(f"{wrong} frequencies differ")
+
+    return [record(case, 'frequencies', 'hyperts/index', problems, ref_ms, engine_ms, f"{len(expected)} labels")]
+
+
+def run_case(case, events, params, repeat, tolerance):
+    exact = exact_supports(events)
+    return (
+        check_exact(case, events, params, repeat)
+        + check_approximate(case, events, params, repeat, exact)
+        + check_sampling(case, events, params, repeat, exact, tolerance)
+        + check_sequential(case, events, params, repeat)
+        + check_change_points(case, events, repeat)
+        + check_regularity(case, events, repeat)
+        + check_frequencies(case, events, repeat)
+    )
+
+
+def print_table(records):
+    print(f"{'cas':<28}{'moteur':<24}{'statut':<10}{'réf (ms)':>10}{'moteur (ms)':>13}{'speedup':>9}  détail")
+    for entry in records:
+        speedup = f"×{entry['speedup']}" if entry['speedup'] is not None else '-'
+        print(
+            f"{entry['case'][:27]:<28}{entry['engine']:<24}{entry['status']:<10}"
+            f"{entry['ref_ms']:>10.2f}{entry['engine_ms']:>13.2f}{speedup:>9}  {entry['detail']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check optimized mining engines against the frozen reference")
+    parser.add_argument('--events', type=int, default=3000, help="events of the random timelines")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--min-support', type=float, default=0.05)
+    parser.add_argument('--min-confidence', type=float, default=0.0)
+    parser.add_argument('--tolerance', type=float, default=0.01, help="support tolerance of the sampling engines")
+    parser.add_argument('--corpus', help="also check timelines sampled from this corpus dir")
+    parser.add_argument('--corpus-sample', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help="print one JSON record per check")
+    args = parser.parse_args()
+
+    # Les bridges loggent en INFO sur stderr : seuls les warnings restent
+    logging.disable(logging.INFO)
+
+    rng = random.Random(args.seed)
+    cases = build_cases(rng, args.events)
+    if args.corpus:
+        cases += corpus_cases(args.corpus, args.corpus_sample, rng)
+
+    params = {"min_support": args.min_support, "min_confidence": args.min_confidence}
+
+    records = []
+    for case, events in cases:
+        records.extend(run_case(case, events, params, args.repeat, args.tolerance))
+
+    if args.json:
+        for entry in records:
+            print(json.dumps(entry))
+    else:
+        print_table(records)
+
+    mismatches = sum(1 for entry in records if entry['status'] != 'ok')
+    print(f"\n{len(records)} vérifications, {mismatches} écart(s)", file=sys.stderr)
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
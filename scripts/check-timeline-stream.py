@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Vérification du parser JSON en flux sur des blocs minuscules
+
+Relit des documents par blocs de 1 à quelques caractères (toutes les coupures
+possibles : nombres après `.` ou `e`, chaînes échappées, littéraux, blancs)
+avec `parse_timeline_stream` et `JSONStreamParser.array_items`, et compare au
+résultat de json.loads. Complète scripts/bench-timeline-input.py, qui ne lit
+que des blocs de STREAM_CHUNK_CHARS.
+
+Le code de sortie vaut 1 si une lecture diffère de json.loads.
+
+Usage:
+    python3 scripts/check-timeline-stream.py [--max-chunk 16]
+"""
+
+import io
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bridges'))
+
+from timeline_reader import JSONStreamParser, parse_timeline_stream  # noqa: E402
+
+DOCUMENTS = [
+    '[1,2,3.5e10,4]',
+    '[-0.25, 1E-3 ,7e+2,\n 100000000000000000000, 0]',
+    '[12345.678e-9]',
+    '{"repo": "a/b", "totalCommits": 12.5e1, "events": [1, 2.75, {"t": 3e2}], "n": -17}',
+    '{"events": [{"timestamp": "2024-01-01T00:00:00Z", "patterns": ["a\\\\u00e9\\"b", "c"]},'
+    ' true, false, null, "x", [], {}], "score": 0.5}',
+    '{"events": [], "ratio": 1.0e0}',
+    '[]',
+    '{}',
+]
+
+
+def read_document(text: str, chunk_chars: int):
+    """Document entier via parse_timeline_stream, blocs de chunk_chars caractères"""
+    return parse_timeline_stream(io.StringIO(text), chunk_chars)
+
+
+def read_items(text: str, chunk_chars: int):
+    """Éléments du tableau racine via array_items, blocs de chunk_chars caractères"""
+    parser = JSONStreamParser(io.StringIO(text), chunk_chars)
+    return list(parser.array_items())
+
+
+def check(max_chunk: int) -> int:
+    """Comparer chaque lecture à json.loads, retourne le nombre d'écarts"""
+    failures = 0
+
+    for text in DOCUMENTS:
+        expected = json.loads(text)
+        readers = [('parse_timeline_stream', read_document)]
+        if isinstance(expected, list):
+            readers.append(('array_items', read_items))
+
+        for chunk_chars in range(1, max_chunk + 1):
+            for name, reader in readers:
+                found = reader(text, chunk_chars)
+                if found != expected:
+                    failures += 1
+                    print(f"{name} chunk_chars={chunk_chars} {text!r}: {found!r} != {expected!r}")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the streaming JSON parser on tiny chunks")
+    parser.add_argument('--max-chunk', type=int, default=16)
+    args = parser.parse_args()
+
+    failures = check(args.max_chunk)
+    print(f"{len(DOCUMENTS)} documents, blocs de 1 à {args.max_chunk} caractères : {failures} écart(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
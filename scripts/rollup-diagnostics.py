@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Rollup des diagnostics d'entraînement et des logs bridges
+
+Met à jour le rollup (`bridges/diagnostics_rollup.py`) avec les données
+ajoutées depuis la passe précédente, l'écrit, puis imprime son résumé :
+débit par bucket de temps, percentiles des durées des bridges, taux de
+fallback, santé du trainer.
+
+Usage:
+    python3 scripts/rollup-diagnostics.py [root] [--rollup path] [--bucket-s 3600] [--rebuild]
+"""
+
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bridges'))
+
+from diagnostics_rollup import DiagnosticsRollup, DEFAULT_ROLLUP_PATH, DEFAULT_BUCKET_S  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental rollup of training diagnostics and bridge logs")
+    parser.add_argument('root', nargs='?', default='.reasoning_rl4')
+    parser.add_argument('--rollup', default=DEFAULT_ROLLUP_PATH)
+    parser.add_argument('--bucket-s', type=int, default=DEFAULT_BUCKET_S,
+                        help="time bucket width (new rollup only)")
+    parser.add_argument('--rebuild', action='store_true', help="ignore the existing rollup and reread everything")
+    args = parser.parse_args()
+
+    if os.path.exists(args.rollup) and not args.rebuild:
+        rollup = DiagnosticsRollup.load(args.rollup)
+    else:
+        rollup = DiagnosticsRollup(args.bucket_s)
+
+    stats = rollup.update(args.root)
+
+    directory = os.path.dirname(args.rollup)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    rollup.save(args.rollup)
+
+    print(json.dumps({"read": stats, **rollup.summary()}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Driver asyncio du corpus : tous les bridges sur toutes les timelines
+
+Remplace l'enchaînement shell → trainer TS → un bridge à la fois pour les runs
+sur tout le corpus. Chaque couple (timeline, bridge) est une tâche :
+
+- file de priorité : plus grosses timelines d'abord (taille du fichier), pour
+  qu'aucun gros repo ne démarre en fin de run et n'allonge la traîne
+- concurrence bornée : `--concurrency` workers, un process bridge chacun
+- timeout par tâche (`--timeout`, process tué) et `--retries` nouvelles
+  tentatives après un timeout ou un échec du process (sortie non JSON, code
+  de retour non nul) ; un `success: false` du bridge n'est pas retenté
+- backpressure : les résultats passent par une file bornée vers un unique
+  writer ; si l'écriture prend du retard, les workers attendent au lieu
+  d'accumuler les résultats en mémoire
+
+Sorties :
+- résultats consolidés (NDJSON) : une ligne par tâche `{repo, bridge, path,
+  success, attempts, latency_ms, result}`
+- rapport de débit (JSON) : repos/s, tâches/s, latence par repo (p50 / p95 /
+  max, du début de sa première tâche à la fin de la dernière), latence par
+  bridge, échecs, timeouts et retries
+
+Usage:
+    python3 scripts/run-corpus.py [corpus_dir] [--bridges pami,merlion,hyperts]
+        [--concurrency 8] [--timeout 300] [--retries 1] [--config configs.json]
+        [--output results.ndjson] [--report report.json]
+
+`--config` : fichier JSON bridge → config, fusionnée avec les défauts (mêmes
+valeurs que les engines TS).
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+
+BRIDGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bridges')
+sys.path.insert(0, BRIDGES_DIR)
+
+from timeline_reader import timeline_paths, timeline_repo_name  # noqa: E402
+
+BRIDGES = ('pami', 'fpgrowth', 'merlion', 'hyperts', 'pipeline')
+DEFAULT_BRIDGES = ('pami', 'fpgrowth', 'merlion', 'hyperts')
+
+# Configs par défaut, alignées sur les appels des engines TS
+DEFAULT_CONFIGS = {
+    "pami": {"min_support": 0.3, "min_confidence": 0.5, "engine": "auto"},
+    "fpgrowth": {"min_support": 0.3, "min_confidence": 0.5, "engine": "auto"},
+    "merlion": {"causal_threshold": 0.5, "anomaly_detection": True},
+    "hyperts": {"forecast_horizon": 5, "min_confidence": 0.4},
+    "pipeline": {}
+}
+
+# Bridges de mining : deadline sous le timeout (résultat partiel plutôt que tué)
+DEADLINE_BRIDGES = ('pami', 'fpgrowth')
+DEADLINE_RATIO = 0.9
+
+DEFAULT_OUTPUT = '.reasoning_rl4/meta/corpus_run/results.ndjson'
+DEFAULT_REPORT = '.reasoning_rl4/meta/corpus_run/report.json'
+
+# Résultats en attente d'écriture au-delà desquels les workers attendent
+DEFAULT_QUEUE_SIZE = 64
+
+RETRY_BACKOFF_S = 1.0
+STDERR_TAIL_CHARS = 500
+
+
+def percentile(values, q):
+    """Percentile par rang le plus proche (0 si aucune valeur)"""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def latency_summary(values):
+    return {
+        "p50_ms": round(percentile(values, 0.50), 1),
+        "p95_ms": round(percentile(values, 0.95), 1),
+        "max_ms": round(max(values), 1) if values else 0
+    }
+
+
+class CorpusDriver:
+    """Exécution bornée et priorisée des bridges sur un corpus de timelines"""
+
+    def __init__(
+        self,
+        bridges,
+        configs,
+        concurrency,
+        timeout_s,
+        retries,
+        queue_size=DEFAULT_QUEUE_SIZE
+    ):
+        self.bridges = bridges
+        self.configs = configs
+        self.concurrency = concurrency
+        self.timeout_s = timeout_s
+        self.retries = retries
+        self.queue_size = queue_size
+
+        # Suivi par repo : début de la première tâche, fin de la dernière
+        self.repo_started = {}
+        self.repo_finished = {}
+        self.repo_pending = {}
+        self.task_latencies = {bridge: [] for bridge in bridges}
+        self.failures = {bridge: 0 for bridge in bridges}
+        self.timeouts = 0
+        self.retried = 0
+        self.written = 0
+        self.writer_waits = 0
+
+    def bridge_input(self, bridge, repo, path):
+        config = dict(self.configs.get(bridge, {}))
+        if bridge in DEADLINE_BRIDGES:
+            config.setdefault('deadline_ms', int(self.timeout_s * 1000 * DEADLINE_RATIO))
+        return {"repo": repo, "timeline_path": path, "config": config}
+
+    async def run_bridge(self, bridge, payload):
+        """
+        Un appel de bridge (process python3, JSON sur stdin)
+
+        Returns:
+            (réponse du bridge, None) ou (None, erreur) ; timeout → asyncio.TimeoutError
+        """
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.join(BRIDGES_DIR, f"{bridge}_bridge.py"),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(payload), self.timeout_s)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+
+        try:
+            return json.loads(stdout), None
+        except ValueError:
+            tail = stderr.decode('utf-8', 'replace')[-STDERR_TAIL_CHARS:]
+            return None, f"exit code {process.returncode}, invalid JSON output: {tail}"
+
+    async def run_task(self, bridge, repo, path):
+        """Tâche (timeline, bridge) avec timeout et retries"""
+        payload = json.dumps(self.bridge_input(bridge, repo, path)).encode('utf-8')
+        error = None
+
+        for attempt in range(1, self.retries + 2):
+            if attempt > 1:
+                self.retried += 1
+                await asyncio.sleep(RETRY_BACKOFF_S * (attempt - 1))
+
+            try:
+                result, error = await self.run_bridge(bridge, payload)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                result, error = None, f"timeout after {self.timeout_s}s"
+            except OSError as e:
+                result, error = None, f"spawn error: {e}"
+
+            if result is not None:
+                return result, attempt, None
+
+        return None, self.retries + 1, error
+
+    async def worker(self, tasks, results):
+        while True:
+            _, _, repo, path, bridge = await tasks.get()
+            try:
+                start = time.perf_counter()
+                self.repo_started.setdefault(repo, start)
+
+                attempts = 0
+                try:
+                    result, attempts, error = await self.run_task(bridge, repo, path)
+                    success = result is not None and result.get('success', False)
+                except Exception as e:
+                    # Réponse non-objet, bug du driver... : la tâche échoue, le worker continue
+                    # (sinon tasks.join() attendrait indéfiniment les tâches restantes)
+                    result, error, success = None, f"driver error: {type(e).__name__}: {e}", False
+
+                end = time.perf_counter()
+                latency_ms = (end - start) * 1000
+                self.task_latencies[bridge].append(latency_ms)
+
+                if not success:
+                    self.failures[bridge] += 1
+
+                self.repo_pending[repo] -= 1
+                if self.repo_pending[repo] == 0:
+                    self.repo_finished[repo] = end
+
+                record = {
+                    "repo": repo,
+                    "bridge": bridge,
+                    "path": path,
+                    "success": success,
+                    "attempts": attempts,
+                    "latency_ms": round(latency_ms, 1),
+                    "result": result if result is not None else {"success": False, "error": error}
+                }
+
+                # File bornée : attendre le writer plutôt que d'accumuler
+                if results.full():
+                    self.writer_waits += 1
+                await results.put(record)
+            finally:
+                tasks.task_done()
+
+    async def writer(self, results, output):
+        """Unique writer des résultats consolidés (écriture hors de la boucle d'événements)"""
+        loop = asyncio.get_running_loop()
+        while True:
+            record = await results.get()
+            try:
+                line = json.dumps(record) + '\n'
+                await loop.run_in_executor(None, output.write, line)
+                self.written += 1
+            finally:
+                results.task_done()
+
+    async def run(self, timelines, output):
+        """
+        Exécuter tous les bridges sur toutes les timelines
+
+        Args:
+            timelines: Liste de (repo, chemin)
+            output: Fichier texte des résultats consolidés
+
+        Returns:
+            Durée totale (s)
+        """
+        tasks = asyncio.PriorityQueue()
+        results = asyncio.Queue(maxsize=self.queue_size)
+
+        order = 0
+        for repo, path in timelines:
+            size = os.path.getsize(path)
+            self.repo_pending[repo] = len(self.bridges)
+            for bridge in self.bridges:
+                # Plus gros fichier d'abord, puis ordre de découverte
+                tasks.put_nowait((-size, order, repo, path, bridge))
+                order += 1
+
+        start = time.perf_counter()
+        workers = [asyncio.create_task(self.worker(tasks, results)) for _ in range(self.concurrency)]
+        writer = asyncio.create_task(self.writer(results, output))
+
+        await tasks.join()
+        await results.join()
+
+        for task in workers + [writer]:
+            task.cancel()
+        await asyncio.gather(*workers, writer, return_exceptions=True)
+
+        return time.perf_counter() - start
+
+    def report(self, wall_s):
+        """Rapport de débit et de latence"""
+        repo_latencies = {
+            repo: (self.repo_finished[repo] - self.repo_started[repo]) * 1000
+            for repo in self.repo_finished
+        }
+        task_count = sum(len(latencies) for latencies in self.task_latencies.values())
+        failed = sum(self.failures.values())
+
+        return {
+            "bridges": list(self.bridges),
+            "concurrency": self.concurrency,
+            "timeout_s": self.timeout_s,
+            "repos": len(repo_latencies),
+            "tasks": task_count,
+            "succeeded": task_count - failed,
+            "failed": failed,
+            "timeouts": self.timeouts,
+            "retries": self.retried,
+            "writer_waits": self.writer_waits,
+            "wall_s": round(wall_s, 2),
+            "repos_per_s": round(len(repo_latencies) / wall_s, 2) if wall_s > 0 else None,
+            "tasks_per_s": round(task_count / wall_s, 2) if wall_s > 0 else None,
+            "repo_latency": latency_summary(list(repo_latencies.values())),
+            "bridge_latency": {
+                bridge: {
+                    "tasks": len(latencies),
+                    "failed": self.failures[bridge],
+                    **latency_summary(latencies)
+                }
+                for bridge, latencies in self.task_latencies.items()
+            },
+            "slowest_repos": [
+                {"repo": repo, "latency_ms": round(latency, 1)}
+                for repo, latency in sorted(repo_latencies.items(), key=lambda item: -item[1])[:5]
+            ]
+        }
+
+
+def load_configs(path):
+    """Configs par défaut, surchargées bridge par bridge par le fichier --config"""
+    configs = {bridge: dict(config) for bridge, config in DEFAULT_CONFIGS.items()}
+    if path:
+        with open(path, 'r') as f:
+            for bridge, config in json.load(f).items():
+                configs.setdefault(bridge, {}).update(config)
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Python bridges over the whole timeline corpus")
+    parser.add_argument('corpus_dir', nargs='?', default='.reasoning_rl4')
+    parser.add_argument('--bridges', default=','.join(DEFAULT_BRIDGES),
+                        help=f"comma-separated, among {', '.join(BRIDGES)}")
+    parser.add_argument('--concurrency', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--timeout', type=float, default=300.0, help="per-task timeout (s)")
+    parser.add_argument('--retries', type=int, default=1)
+    parser.add_argument('--config', help="JSON file: bridge → config overrides")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--report', default=DEFAULT_REPORT)
+    parser.add_argument('--max-repos', type=int, help="only the N largest timelines")
+    args = parser.parse_args()
+
+    bridges = tuple(name.strip() for name in args.bridges.split(',') if name.strip())
+    unknown = [name for name in bridges if name not in BRIDGES]
+    if unknown or not bridges:
+        sys.exit(f"Unknown bridges {unknown}, expected some of {BRIDGES}")
+    if args.concurrency < 1 or args.retries < 0 or args.timeout <= 0:
+        sys.exit("--concurrency must be >= 1, --retries >= 0 and --timeout > 0")
+
+    paths = timeline_paths(args.corpus_dir)
+    if not paths:
+        sys.exit(f"No timeline_* in {args.corpus_dir}")
+    if args.max_repos:
+        paths = sorted(paths, key=os.path.getsize, reverse=True)[:args.max_repos]
+
+    timelines = [(timeline_repo_name(path), path) for path in paths]
+
+    driver = CorpusDriver(bridges, load_configs(args.config), args.concurrency, args.timeout, args.retries)
+
+    for path in (args.output, args.report):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    print(
+        f"Corpus : {len(timelines)} timelines × {len(bridges)} bridges, concurrency {args.concurrency}",
+        file=sys.stderr
+    )
+
+    with open(args.output, 'w') as output:
+        wall_s = asyncio.run(driver.run(timelines, output))
+
+    report = driver.report(wall_s)
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    latency = report['repo_latency']
+    print(
+        f"{report['repos']} repos / {report['tasks']} tâches en {report['wall_s']}s : "
+        f"{report['repos_per_s']} repos/s, latence par repo p50 {latency['p50_ms']}ms / "
+        f"p95 {latency['p95_ms']}ms, {report['failed']} échec(s), {report['timeouts']} timeout(s), "
+        f"{report['retries']} retry(s)",
+        file=sys.stderr
+    )
+    print(f"Résultats : {args.output}\nRapport : {args.report}", file=sys.stderr)
+
+    sys.exit(1 if report['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -93,6 +93,21 @@ const tests: BridgeTest[] = [
       config: { min_support: 0.3, min_confidence: 0.5 }
     },
     expectedKeys: ['success', 'data', 'metadata']
+  },
+  {
+    name: 'PAMI Bridge (time windows)',
+    bridgePath: 'bridges/pami_bridge.py',
+    inputData: {
+      repo: 'test-repo',
+      timeline: Array.from({ length: 12 }, (_, i) => ({
+        t: i,
+        patterns: [['feature'], ['refactor'], ['test']][i % 3],
+        commit: `commit${i}`,
+        timestamp: new Date(Date.UTC(2025, 0, 1, i * 3)).toISOString()
+      })),
+      config: { min_support: 0.3, min_confidence: 0.5, window_hours: 12, stride: 2 }
+    },
+    expectedKeys: ['success', 'data', 'metadata']
   }
 ];
 
@@ -167,6 +182,11 @@ async function testBridge(test: BridgeTest): Promise<boolean> {
       console.log(`    Patterns found: ${patternsFound}`);
     }
     
+    if (test.name === 'PAMI Bridge (time windows)') {
+      const windowing = output.metadata?.windowing || {};
+      console.log(`    Windows: ${windowing.windows} (${windowing.mode}, stride ${windowing.stride})`);
+    }
+    
     if (test.name === 'Merlion Bridge') {
       const refined = output.data?.refined_correlations?.length || 0;
       const anomalies = output.data?.detected_anomalies?.length || 0;